@@ -13,7 +13,32 @@ limiter = Limiter(key_func=get_remote_address)
 htmx = HTMX()
 
 # Application-level singleton services (initialized once, not per-request)
-_yahoo_service = None
+_league_registry = None
+
+
+def get_league_registry():
+    """Get the singleton LeagueRegistry (per-league services, bounded LRU)."""
+    global _league_registry
+    if _league_registry is None:
+        from flask import current_app
+        from app.services.league_registry import LeagueRegistry
+        config = current_app.config
+        _league_registry = LeagueRegistry(
+            config['LEAGUE_ID'] or next(iter(config['LEAGUE_IDS']), None),
+            config['LEAGUE_IDS'],
+            max_size=config['LEAGUE_REGISTRY_SIZE'],
+            idle_timeout=config['LEAGUE_IDLE_TIMEOUT']
+        )
+    return _league_registry
+
+
+def get_yahoo_service(league_id=None):
+    """Get a league's YahooService instance (the default league if not given).
+
+    Returns:
+        YahooService, or None if the league isn't served by this deployment
+    """
+    return get_league_registry().get(league_id)
 
 
 def create_app(config_name='default'):
@@ -28,28 +53,68 @@ def create_app(config_name='default'):
     limiter.init_app(app)
     htmx.init_app(app)
 
-    # Register blueprints
+    # Spans, Server-Timing headers and latency histograms (first, so request
+    # totals include every other hook)
+    from app.utils.timing import init_timing
+    init_timing(app, cache)
+
+    # Prometheus counters for cache reads and requests (served at /metrics)
+    from app.utils.metrics import init_metrics
+    init_metrics(app, cache)
+
+    # Opt-in stack sampling of picked requests (PROFILE_SAMPLE_RATE / X-Profile header)
+    from app.utils.profiler import init_profiler
+    init_profiler(app)
+
+    # gzip/brotli for responses not served pre-compressed from the fragment cache
+    from app.utils.compression import init_compression
+    init_compression(app)
+
+    # Register blueprints - the default league at /, every league at /l/<league_id>/
     from app.blueprints.main import main as main_blueprint
     from app.blueprints.api import api as api_blueprint
+    from app.blueprints.ops import ops as ops_blueprint
 
     app.register_blueprint(main_blueprint)
     app.register_blueprint(api_blueprint, url_prefix='/api')
+    app.register_blueprint(main_blueprint, url_prefix='/l/<league_id>', name='league_main')
+    app.register_blueprint(api_blueprint, url_prefix='/l/<league_id>/api', name='league_api')
+    # Health checks and metrics: once, for the whole deployment, never rate limited
+    limiter.exempt(ops_blueprint)
+    app.register_blueprint(ops_blueprint)
 
-    # Initialize application-level singleton services
-    def get_yahoo_service():
-        """Get the singleton YahooService instance."""
-        global _yahoo_service
-        if _yahoo_service is None:
-            from app.services.yahoo_service import YahooService
-            _yahoo_service = YahooService()
-        return _yahoo_service
+    @app.url_value_preprocessor
+    def pull_league_id(endpoint, values):
+        """Move the league from the URL to the request context."""
+        from flask import g
+        g.league_id = values.pop('league_id', None) if values else None
 
     # Make service available to request context
     @app.before_request
     def setup_services():
-        """Attach singleton service instances to request context."""
-        from flask import g
-        g.yahoo_service = get_yahoo_service()
+        """Attach the league's service instances to request context."""
+        from flask import abort, g, request
+        if request.endpoint == 'static' or request.blueprint == 'ops':
+            return
+
+        registry = get_league_registry()
+        g.league_id = g.get('league_id') or registry.default_league
+        g.yahoo_service = registry.get(g.league_id)
+        if g.yahoo_service is None:
+            abort(404)
+
+        # A league coming back from idle gets a fresh snapshot right away
+        if registry.touch(g.league_id):
+            from app.services.snapshot_service import request_snapshot_refresh
+            request_snapshot_refresh(g.league_id)
+
+    @app.context_processor
+    def inject_league_base():
+        """URL prefix of the league being viewed ('' for the default league at /)."""
+        from flask import g, request
+        if request.blueprint in ('league_main', 'league_api'):
+            return {'league_base': f'/l/{g.league_id}'}
+        return {'league_base': ''}
 
     # Error handlers
     @app.errorhandler(404)
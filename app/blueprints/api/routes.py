@@ -1,172 +1,174 @@
 """API blueprint routes for HTMX endpoints."""
-from flask import render_template, current_app, g
+import queue
+import time
+
+from flask import Response, current_app, g, render_template, request, stream_with_context
 from app.blueprints.api import api
-from app import limiter, cache
+from app import get_league_registry, limiter
+from app.services.game_clock import game_clock
+from app.services.live_updates import broadcaster, start_listener
+from app.services.snapshot_service import SnapshotService, request_snapshot_refresh, roster_component
+from app.services.yahoo_quota import yahoo_quota
 from app.services.yahoo_service import YahooService
-from app.services.bracket_service import BracketService
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
+from app.utils.fragment_cache import get_or_render
+from app.utils.http_cache import conditional_fragment, fragment_etag
+from app.utils.timing import histograms
 
-@cache.memoize(timeout=30)  # Match CACHE_LIVE_SCORES
-def get_complete_bracket():
-    """Get complete bracket with all data - cached for 30 seconds.
 
-    Optimized to only fetch ACTIVE week data (not all 3 weeks).
-    Pre-fetches rosters for active week only (6 rosters vs 18).
+def get_manifest():
+    """Get the request league's published snapshot manifest - a single small cache read.
 
-    Caching strategy:
-    - This function: 30 seconds (aligned with live scores)
-    - Scoreboards: 30s for active week, 24h for completed weeks (smart caching)
-    - Rosters: 15 minutes (don't change during games)
-    - Standings: 60 seconds
+    The snapshot is rebuilt in the background by the SnapshotRefresher (see
+    app/services/snapshot_service.py), so requests never wait on Yahoo. The
+    manifest carries each component's content hash, so a fragment's ETag can
+    be checked before any component is read or rendered.
 
     Returns:
-        Dict with bracket, current_week, bracket_status, standings, and rosters
+        Manifest dict, or None if no snapshot has been published yet
     """
-    try:
-        yahoo = g.yahoo_service  # Use cached service instance
-        bracket_svc = BracketService()
-
-        # Parallelize initial data fetching
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            # Fetch standings and current week in parallel
-            standings_future = executor.submit(yahoo.get_league_standings)
-            current_week_future = executor.submit(yahoo.get_current_week)
-
-            standings = standings_future.result()
-            current_week = current_week_future.result()
-
-        if not standings:
-            return None
-
-        # Get Waffle Bowl teams (bottom 6)
-        waffle_teams = bracket_svc.get_waffle_bowl_teams(standings)
-
-        # Create bracket structure
-        bracket = bracket_svc.create_bracket_structure(waffle_teams, current_week)
-
-        # Get all relevant weeks
-        qf_week = bracket['rounds']['quarterfinals']['week']
-        sf_week = bracket['rounds']['semifinals']['week']
-        final_week = bracket['rounds']['finals']['week']
-
-        # Determine which weeks to fetch scores for
-        # Fetch ALL completed and active playoff weeks (not future weeks)
-        weeks_to_fetch = []
-
-        if current_week >= qf_week:
-            weeks_to_fetch.append(qf_week)  # Always fetch QF if it has started
-        if current_week >= sf_week:
-            weeks_to_fetch.append(sf_week)  # Fetch SF if it has started
-        if current_week >= final_week:
-            weeks_to_fetch.append(final_week)  # Fetch Final if it has started
-
-        # Pre-fetch rosters for ALL weeks we're fetching scores for - PARALLELIZED
-        rosters = {}
-        team_points_by_week = {}
-
-        # Initialize nested dicts for all teams
-        for team in waffle_teams:
-            team_id = team['team_id']
-            rosters[team_id] = {}
-            team_points_by_week[team_id] = {}
-
-        if weeks_to_fetch:
-            # Fetch rosters for all relevant weeks in parallel
-            with ThreadPoolExecutor(max_workers=min(len(waffle_teams) * len(weeks_to_fetch), 12)) as executor:
-                # Submit all roster fetch tasks for ALL weeks
-                roster_futures = {}
-                for team in waffle_teams:
-                    for week in weeks_to_fetch:
-                        future = executor.submit(yahoo.get_team_roster, team['team_id'], week)
-                        roster_futures[future] = (team['team_id'], week)
-
-                # Collect results as they complete
-                for future in as_completed(roster_futures):
-                    team_id, week = roster_futures[future]
-                    try:
-                        roster = future.result()
-                        if roster:
-                            rosters[team_id][week] = roster
-
-                            # Calculate points from roster (starters only)
-                            points = sum(
-                                p['points'] for p in roster.get('players', [])
-                                if p.get('selected_position') != 'BN'
-                            )
-                            team_points_by_week[team_id][week] = points
-                    except Exception as e:
-                        current_app.logger.error(f"Error fetching roster for team {team_id}, week {week}: {e}")
-
-        # Fetch scoreboards for ALL relevant weeks and update bracket incrementally
-        for week in weeks_to_fetch:
-            scoreboard = yahoo.get_scoreboard(week)
-            if scoreboard:
-                # Merge roster-calculated points for missing teams
-                if 'team_scores' not in scoreboard:
-                    scoreboard['team_scores'] = {}
-
-                for team_id, weeks_data in team_points_by_week.items():
-                    if week in weeks_data and str(team_id) not in scoreboard['team_scores']:
-                        scoreboard['team_scores'][str(team_id)] = {
-                            'team_id': str(team_id),
-                            'points': weeks_data[week],
-                            'week': week
-                        }
-
-                # Update bracket with this week's results
-                # This will progressively update QF, then SF, then Final
-                bracket = bracket_svc.update_bracket_with_results(
-                    bracket, scoreboard, yahoo_service=yahoo, current_week=current_week
-                )
-
-        # Get bracket status
-        bracket_status = bracket_svc.get_bracket_status(bracket, current_week)
-
-        return {
-            'bracket': bracket,
-            'current_week': current_week,
-            'bracket_status': bracket_status,
-            'standings': standings,
-            'rosters': rosters  # All rosters pre-fetched
-        }
+    manifest, _ = SnapshotService.read(g.league_id)
+    if manifest is None:
+        # Cold start - nudge the refresher rather than building inline
+        request_snapshot_refresh(g.league_id)
+    return manifest
 
-    except Exception as e:
-        current_app.logger.error(f"Error building complete bracket: {e}")
+
+def bracket_etag(manifest):
+    """ETag of the bracket fragment for a snapshot manifest.
+
+    data_as_of is left out (it moves on every rebuild while scores often
+    don't), and so is kept out of the fragment's markup: the page gets it
+    from the X-Data-As-Of header / SSE event instead.
+    """
+    etags = manifest['etags']
+    return fragment_etag('bracket', etags['bracket'], etags['status'])
+
+
+def render_bracket(manifest):
+    """Render the bracket fragment for a snapshot, or None if its components are gone."""
+    bracket, status = SnapshotService.read_components(manifest, 'bracket', 'status')
+    if not bracket:
         return None
+    return render_template('components/bracket.html', bracket=bracket, bracket_status=status)
 
 
 @api.route('/bracket/refresh')
 @limiter.limit("60 per minute")
 def refresh_bracket():
     """Return updated bracket HTML fragment with status."""
+    def empty():
+        return render_template('components/bracket.html', bracket=None, bracket_status=None)
+
     try:
-        data = get_complete_bracket()
-        if not data:
-            return render_template('components/bracket.html', bracket=None, bracket_status=None)
-
-        return render_template(
-            'components/bracket.html',
-            bracket=data['bracket'],
-            bracket_status=data['bracket_status']
+        manifest = get_manifest()
+        if not manifest:
+            return empty()
+
+        return conditional_fragment(
+            bracket_etag(manifest),
+            lambda: render_bracket(manifest),
+            empty,
+            headers={
+                'X-Data-As-Of': str(int(manifest['data_as_of'])),
+                # Seconds until the client should poll again (game clock)
+                'X-Poll-Interval': str(game_clock.interval(g.league_id))
+            }
         )
 
     except Exception as e:
         current_app.logger.error(f"Error refreshing bracket: {e}")
-        return render_template('components/bracket.html', bracket=None, bracket_status=None)
+        return empty()
+
+
+@api.route('/bracket/stream')
+@limiter.limit("20 per minute")
+def bracket_stream():
+    """Server-Sent Events stream pushing the bracket fragment when it changes.
+
+    Sends a ``bracket`` event (the rendered fragment) only when the bracket
+    ETag changes, a ``freshness`` event (data_as_of) on every new snapshot,
+    and keepalive comments in between. The stream ends after
+    SSE_MAX_STREAM_SECONDS so gunicorn threads are recycled; browsers
+    reconnect automatically.
+
+    Every open stream holds a gunicorn thread, so each worker serves at
+    most SSE_MAX_CLIENTS of them (keep it below the thread count, see
+    gunicorn.conf.py); past that viewers get a 204 and poll instead.
+    """
+    config = current_app.config
+    league_id = g.league_id
+    updates = broadcaster.subscribe(league_id, config['SSE_MAX_CLIENTS'])
+    if updates is None:
+        # At capacity - 204 closes the EventSource (the sse extension retries
+        # with backoff, up to a minute apart) and the page polls meanwhile
+        return Response(status=204)
+
+    start_listener()
+    keepalive = config['SSE_KEEPALIVE']
+    deadline = time.monotonic() + config['SSE_MAX_STREAM_SECONDS']
+    # Bracket events carry the fragment ETag as their id, so a reconnecting
+    # browser (Last-Event-ID) is not re-sent a fragment it already has
+    last_etag = request.headers.get('Last-Event-ID') or None
+
+    def events():
+        nonlocal last_etag
+        try:
+            yield f'retry: {keepalive * 1000}\n\n'
+            while time.monotonic() < deadline:
+                try:
+                    update = updates.get(timeout=keepalive)
+                except queue.Empty:
+                    # An open stream keeps its league active (it stops polling)
+                    get_league_registry().touch(league_id)
+                    yield ': keepalive\n\n'
+                    continue
+
+                manifest = {key: update[key] for key in ('league_id', 'version', 'etags', 'data_as_of')}
+                etag = bracket_etag(manifest)
+                if etag != last_etag:
+                    html = get_or_render(etag, lambda: render_bracket(manifest))
+                    if html is not None:
+                        last_etag = etag
+                        yield format_sse(html, event='bracket', event_id=etag)
+                yield format_sse(str(int(update['data_as_of'])), event='freshness')
+        finally:
+            broadcaster.unsubscribe(league_id, updates)
+
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+def format_sse(data: str, event: str = None, event_id: str = None) -> str:
+    """Format one Server-Sent Events message (multi-line data allowed)."""
+    lines = []
+    if event_id:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    lines.extend(f'data: {line}' for line in data.splitlines() or [''])
+    return '\n'.join(lines) + '\n\n'
 
 
 @api.route('/bracket/status')
 @limiter.limit("60 per minute")
 def bracket_status():
     """Return bracket status HTML fragment."""
-    try:
-        data = get_complete_bracket()
-        if not data:
-            return '<div class="text-center"><p class="text-lg">Unable to load bracket status</p></div>'
+    def unavailable():
+        return '<div class="text-center"><p class="text-lg">Unable to load bracket status</p></div>'
 
-        status = data['bracket_status']
-        return f'''
+    try:
+        manifest = get_manifest()
+        if not manifest:
+            return unavailable()
+
+        def render():
+            status, = SnapshotService.read_components(manifest, 'status')
+            if not status:
+                return None
+            return f'''
         <div class="flex items-center justify-center">
             <div class="text-center">
                 <h2 class="text-2xl font-bold mb-2">Current Status</h2>
@@ -174,6 +176,8 @@ def bracket_status():
             </div>
         </div>
         '''
+
+        return conditional_fragment(fragment_etag('status', manifest['etags']['status']), render, unavailable)
     except Exception as e:
         current_app.logger.error(f"Error fetching bracket status: {e}")
         return '<div class="text-center"><p class="text-lg">Error loading status</p></div>'
@@ -183,31 +187,42 @@ def bracket_status():
 @limiter.limit("60 per minute")
 def team_details(team_id):
     """Return team details modal HTML fragment."""
-    try:
-        # Get cached bracket data (has pre-fetched rosters!)
-        data = get_complete_bracket()
-        if not data:
-            return render_template('components/team_details.html', team=None, roster=None)
-
-        current_week = data['current_week']
-        standings = data['standings']
-        rosters = data['rosters']
-
-        # Get roster from pre-fetched data (no API call!)
-        roster = rosters.get(team_id, {}).get(current_week)
-
-        # Find team in standings
-        team = next((t for t in standings if t['team_id'] == team_id), None)
+    def empty():
+        return render_template('components/team_details.html', team=None, roster=None)
 
-        return render_template(
-            'components/team_details.html',
-            team=team,
-            roster=roster
+    try:
+        manifest = get_manifest()
+        if not manifest:
+            return empty()
+
+        # The manifest names the current week; read just this team's roster
+        # (pre-fetched in the snapshot, no API call!) and the standings
+        component = roster_component(team_id, manifest['current_week'])
+
+        def render():
+            standings, roster = SnapshotService.read_components(manifest, 'standings', component)
+            if standings is None:
+                return None
+
+            # Find team in standings
+            team = next((t for t in standings if t['team_id'] == team_id), None)
+
+            return render_template(
+                'components/team_details.html',
+                team=team,
+                roster=roster
+            )
+
+        etags = manifest['etags']
+        return conditional_fragment(
+            fragment_etag('team', team_id, etags['standings'], etags.get(component)),
+            render,
+            empty
         )
 
     except Exception as e:
         current_app.logger.error(f"Error fetching team details: {e}")
-        return render_template('components/team_details.html', team=None, roster=None)
+        return empty()
 
 
 @api.route('/matchup/<round_name>/<int:matchup_index>/details')
@@ -216,97 +231,97 @@ def matchup_details(round_name, matchup_index):
     """Return head-to-head matchup modal HTML fragment.
 
     Args:
-        round_name: 'qf', 'sf', or 'final'
-        matchup_index: 0 or 1 (for qf/sf), ignored for final
+        round_name: Round id ('qf', 'sf', 'final', or 'r1'... in larger brackets)
+        matchup_index: Index of the matchup within the round (0 for the final)
     """
+    def empty():
+        return render_template('components/matchup_details.html', matchup=None)
+
     try:
-        # Get cached bracket (has all scoreboard data AND pre-fetched rosters!)
-        data = get_complete_bracket()
-        if not data:
-            return render_template('components/matchup_details.html', matchup=None)
-
-        bracket = data['bracket']
-        rosters = data['rosters']
-
-        # Extract the matchup based on round_name
-        matchup = None
-        team1_id = None
-        team2_id = None
-        week = None
-
-        if round_name == 'qf':
-            matchup = bracket['rounds']['quarterfinals']['matchups'][matchup_index]
-            team1_id = matchup['team1']['team_id']
-            team2_id = matchup['team2']['team_id']
-            week = bracket['rounds']['quarterfinals']['week']
-            round_display = 'Quarterfinals'
-        elif round_name == 'sf':
-            matchup = bracket['rounds']['semifinals']['matchups'][matchup_index]
-            if not matchup.get('team1') or not matchup.get('team2'):
-                return '<div class="text-center py-8"><p class="text-gray-600">Matchup not yet determined</p></div>'
-            team1_id = matchup['team1']['team_id']
-            team2_id = matchup['team2']['team_id']
-            week = bracket['rounds']['semifinals']['week']
-            round_display = 'Semifinals'
-        elif round_name == 'final':
-            matchup = bracket['rounds']['finals']['matchup']
+        manifest = get_manifest()
+        if not manifest:
+            return empty()
+
+        round_weeks = manifest['round_weeks']
+        if round_name not in round_weeks:
+            return '<div class="text-center py-8"><p class="text-gray-600">Invalid round</p></div>'
+
+        def render():
+            # Get cached bracket (has all scoreboard data)
+            bracket, = SnapshotService.read_components(manifest, 'bracket')
+            if not bracket:
+                return None
+
+            # Extract the matchup based on round_name
+            round_data = next(r for r in bracket['rounds'] if r['id'] == round_name)
+            if matchup_index >= len(round_data['matchups']):
+                return '<div class="text-center py-8"><p class="text-gray-600">Invalid matchup</p></div>'
+            matchup = round_data['matchups'][matchup_index]
             if not matchup.get('team1') or not matchup.get('team2'):
                 return '<div class="text-center py-8"><p class="text-gray-600">Matchup not yet determined</p></div>'
             team1_id = matchup['team1']['team_id']
             team2_id = matchup['team2']['team_id']
-            week = bracket['rounds']['finals']['week']
-            round_display = 'Waffle Bowl Final'
-        else:
-            return '<div class="text-center py-8"><p class="text-gray-600">Invalid round</p></div>'
-
-        # Get rosters from pre-fetched data (no API calls!)
-        team1_roster = rosters.get(team1_id, {}).get(week)
-        team2_roster = rosters.get(team2_id, {}).get(week)
-
-        # Override roster names with actual team names from matchup
-        if team1_roster:
-            team1_roster['name'] = matchup['team1']['name']
-        if team2_roster:
-            team2_roster['name'] = matchup['team2']['name']
-
-        # Calculate total points (starters only) from rosters
-        def calculate_total(roster):
-            if not roster or 'players' not in roster:
-                return 0.0
-            return sum(p['points'] for p in roster['players'] if p['selected_position'] != 'BN')
-
-        team1_points = calculate_total(team1_roster)
-        team2_points = calculate_total(team2_roster)
-
-        # Determine game status
-        current_week = data['current_week']
-        has_scores = team1_points > 0 or team2_points > 0
-
-        # Game status: 'final', 'live', or 'unstarted'
-        if current_week and week:
-            if current_week > week:
-                game_status = 'final'
-            elif current_week == week and has_scores:
-                game_status = 'live'
+            week = round_data['week']
+            round_display = round_data['name']
+
+            # Get just these two rosters from the snapshot (no API calls!)
+            team1_roster, team2_roster = SnapshotService.read_components(
+                manifest, roster_component(team1_id, week), roster_component(team2_id, week)
+            )
+
+            # Override roster names with actual team names from matchup
+            if team1_roster:
+                team1_roster['name'] = matchup['team1']['name']
+            if team2_roster:
+                team2_roster['name'] = matchup['team2']['name']
+
+            # Calculate total points (starters only) from rosters
+            team1_points = YahooService.starter_points(team1_roster)
+            team2_points = YahooService.starter_points(team2_roster)
+
+            # Determine game status
+            current_week = manifest['current_week']
+            has_scores = team1_points > 0 or team2_points > 0
+
+            # Game status: 'final', 'live', or 'unstarted'
+            if current_week and week:
+                if current_week > week:
+                    game_status = 'final'
+                elif current_week == week and has_scores:
+                    game_status = 'live'
+                else:
+                    game_status = 'unstarted'
             else:
-                game_status = 'unstarted'
-        else:
-            game_status = 'live'  # Default if we can't determine
-
-        # Prepare matchup data
-        matchup_data = {
-            'round_name': round_display,
-            'week': week,
-            'game_status': game_status,
-            'team1_points': team1_points or 0.0,
-            'team2_points': team2_points or 0.0
-        }
-
-        return render_template(
-            'components/matchup_details.html',
-            matchup=matchup_data,
-            team1_roster=team1_roster,
-            team2_roster=team2_roster
+                game_status = 'live'  # Default if we can't determine
+
+            # Prepare matchup data
+            matchup_data = {
+                'round_name': round_display,
+                'week': week,
+                'game_status': game_status,
+                'team1_points': team1_points or 0.0,
+                'team2_points': team2_points or 0.0
+            }
+
+            return render_template(
+                'components/matchup_details.html',
+                matchup=matchup_data,
+                team1_roster=team1_roster,
+                team2_roster=team2_roster
+            )
+
+        # The rendered matchup depends on the bracket, the current week and
+        # the rosters of that round's week
+        etags = manifest['etags']
+        week_suffix = f":{round_weeks[round_name]}"
+        roster_etags = sorted(
+            (name, etag) for name, etag in etags.items()
+            if name.startswith('roster:') and name.endswith(week_suffix)
+        )
+        return conditional_fragment(
+            fragment_etag('matchup', round_name, matchup_index, manifest['current_week'], etags['bracket'], roster_etags),
+            render,
+            empty
         )
 
     except Exception as e:
@@ -314,3 +329,25 @@ def matchup_details(round_name, matchup_index):
         import traceback
         traceback.print_exc()
         return '<div class="text-center py-8"><p class="text-gray-600">Error loading matchup</p></div>'
+
+
+@api.route('/quota')
+@limiter.limit("60 per minute")
+def quota_usage():
+    """Return Yahoo API budget usage as JSON (shared by all leagues and workers)."""
+    try:
+        return yahoo_quota.usage()
+    except Exception as e:
+        current_app.logger.error(f"Error reading Yahoo quota: {e}")
+        return {'error': 'Quota unavailable'}, 503
+
+
+@api.route('/timing')
+@limiter.limit("60 per minute")
+def timing_histograms():
+    """Return this worker's latency histograms (per endpoint and span) as JSON."""
+    try:
+        return histograms.snapshot()
+    except Exception as e:
+        current_app.logger.error(f"Error reading timing histograms: {e}")
+        return {'error': 'Timing unavailable'}, 503
@@ -0,0 +1,6 @@
+"""Operations blueprint: health checks and metrics."""
+from flask import Blueprint
+
+ops = Blueprint('ops', __name__)
+
+from app.blueprints.ops import routes
@@ -0,0 +1,67 @@
+"""Operations routes: liveness, readiness and Prometheus metrics.
+
+Served once at the root (not per league) and exempt from rate limiting, so
+load balancers and scrapers are never throttled.
+"""
+import time
+
+from flask import Response, current_app
+
+from app import cache, get_yahoo_service
+from app.blueprints.ops import ops
+from app.utils.metrics import render_metrics
+
+READY_KEY = 'ops:ready'
+
+
+@ops.route('/health')
+def health():
+    """Liveness: the worker is up and answering requests."""
+    return {'status': 'ok'}
+
+
+@ops.route('/ready')
+def ready():
+    """Readiness: the cache answers a write and read, and the default league has a Yahoo session.
+
+    Returns 503 with the failing checks otherwise, so the worker is taken out
+    of rotation until it recovers.
+    """
+    checks = {}
+
+    try:
+        token = str(time.time())
+        cache.set(READY_KEY, token, timeout=30)
+        checks['cache'] = 'ok' if cache.get(READY_KEY) == token else 'read back a different value'
+    except Exception as e:
+        current_app.logger.error(f"Readiness check: cache unavailable: {e}")
+        checks['cache'] = 'unavailable'
+
+    try:
+        yahoo = get_yahoo_service()
+        checks['yahoo'] = 'ok' if yahoo is not None and yahoo.yf_query else 'not connected'
+    except Exception as e:
+        current_app.logger.error(f"Readiness check: Yahoo service unavailable: {e}")
+        checks['yahoo'] = 'unavailable'
+
+    if all(result == 'ok' for result in checks.values()):
+        return {'status': 'ready', 'checks': checks}
+    return {'status': 'unavailable', 'checks': checks}, 503
+
+
+@ops.route('/metrics')
+def metrics():
+    """Prometheus metrics of every worker (see app/utils/metrics.py)."""
+    if not current_app.config.get('METRICS_ENABLED', True):
+        return {'error': 'Metrics disabled'}, 404
+
+    try:
+        rendered = render_metrics(current_app._get_current_object())
+    except Exception as e:
+        current_app.logger.error(f"Error rendering metrics: {e}")
+        rendered = None
+    if rendered is None:
+        return {'error': 'Metrics unavailable'}, 503
+
+    body, content_type = rendered
+    return Response(body, content_type=content_type)
@@ -19,22 +19,76 @@ class Config:
     YAHOO_ACCESS_TOKEN = os.getenv('YAHOO_ACCESS_TOKEN')
     YAHOO_REFRESH_TOKEN = os.getenv('YAHOO_REFRESH_TOKEN')
 
+    # Yahoo client engine: 'sync' (yfpy) or 'async' (httpx, one gather per bracket build)
+    YAHOO_CLIENT_ENGINE = os.getenv('YAHOO_CLIENT_ENGINE', 'sync')
+    # Connection pool size / in-flight limit and timeouts (both engines)
+    YAHOO_MAX_CONCURRENCY = int(os.getenv('YAHOO_MAX_CONCURRENCY', 8))
+    YAHOO_CONNECT_TIMEOUT = float(os.getenv('YAHOO_CONNECT_TIMEOUT', 3))  # seconds
+    YAHOO_READ_TIMEOUT = float(os.getenv('YAHOO_READ_TIMEOUT', 10))  # seconds
+    # Yahoo call budget shared by all workers (token bucket; see app/services/yahoo_quota.py)
+    YAHOO_QUOTA_RATE = float(os.getenv('YAHOO_QUOTA_RATE', 0.5))  # sustained calls per second
+    YAHOO_QUOTA_BURST = float(os.getenv('YAHOO_QUOTA_BURST', 60))  # calls allowed in a burst
+
     # Redis
     REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379')
 
     # Caching
-    CACHE_TYPE = 'redis'
+    CACHE_TYPE = 'app.utils.cache_codec.CodecRedisCache'
     CACHE_REDIS_URL = REDIS_URL
     CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_CODEC = os.getenv('CACHE_CODEC', 'pickle')  # pickle or msgpack
+    CACHE_COMPRESSION = os.getenv('CACHE_COMPRESSION', 'zstd')  # zstd or none
+    CACHE_COMPRESS_MIN_BYTES = int(os.getenv('CACHE_COMPRESS_MIN_BYTES', 1024))  # smaller values stay uncompressed
+    CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', 1800))  # seconds to serve stale data if Yahoo is failing
+    FRAGMENT_CACHE_LOCAL_SIZE = int(os.getenv('FRAGMENT_CACHE_LOCAL_SIZE', 64))  # rendered fragments kept in-process
 
     # Rate Limiting
     RATELIMIT_STORAGE_URL = REDIS_URL
     RATELIMIT_DEFAULT = "200 per hour"
 
     # League Configuration
-    LEAGUE_ID = os.getenv('LEAGUE_ID')
+    LEAGUE_ID = os.getenv('LEAGUE_ID')  # default league, served at /
+    # Leagues served at /l/<league_id>/ (comma-separated; defaults to LEAGUE_ID)
+    LEAGUE_IDS = [league_id.strip() for league_id in os.getenv('LEAGUE_IDS', LEAGUE_ID or '').split(',') if league_id.strip()]
+    LEAGUE_REGISTRY_SIZE = int(os.getenv('LEAGUE_REGISTRY_SIZE', 32))  # per-league services kept in memory
+    LEAGUE_IDLE_TIMEOUT = int(os.getenv('LEAGUE_IDLE_TIMEOUT', 900))  # seconds without viewers before refreshes pause
     WAFFLE_BOWL_TEAMS = int(os.getenv('WAFFLE_BOWL_TEAMS', 6))
-    CACHE_LIVE_SCORES = int(os.getenv('CACHE_LIVE_SCORES', 30))  # seconds
+    # Refresh cadence by game clock (see app/services/game_clock.py), seconds
+    CACHE_LIVE_SCORES = int(os.getenv('CACHE_LIVE_SCORES', 15))  # NFL games may be in progress
+    CACHE_IDLE_SCORES = int(os.getenv('CACHE_IDLE_SCORES', 3600))  # no games (capped at the next kickoff)
+    CACHE_FINAL_SCORES = int(os.getenv('CACHE_FINAL_SCORES', 21600))  # active week final (stat corrections)
+
+    # Background bracket snapshot
+    SNAPSHOT_REFRESHER_ENABLED = os.getenv('SNAPSHOT_REFRESHER_ENABLED', 'true').lower() == 'true'
+    # Shortest rebuild interval (the game clock stretches it when no games are on), seconds
+    SNAPSHOT_REFRESH_INTERVAL = int(os.getenv('SNAPSHOT_REFRESH_INTERVAL', CACHE_LIVE_SCORES))
+    SNAPSHOT_TTL = int(os.getenv('SNAPSHOT_TTL', 3600))  # seconds a snapshot stays readable past its next rebuild
+    BRACKET_CHECKPOINT_TTL = int(os.getenv('BRACKET_CHECKPOINT_TTL', 60 * 86400))  # finalized weeks, kept all season
+    # Write-once SQLite archive of finalized weeks (empty to disable); keep it on a persistent volume
+    SEASON_ARCHIVE_PATH = os.getenv('SEASON_ARCHIVE_PATH', 'data/season_archive.db')
+    # Seconds after a week's games are all final before it is archived (Yahoo stat corrections)
+    ARCHIVE_GRACE_PERIOD = int(os.getenv('ARCHIVE_GRACE_PERIOD', 4 * 86400))
+
+    # Request timing (see app/utils/timing.py)
+    TIMING_ENABLED = os.getenv('TIMING_ENABLED', 'true').lower() == 'true'
+    SERVER_TIMING_HEADER = os.getenv('SERVER_TIMING_HEADER', 'true').lower() == 'true'  # span totals in responses
+
+    # Prometheus metrics at /metrics (see app/utils/metrics.py; needs prometheus-client)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+
+    # Sampling profiler for snapshot builds and requests (see app/utils/profiler.py)
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))  # fraction profiled; 0.01 is safe in production
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN', '')  # requests with a matching X-Profile header are profiled
+    PROFILE_DIR = os.getenv('PROFILE_DIR', 'data/profiles')
+    PROFILE_FORMAT = os.getenv('PROFILE_FORMAT', 'speedscope')  # speedscope or collapsed
+    PROFILE_INTERVAL_MS = float(os.getenv('PROFILE_INTERVAL_MS', 10))  # between stack samples
+    PROFILE_MIN_DURATION_MS = float(os.getenv('PROFILE_MIN_DURATION_MS', 100))  # shorter units are not kept
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', 100))  # newest profiles kept (per directory)
+
+    # Server-Sent Events (live bracket push)
+    SSE_MAX_CLIENTS = int(os.getenv('SSE_MAX_CLIENTS', 12))  # open streams per worker (each holds a gunicorn thread)
+    SSE_KEEPALIVE = int(os.getenv('SSE_KEEPALIVE', 15))  # seconds between keepalive comments
+    SSE_MAX_STREAM_SECONDS = int(os.getenv('SSE_MAX_STREAM_SECONDS', 600))  # browsers reconnect after this
 
 
 class DevelopmentConfig(Config):
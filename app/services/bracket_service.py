@@ -1,7 +1,81 @@
 """Waffle Bowl bracket logic for tracking the losers bracket."""
 import os
-from datetime import datetime, timezone, timedelta
-from typing import List, Dict, Optional
+from functools import lru_cache
+from typing import List, Dict, Tuple
+
+from app.utils.timing import timed
+
+# Week of the Waffle Bowl final if league metadata doesn't say otherwise
+DEFAULT_END_WEEK = 17
+
+# (id, display name) of the last rounds, final first; earlier rounds are numbered
+ROUND_NAMES = [('final', 'Waffle Bowl Final'), ('sf', 'Semifinals'), ('qf', 'Quarterfinals')]
+
+
+def _slot_order(source: Tuple[str, int]) -> Tuple[bool, int]:
+    """Sort key of a slot source: losers before seeds, then by number."""
+    kind, value = source
+    return kind == 'seed', value
+
+
+@lru_cache(maxsize=None)
+def advancement_table(num_teams: int) -> Tuple[Dict, ...]:
+    """Precompute the round graph of an N-team Waffle Bowl.
+
+    The bracket is padded to the next power of two and the worst seeds get
+    the byes (auto-advancing toward last place). Every round is reseeded:
+    the worst remaining team plays the best, the second worst plays the
+    second best, and so on. Losers advance.
+
+    Each matchup slot is filled from a fixed source:
+    - ('seed', s): the team with waffle seed s (first round, or a bye)
+    - ('loser', k): the k-th worst-seeded loser of the previous round
+
+    Bye seeds are always the worst seeds, so they sort ahead of every loser
+    and each slot's source is known before any game is played.
+
+    Within a matchup a loser slot comes before a seed slot and otherwise the
+    lower number goes first (team1), and matchups are ordered by team1. For
+    6 teams that is qf1 3v6, qf2 4v5, sf1 worse QF loser v seed 2, sf2
+    better QF loser v seed 1, final worse SF loser v better SF loser.
+
+    Args:
+        num_teams: Number of teams in the Waffle Bowl (at least 2)
+
+    Returns:
+        Tuple of rounds, first to last, each a dict with id, name, byes
+        (seeds with a first-round bye) and matchups (pairs of slot sources)
+    """
+    size = 1
+    while size < num_teams:
+        size *= 2
+    num_rounds = size.bit_length() - 1
+    num_byes = size - num_teams
+
+    rounds = []
+    for index in range(num_rounds):
+        from_end = num_rounds - 1 - index
+        if from_end < len(ROUND_NAMES):
+            round_id, name = ROUND_NAMES[from_end]
+        else:
+            round_id, name = f'r{index + 1}', f'Round {index + 1}'
+
+        if index == 0:
+            pool = [('seed', seed) for seed in range(num_byes + 1, num_teams + 1)]
+        else:
+            # Bye teams join in the second round
+            pool = [('seed', seed) for seed in range(1, num_byes + 1)] if index == 1 else []
+            pool += [('loser', k) for k in range(len(rounds[-1]['matchups']))]
+
+        pairs = [tuple(sorted((pool[i], pool[-1 - i]), key=_slot_order)) for i in range(len(pool) // 2)]
+        rounds.append({
+            'id': round_id,
+            'name': name,
+            'byes': tuple(range(1, num_byes + 1)) if index == 0 else (),
+            'matchups': tuple(sorted(pairs, key=lambda pair: _slot_order(pair[0])))
+        })
+
+    return tuple(rounds)
 
 
 class BracketService:
@@ -11,7 +85,8 @@ class BracketService:
         """Initialize bracket service.
 
         Args:
-            num_teams: Number of teams in Waffle Bowl (default: 6 from env)
+            num_teams: Number of teams in Waffle Bowl (default: 6 from env).
+                Any N >= 2 works; brackets that aren't a power of two get byes.
         """
         self.num_teams = num_teams or int(os.getenv('WAFFLE_BOWL_TEAMS', 6))
 
@@ -49,6 +124,7 @@ class BracketService:
         # Fallback: if no scoreboard data, assume not complete
         return False
 
+    @timed('bracket.seeding')
     def get_waffle_bowl_teams(self, standings: List[Dict]) -> List[Dict]:
         """Get bottom N teams for Waffle Bowl.
 
@@ -74,16 +150,17 @@ class BracketService:
         # Get bottom N teams (worst teams)
         waffle_teams = sorted_teams[:self.num_teams]
 
-        # Add seed numbers (1 = worst team, 6 = best of worst)
+        # Add seed numbers (1 = worst team, N = best of worst)
         for idx, team in enumerate(waffle_teams):
             team['waffle_seed'] = idx + 1
 
         return waffle_teams
 
-    def create_bracket_structure(self, teams: List[Dict], current_week: int) -> Dict:
+    @timed('bracket.structure')
+    def create_bracket_structure(self, teams: List[Dict], current_week: int, end_week: int = None) -> Dict:
         """Create Waffle Bowl bracket structure.
 
-        6-team bracket with byes:
+        Built from advancement_table(num_teams). For the default 6 teams:
         - Seeds 1-2 (worst two teams) get BYES in week 1
         - Week 1 (Quarterfinals): 3v6, 4v5
         - Week 2 (Semifinals): Losers of QF vs bye teams
@@ -92,78 +169,53 @@ class BracketService:
         Args:
             teams: List of Waffle Bowl teams with seeds
             current_week: Current NFL week
+            end_week: Last week of the fantasy season (league metadata); the
+                final is played that week and each earlier round a week before
 
         Returns:
-            Dict with bracket structure
+            Dict with bracket structure. rounds is a list, first round to final,
+            each with id ('qf', 'sf', 'final', ...), name, week, matchups and byes.
         """
         if len(teams) < self.num_teams:
             return {'error': f'Need {self.num_teams} teams, got {len(teams)}'}
 
-        # Determine playoff weeks (static assignments)
-        qf_week = 15      # Quarterfinals always week 15
-        sf_week = 16      # Semifinals always week 16
-        final_week = 17   # Finals always week 17
+        table = advancement_table(self.num_teams)
+        first_week = (end_week or DEFAULT_END_WEEK) - len(table) + 1
+
+        def seed(number):
+            return teams[number - 1]
 
-        bracket = {
+        rounds = []
+        for index, round_spec in enumerate(table):
+            matchups = []
+            for number, sources in enumerate(round_spec['matchups'], start=1):
+                matchup = {
+                    'id': round_spec['id'] if len(round_spec['matchups']) == 1 else f"{round_spec['id']}{number}",
+                    'winner': None,
+                    'loser': None
+                }
+                for slot, (kind, value) in zip(('team1', 'team2'), sources):
+                    # Losers are filled in as the previous round completes
+                    matchup[slot] = seed(value) if kind == 'seed' else None
+                    if index > 0:
+                        matchup[f'{slot}_from'] = 'Bye' if kind == 'seed' else rounds[-1]['name']
+                matchups.append(matchup)
+
+            rounds.append({
+                'id': round_spec['id'],
+                'name': round_spec['name'],
+                'week': first_week + index,
+                'matchups': matchups,
+                'byes': [seed(number) for number in round_spec['byes']]
+            })
+
+        return {
             'num_teams': self.num_teams,
             'teams': teams,
-            'rounds': {
-                'quarterfinals': {
-                    'week': qf_week,
-                    'name': 'Quarterfinals',
-                    'matchups': [
-                        {
-                            'id': 'qf1',
-                            'team1': teams[2],  # Seed 3
-                            'team2': teams[5],  # Seed 6
-                            'winner': None,
-                            'loser': None
-                        },
-                        {
-                            'id': 'qf2',
-                            'team1': teams[3],  # Seed 4
-                            'team2': teams[4],  # Seed 5
-                            'winner': None,
-                            'loser': None
-                        }
-                    ],
-                    'byes': [teams[0], teams[1]]  # Seeds 1 & 2 get byes
-                },
-                'semifinals': {
-                    'week': sf_week,
-                    'name': 'Semifinals',
-                    'matchups': [
-                        {
-                            'id': 'sf1',
-                            'team1': None,  # Loser of QF1
-                            'team2': teams[1],  # Seed 2 (bye)
-                            'winner': None,
-                            'loser': None
-                        },
-                        {
-                            'id': 'sf2',
-                            'team1': None,  # Loser of QF2
-                            'team2': teams[0],  # Seed 1 (bye - worst team)
-                            'winner': None,
-                            'loser': None
-                        }
-                    ]
-                },
-                'finals': {
-                    'week': final_week,
-                    'name': 'Waffle Bowl Final',
-                    'matchup': {
-                        'id': 'final',
-                        'team1': None,  # Loser of SF1
-                        'team2': None,  # Loser of SF2
-                        'loser': None  # LAST PLACE!
-                    }
-                }
-            }
+            'rounds': rounds
         }
 
-        return bracket
-
+    @timed('bracket.results')
     def update_bracket_with_results(
         self,
         bracket: Dict,
@@ -173,6 +225,10 @@ class BracketService:
     ) -> Dict:
         """Update bracket with actual game results.
 
+        One pass over the rounds: each round first takes the losers of the
+        previous round (once it is complete), then scores its matchups if it
+        is played this scoreboard's week.
+
         Args:
             bracket: Bracket structure from create_bracket_structure
             scoreboard_data: Scoreboard data from YahooService
@@ -212,152 +268,93 @@ class BracketService:
             # If current_week not provided, assume we can determine winners
             week_is_complete = True
 
-        # Helper to find matchup loser
-        def determine_loser(team1_data, team2_data):
-            if team1_data['points'] < team2_data['points']:
-                return team1_data
-            elif team2_data['points'] < team1_data['points']:
-                return team2_data
-            return None  # Tie
-
-        # Update quarterfinals if this is QF week
-        qf = bracket['rounds']['quarterfinals']
-        if week == qf['week']:
-            for i, matchup in enumerate(qf['matchups']):
-                team1_id = str(matchup['team1']['team_id'])  # Ensure string
-                team2_id = str(matchup['team2']['team_id'])  # Ensure string
-
-                # Initialize points_by_week if not exists
-                if 'points_by_week' not in matchup['team1']:
-                    matchup['team1']['points_by_week'] = {}
-                if 'points_by_week' not in matchup['team2']:
-                    matchup['team2']['points_by_week'] = {}
-
-                # Add scores for each team independently, keyed by week
-                if team1_id in scores_by_team:
-                    matchup['team1']['points_by_week'][week] = scores_by_team[team1_id]['points']
-                else:
-                    matchup['team1']['points_by_week'][week] = 0.0
-                if team2_id in scores_by_team:
-                    matchup['team2']['points_by_week'][week] = scores_by_team[team2_id]['points']
-                else:
-                    matchup['team2']['points_by_week'][week] = 0.0
-
-                # Only determine loser if week is complete AND both teams have scores
-                team1_points = matchup['team1']['points_by_week'].get(week, 0.0)
-                team2_points = matchup['team2']['points_by_week'].get(week, 0.0)
-                if week_is_complete and team1_points is not None and team2_points is not None:
-                    # Compare scores and assign the loser (using matchup team objects to preserve waffle_seed)
-                    if team1_points < team2_points:
-                        matchup['loser'] = matchup['team1']  # team1 loses
-                    elif team2_points < team1_points:
-                        matchup['loser'] = matchup['team2']  # team2 loses
-
-        # Advance QF losers to semifinals (only if QF week is complete)
-        # Use scoreboard data if we're processing the QF week, otherwise just compare week numbers
-        qf_scoreboard = scoreboard_data if week == qf['week'] else None
-        qf_week_complete = self.is_week_complete(qf['week'], current_week, qf_scoreboard) if current_week else True
-        if qf_week_complete and qf['matchups'][0].get('loser') and qf['matchups'][1].get('loser'):
-            sf = bracket['rounds']['semifinals']
-
-            # Get both QF losers
-            qf1_loser = qf['matchups'][0]['loser']
-            qf2_loser = qf['matchups'][1]['loser']
-
-            # Reward better season performance: higher waffle_seed = better regular season
-            # Better QF loser gets easier matchup (Seed 2), worse loser gets Seed 1
-            if qf1_loser['waffle_seed'] > qf2_loser['waffle_seed']:
-                # QF1 loser had better season, gets Seed 2
-                better_loser = qf1_loser
-                worse_loser = qf2_loser
-            else:
-                # QF2 loser had better season, gets Seed 2
-                better_loser = qf2_loser
-                worse_loser = qf1_loser
-
-            # Assign matchups based on season performance:
-            # Better season performer plays Seed 1 (SF2) - easiest matchup in losers bracket
-            # Worse season performer plays Seed 2 (SF1) - harder matchup
-            sf['matchups'][0]['team1'] = worse_loser   # vs Seed 2 (harder)
-            sf['matchups'][1]['team1'] = better_loser  # vs Seed 1 (easiest - worst team)
-
-        # Update semifinals if this is SF week
-        sf = bracket['rounds']['semifinals']
-        if week == sf['week']:
-            for i, matchup in enumerate(sf['matchups']):
-                if matchup.get('team1') and matchup.get('team2'):
-                    team1_id = str(matchup['team1']['team_id'])  # Ensure string
-                    team2_id = str(matchup['team2']['team_id'])  # Ensure string
-
-                    # Initialize points_by_week if not exists
-                    if 'points_by_week' not in matchup['team1']:
-                        matchup['team1']['points_by_week'] = {}
-                    if 'points_by_week' not in matchup['team2']:
-                        matchup['team2']['points_by_week'] = {}
-
-                    # Add scores for each team independently, keyed by week
-                    if team1_id in scores_by_team:
-                        matchup['team1']['points_by_week'][week] = scores_by_team[team1_id]['points']
-                    else:
-                        matchup['team1']['points_by_week'][week] = 0.0
-                    if team2_id in scores_by_team:
-                        matchup['team2']['points_by_week'][week] = scores_by_team[team2_id]['points']
-                    else:
-                        matchup['team2']['points_by_week'][week] = 0.0
-
-                    # Only determine loser if week is complete AND both teams have scores
-                    team1_points = matchup['team1']['points_by_week'].get(week, 0.0)
-                    team2_points = matchup['team2']['points_by_week'].get(week, 0.0)
-                    if week_is_complete and team1_points is not None and team2_points is not None:
-                        # Compare scores and assign the loser (using matchup team objects)
-                        if team1_points < team2_points:
-                            matchup['loser'] = matchup['team1']
-                        elif team2_points < team1_points:
-                            matchup['loser'] = matchup['team2']
-
-        # Advance SF losers to finals (only if SF week is complete)
-        # Use scoreboard data if we're processing the SF week, otherwise just compare week numbers
-        sf_scoreboard = scoreboard_data if week == sf['week'] else None
-        sf_week_complete = self.is_week_complete(sf['week'], current_week, sf_scoreboard) if current_week else True
-        if sf_week_complete and sf['matchups'][0].get('loser') and sf['matchups'][1].get('loser'):
-            final = bracket['rounds']['finals']
-            final['matchup']['team1'] = sf['matchups'][0]['loser']
-            final['matchup']['team2'] = sf['matchups'][1]['loser']
-
-        # Update finals if this is final week
-        final = bracket['rounds']['finals']
-        if week == final['week'] and final['matchup'].get('team1') and final['matchup'].get('team2'):
-            team1_id = str(final['matchup']['team1']['team_id'])  # Ensure string
-            team2_id = str(final['matchup']['team2']['team_id'])  # Ensure string
-
-            # Initialize points_by_week if not exists
-            if 'points_by_week' not in final['matchup']['team1']:
-                final['matchup']['team1']['points_by_week'] = {}
-            if 'points_by_week' not in final['matchup']['team2']:
-                final['matchup']['team2']['points_by_week'] = {}
-
-            # Add scores for each team independently, keyed by week
-            if team1_id in scores_by_team:
-                final['matchup']['team1']['points_by_week'][week] = scores_by_team[team1_id]['points']
-            else:
-                final['matchup']['team1']['points_by_week'][week] = 0.0
-            if team2_id in scores_by_team:
-                final['matchup']['team2']['points_by_week'][week] = scores_by_team[team2_id]['points']
-            else:
-                final['matchup']['team2']['points_by_week'][week] = 0.0
-
-            # Only determine loser if week is complete AND both teams have scores
-            team1_points = final['matchup']['team1']['points_by_week'].get(week, 0.0)
-            team2_points = final['matchup']['team2']['points_by_week'].get(week, 0.0)
-            if week_is_complete and team1_points is not None and team2_points is not None:
-                # Compare scores and assign the loser (using matchup team objects)
-                if team1_points < team2_points:
-                    final['matchup']['loser'] = final['matchup']['team1']
-                elif team2_points < team1_points:
-                    final['matchup']['loser'] = final['matchup']['team2']
+        table = advancement_table(bracket['num_teams'])
+        previous = None
+        for round_data, round_spec in zip(bracket['rounds'], table):
+            # Advance the previous round's losers (only once that round is complete)
+            if previous and self._is_round_complete(previous, week, current_week, scoreboard_data):
+                losers = sorted((m['loser'] for m in previous['matchups']), key=lambda t: t['waffle_seed'])
+                for matchup, sources in zip(round_data['matchups'], round_spec['matchups']):
+                    for slot, (kind, value) in zip(('team1', 'team2'), sources):
+                        if kind == 'loser':
+                            matchup[slot] = losers[value]
+
+            if round_data['week'] == week:
+                for matchup in round_data['matchups']:
+                    self._score_matchup(matchup, week, scores_by_team, week_is_complete)
+
+            previous = round_data
+
+        return bracket
+
+    def _is_round_complete(self, round_data: Dict, week: int, current_week: int, scoreboard_data: Dict) -> bool:
+        """Check if every matchup of a round has a loser and its week is over."""
+        if not all(matchup.get('loser') for matchup in round_data['matchups']):
+            return False
+        if not current_week:
+            return True
+        # Use scoreboard data if we're processing this round's week, otherwise just compare week numbers
+        round_scoreboard = scoreboard_data if week == round_data['week'] else None
+        return self.is_week_complete(round_data['week'], current_week, round_scoreboard)
+
+    @staticmethod
+    def _score_matchup(matchup: Dict, week: int, scores_by_team: Dict, week_is_complete: bool):
+        """Record both teams' points for the week and, once the week is complete, the result."""
+        team1 = matchup.get('team1')
+        team2 = matchup.get('team2')
+        if not team1 or not team2:
+            return
+
+        # Add scores for each team independently, keyed by week
+        for team in (team1, team2):
+            score = scores_by_team.get(str(team['team_id']))
+            team.setdefault('points_by_week', {})[week] = score['points'] if score else 0.0
+
+        if not week_is_complete:
+            return
+
+        # Compare scores (using matchup team objects to preserve waffle_seed);
+        # a tie leaves the matchup undecided
+        team1_points = team1['points_by_week'][week]
+        team2_points = team2['points_by_week'][week]
+        if team1_points < team2_points:
+            matchup['loser'], matchup['winner'] = team1, team2
+        elif team2_points < team1_points:
+            matchup['loser'], matchup['winner'] = team2, team1
+
+    @staticmethod
+    def relink_teams(bracket: Dict) -> Dict:
+        """Make every reference to a team in the bracket point at one shared dict.
+
+        Results are accumulated on shared team dicts (points_by_week), which a
+        serialization round-trip may have split into copies. Copies are merged
+        back into the team dict in bracket['teams'].
+
+        Args:
+            bracket: Bracket structure, modified in place
+
+        Returns:
+            The same bracket
+        """
+        canonical = {str(team['team_id']): team for team in bracket['teams']}
+
+        def link(team):
+            if not team:
+                return team
+            shared = canonical.setdefault(str(team['team_id']), team)
+            if shared is not team:
+                shared.setdefault('points_by_week', {}).update(team.get('points_by_week', {}))
+            return shared
+
+        for round_data in bracket['rounds']:
+            for matchup in round_data['matchups']:
+                for slot in ('team1', 'team2', 'winner', 'loser'):
+                    matchup[slot] = link(matchup[slot])
+            round_data['byes'] = [link(team) for team in round_data['byes']]
 
         return bracket
 
+    @timed('bracket.status')
     def get_bracket_status(self, bracket: Dict, current_week: int) -> Dict:
         """Get human-readable bracket status.
 
@@ -366,37 +363,31 @@ class BracketService:
             current_week: Current NFL week
 
         Returns:
-            Dict with status information
+            Dict with status information; current_round is a round id
         """
-        qf_week = bracket['rounds']['quarterfinals']['week']
-        sf_week = bracket['rounds']['semifinals']['week']
-        final_week = bracket['rounds']['finals']['week']
+        rounds = bracket['rounds']
+        final = rounds[-1]
 
-        if current_week < qf_week:
+        if current_week < rounds[0]['week']:
             status = 'upcoming'
-            message = f"Waffle Bowl starts Week {qf_week}"
+            message = f"Waffle Bowl starts Week {rounds[0]['week']}"
             current_round = None
-        elif current_week == qf_week:
-            status = 'active'
-            message = "Quarterfinals in progress"
-            current_round = 'quarterfinals'
-        elif current_week == sf_week:
+        elif current_week <= final['week']:
+            round_data = next(r for r in rounds if r['week'] == current_week)
             status = 'active'
-            message = "Semifinals in progress"
-            current_round = 'semifinals'
-        elif current_week == final_week:
-            status = 'active'
-            message = "🧇 WAFFLE BOWL FINAL - Last place on the line!"
-            current_round = 'finals'
+            current_round = round_data['id']
+            if round_data is final:
+                message = "🧇 WAFFLE BOWL FINAL - Last place on the line!"
+            else:
+                message = f"{round_data['name']} in progress"
         else:
             status = 'complete'
             message = "Waffle Bowl complete"
-            current_round = 'finals'
+            current_round = final['id']
 
             # Get last place team
-            final = bracket['rounds']['finals']['matchup']
-            if final.get('loser'):
-                message = f"Last place: {final['loser']['name']} 🧇"
+            if final['matchups'][0].get('loser'):
+                message = f"Last place: {final['matchups'][0]['loser']['name']} 🧇"
 
         return {
             'status': status,
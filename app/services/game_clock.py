@@ -0,0 +1,204 @@
+"""Refresh cadence derived from the NFL game clock.
+
+Scores can only change while games are being played, so how often the
+bracket is rebuilt (and Yahoo is asked for live-week data) follows the
+slate instead of a fixed interval:
+
+- live: inside an NFL kickoff window (Eastern time, open until 01:30 the
+  next morning for late and overtime games; Thanksgiving, Black Friday and
+  Christmas slates included) while the matchups are not all final, or
+  outside one while a matchup is in progress ('midevent') and its scores
+  still move - every CACHE_LIVE_SCORES seconds
+- idle: outside the kickoff windows (e.g. Tuesday morning) with no scores
+  changing for LIVE_QUIET_PERIOD - every CACHE_IDLE_SCORES seconds, but
+  never past the start of the next window
+- final: every matchup of the active week is 'postevent' - every
+  CACHE_FINAL_SCORES seconds (stat corrections only), also capped at the
+  next window
+
+The matchup statuses and team scores come from the active week's scoreboard
+at build time and are kept in the cache per league, so YahooService (live-week cache
+timeout), the snapshot refresher (rebuild interval) and the API (client poll
+interval) all derive the same cadence in every worker.
+"""
+import logging
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, Optional
+from zoneinfo import ZoneInfo
+
+from flask import current_app
+
+from app import cache
+
+logger = logging.getLogger(__name__)
+
+EASTERN = ZoneInfo('America/New_York')
+CADENCE_PREFIX = 'game_clock'
+# How long a league's matchup statuses are remembered without a rebuild
+CADENCE_TTL = 86400
+
+# (weekday (Mon=0), first kickoff, months or None for every month), Eastern time
+KICKOFF_WINDOWS = [
+    (3, time(20, 0), None),      # Thursday night
+    (4, time(20, 0), {9}),       # Friday night opener abroad (week 1)
+    (5, time(13, 0), {12, 1}),   # Saturday slates late in the season
+    (6, time(9, 15), None),      # Sunday, from the international morning games to Sunday night
+    (0, time(19, 0), None),      # Monday night
+]
+# Every window stays open until this time the next morning (late and overtime games)
+WINDOW_CLOSE = time(1, 30)
+# Matchup statuses of games not in progress
+NOT_LIVE_STATUSES = ('preevent', 'postevent')
+# Yahoo keeps matchups 'midevent' for the whole fantasy week (Thursday to
+# Tuesday), so outside the kickoff windows an in-progress matchup only counts
+# as live while its scores keep changing (seconds since the last change)
+LIVE_QUIET_PERIOD = 1800
+
+PHASE_LIVE = 'live'
+PHASE_IDLE = 'idle'
+PHASE_FINAL = 'final'
+
+
+class GameClock:
+    """Maps the NFL schedule and matchup statuses to refresh intervals."""
+
+    @staticmethod
+    def _intervals() -> Dict[str, int]:
+        config = current_app.config
+        return {
+            PHASE_LIVE: int(config.get('CACHE_LIVE_SCORES', 15)),
+            PHASE_IDLE: int(config.get('CACHE_IDLE_SCORES', 3600)),
+            PHASE_FINAL: int(config.get('CACHE_FINAL_SCORES', 21600))
+        }
+
+    @staticmethod
+    def _holiday_kickoffs(year: int) -> Dict[date, time]:
+        """First kickoff of the holiday slates that fall outside the weekly windows."""
+        november_first = date(year, 11, 1)
+        thanksgiving = november_first + timedelta(days=(3 - november_first.weekday()) % 7 + 21)
+        return {
+            thanksgiving: time(12, 30),
+            thanksgiving + timedelta(days=1): time(15, 0),  # Black Friday
+            date(year, 12, 25): time(13, 0),                # Christmas, whatever the weekday
+        }
+
+    def first_kickoff(self, day: date) -> Optional[time]:
+        """Earliest kickoff window opening on a date (Eastern time), or None if no games are scheduled."""
+        kickoffs = [
+            start for weekday, start, months in KICKOFF_WINDOWS
+            if day.weekday() == weekday and (months is None or day.month in months)
+        ]
+        holiday = self._holiday_kickoffs(day.year).get(day)
+        if holiday is not None:
+            kickoffs.append(holiday)
+        return min(kickoffs) if kickoffs else None
+
+    def in_kickoff_window(self, now: datetime) -> bool:
+        """Check whether games may be in progress at an (aware) time."""
+        local = now.astimezone(EASTERN)
+        # A window opened yesterday may still be open after midnight
+        for day in (local.date(), local.date() - timedelta(days=1)):
+            kickoff = self.first_kickoff(day)
+            if kickoff is None:
+                continue
+            opens = datetime.combine(day, kickoff, tzinfo=EASTERN)
+            closes = datetime.combine(day + timedelta(days=1), WINDOW_CLOSE, tzinfo=EASTERN)
+            if opens <= local <= closes:
+                return True
+        return False
+
+    def seconds_until_kickoff(self, now: datetime) -> float:
+        """Seconds until the next kickoff window opens (after the current one, if inside one)."""
+        local = now.astimezone(EASTERN)
+        for days in range(8):
+            day = (local + timedelta(days=days)).date()
+            kickoff = self.first_kickoff(day)
+            if kickoff is not None:
+                opens = datetime.combine(day, kickoff, tzinfo=EASTERN)
+                if opens > local:
+                    return (opens - local).total_seconds()
+        return float(CADENCE_TTL)
+
+    def cadence(self, statuses: Iterable[str], now: Optional[datetime] = None,
+                scores_changed_at: Optional[float] = None) -> Dict:
+        """Refresh cadence for a league.
+
+        Args:
+            statuses: Matchup statuses of the active week's scoreboard
+                ('preevent', 'midevent', 'postevent')
+            now: Time to evaluate (defaults to now)
+            scores_changed_at: When the active week's team scores last
+                changed (epoch seconds; None if unknown, counted as recent)
+
+        Returns:
+            Dict with phase ('live', 'idle' or 'final') and interval (seconds
+            until the next refresh)
+        """
+        now = now or datetime.now(EASTERN)
+        intervals = self._intervals()
+        statuses = list(statuses)
+
+        in_progress = any(status not in NOT_LIVE_STATUSES for status in statuses)
+        scoring = scores_changed_at is None or now.timestamp() - scores_changed_at < LIVE_QUIET_PERIOD
+
+        if statuses and all(status == 'postevent' for status in statuses):
+            phase = PHASE_FINAL
+        elif self.in_kickoff_window(now) or (in_progress and scoring):
+            # Games still being played outside the schedule (e.g. a delayed game) are live too
+            phase = PHASE_LIVE
+        else:
+            phase = PHASE_IDLE
+
+        interval = intervals[phase]
+        if phase != PHASE_LIVE:
+            # Wake up for the next kickoff, but never poll faster than live
+            interval = int(min(interval, max(intervals[PHASE_LIVE], self.seconds_until_kickoff(now))))
+        return {'phase': phase, 'interval': interval}
+
+    def remember(self, league_id, statuses: Iterable[str], scores: Optional[Dict] = None):
+        """Store the active week's matchup statuses (and when its scores last changed) for every worker.
+
+        Args:
+            league_id: League ID
+            statuses: Matchup statuses of the active week's scoreboard
+            scores: The active week's points by team ID
+        """
+        key = f'{CADENCE_PREFIX}:{league_id}'
+        try:
+            previous = cache.get(key)
+            scores = scores or {}
+            if isinstance(previous, dict) and previous.get('scores') == scores:
+                changed_at = previous.get('scores_changed_at')
+            else:
+                changed_at = datetime.now(EASTERN).timestamp()
+            cache.set(key, {
+                'statuses': list(statuses), 'scores': scores, 'scores_changed_at': changed_at
+            }, timeout=CADENCE_TTL)
+        except Exception as e:
+            logger.error(f"Could not store matchup statuses for league {league_id}: {e}")
+
+    def current(self, league_id) -> Dict:
+        """A league's cadence now, from its last stored matchup statuses (schedule only if none).
+
+        Args:
+            league_id: League ID
+
+        Returns:
+            Dict with phase and interval, as returned by cadence()
+        """
+        try:
+            stored = cache.get(f'{CADENCE_PREFIX}:{league_id}')
+        except Exception as e:
+            logger.error(f"Could not read matchup statuses for league {league_id}: {e}")
+            stored = None
+        if isinstance(stored, dict):
+            return self.cadence(stored['statuses'], scores_changed_at=stored.get('scores_changed_at'))
+        # Statuses only, as stored before scores were tracked
+        return self.cadence(stored or ())
+
+    def interval(self, league_id) -> int:
+        """Seconds until a league's next refresh."""
+        return self.current(league_id)['interval']
+
+
+game_clock = GameClock()
@@ -0,0 +1,98 @@
+"""Per-league services for serving many leagues from one deployment.
+
+Each league gets its own YahooService (bound to its league ID), created on
+first use and kept in a bounded LRU, so memory stays flat however many
+leagues are configured. Evicting a service is cheap: every league's cached
+data and snapshots live in the shared cache under league-scoped keys, and
+the Yahoo session is shared by all leagues (see yahoo_http.py).
+
+The registry also tracks when each league was last viewed in this process,
+so the snapshot refresher only spends Yahoo quota on leagues with viewers.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LeagueRegistry:
+    """Bounded LRU of per-league YahooService instances."""
+
+    def __init__(self, default_league: Optional[str], league_ids: List[str], max_size: int = 32,
+                 idle_timeout: int = 900):
+        """Initialize league registry.
+
+        Args:
+            default_league: League served at / (always allowed and always active)
+            league_ids: Other leagues allowed at /l/<league_id>/
+            max_size: Maximum YahooService instances kept in memory
+            idle_timeout: Seconds after its last view before a league is idle
+        """
+        self.default_league = default_league
+        self.league_ids = list(dict.fromkeys([default_league] + list(league_ids)))
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+
+        self._services = OrderedDict()
+        self._last_seen = {}
+        self._lock = threading.Lock()
+
+    def is_allowed(self, league_id: Optional[str]) -> bool:
+        """Check whether a league is served by this deployment."""
+        return league_id == self.default_league or league_id in self.league_ids
+
+    def get(self, league_id: Optional[str] = None):
+        """Get a league's YahooService, creating it if needed.
+
+        Args:
+            league_id: League ID (default league if not provided)
+
+        Returns:
+            YahooService for the league, or None if the league isn't served
+        """
+        league_id = league_id or self.default_league
+        if not self.is_allowed(league_id):
+            return None
+
+        with self._lock:
+            service = self._services.get(league_id)
+            if service is not None:
+                self._services.move_to_end(league_id)
+                return service
+
+        # Created outside the lock - authentication may touch the network
+        from app.services.yahoo_service import YahooService
+        service = YahooService(league_id)
+
+        with self._lock:
+            service = self._services.setdefault(league_id, service)
+            self._services.move_to_end(league_id)
+            while len(self._services) > self.max_size:
+                evicted, _ = self._services.popitem(last=False)
+                logger.info(f"Evicted league {evicted} from the registry")
+        return service
+
+    def touch(self, league_id: Optional[str] = None) -> bool:
+        """Record that a league is being viewed.
+
+        Returns:
+            True if the league was idle until now (its snapshot may be old)
+        """
+        league_id = league_id or self.default_league
+        now = time.time()
+        with self._lock:
+            last_seen = self._last_seen.get(league_id, 0)
+            self._last_seen[league_id] = now
+        return now - last_seen >= self.idle_timeout
+
+    def active_leagues(self) -> List[str]:
+        """Leagues viewed within the idle timeout (plus the default league), in configured order."""
+        cutoff = time.time() - self.idle_timeout
+        with self._lock:
+            return [
+                league_id for league_id in self.league_ids
+                if league_id == self.default_league or self._last_seen.get(league_id, 0) >= cutoff
+            ]
@@ -0,0 +1,149 @@
+"""Live bracket updates fanned out to Server-Sent Events streams.
+
+When a snapshot is published, SnapshotService announces it on a Redis
+pub/sub channel. Each gunicorn worker runs one listener thread subscribed to
+that channel and hands every announcement to the SSE streams open in that
+worker, so viewers on both workers get the same update no matter which
+worker built the snapshot.
+
+All leagues share the channel; announcements carry their league ID and are
+only handed to that league's streams.
+
+Without a Redis cache backend (e.g. SimpleCache in development) updates
+are broadcast to this process's streams only.
+"""
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Dict, Optional
+
+from app import cache
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+UPDATES_CHANNEL = 'bracket_snapshot:updates'
+# Announcements a slow stream may fall behind by before it starts dropping them
+QUEUE_SIZE = 4
+RECONNECT_DELAY = 5
+
+
+class Broadcaster:
+    """Hands snapshot announcements to the SSE streams of a league in this process."""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, league_id, max_clients: int) -> Optional[queue.Queue]:
+        """Register a stream.
+
+        Args:
+            league_id: League whose announcements the stream receives
+            max_clients: Maximum concurrent streams in this process, across
+                all leagues (each holds a gunicorn thread)
+
+        Returns:
+            Queue of announcements, or None if the process is at capacity
+        """
+        with self._lock:
+            if self._count >= max_clients:
+                metrics.sse_rejected.inc()
+                return None
+            q = queue.Queue(maxsize=QUEUE_SIZE)
+            self._subscribers.setdefault(league_id, set()).add(q)
+            self._count += 1
+        metrics.sse_streams.inc()
+        return q
+
+    def unsubscribe(self, league_id, q: queue.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(league_id, set())
+            if q in subscribers:
+                subscribers.discard(q)
+                self._count -= 1
+                metrics.sse_streams.dec()
+            if not subscribers:
+                self._subscribers.pop(league_id, None)
+
+    def broadcast(self, message: Dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(message.get('league_id'), ()))
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                # Only the newest announcement matters; drop the oldest
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+                q.put_nowait(message)
+
+    @property
+    def client_count(self) -> int:
+        return self._count
+
+
+broadcaster = Broadcaster()
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _redis_client():
+    """The Redis client behind the cache, or None for non-Redis backends."""
+    return getattr(cache.cache, '_write_client', None)
+
+
+def announce_snapshot(manifest: Dict):
+    """Announce a newly published snapshot to its league's SSE streams in every worker.
+
+    Args:
+        manifest: The published snapshot manifest
+    """
+    message = {
+        'league_id': manifest['league_id'],
+        'version': manifest['version'],
+        'etags': manifest['etags'],
+        'data_as_of': manifest['data_as_of']
+    }
+
+    client = _redis_client()
+    if client is None:
+        broadcaster.broadcast(message)
+        return
+
+    try:
+        client.publish(UPDATES_CHANNEL, json.dumps(message))
+    except Exception as e:
+        logger.error(f"Could not announce snapshot {manifest['version']}: {e}")
+
+
+def _listen(client):
+    """Relay channel messages to this process's streams, reconnecting on errors."""
+    while True:
+        try:
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(UPDATES_CHANNEL)
+            for item in pubsub.listen():
+                if item.get('type') == 'message':
+                    broadcaster.broadcast(json.loads(item['data']))
+        except Exception as e:
+            logger.error(f"Live update listener error: {e}")
+        time.sleep(RECONNECT_DELAY)
+
+
+def start_listener():
+    """Start this process's pub/sub listener thread (once, on the first stream)."""
+    global _listener
+    client = _redis_client()
+    if client is None:
+        return
+
+    with _listener_lock:
+        if _listener is None:
+            _listener = threading.Thread(target=_listen, args=(client,), name='live-updates', daemon=True)
+            _listener.start()
@@ -0,0 +1,174 @@
+"""Write-once on-disk archive of finalized weeks (SQLite).
+
+A playoff week that is over can never change, but its Yahoo data only lives
+in Redis for days (scoreboards) or minutes (rosters), so a Redis restart,
+eviction or fresh deploy would fetch the whole season's history again. Once
+a week is final its data is written here once, per league and season, and
+served from disk from then on; Yahoo is never asked for it again.
+
+    archive(league_id, season, week, kind, key) -> value
+
+- kind 'scoreboard': a final week's scoreboard (key '')
+- kind 'roster': a team's roster stats for a final week (key team_id)
+- kind 'bracket': the bracket checkpoint as of its last finalized week (key:
+  hash of the seeded teams and round schedule, so a re-seeded bracket never
+  resumes from an old one)
+
+Rows are never updated (INSERT OR IGNORE). Values are msgpack + zstd, using
+the cache codec (see app/utils/cache_codec.py), so the file stays readable
+without this code.
+
+The database lives at SEASON_ARCHIVE_PATH; on Fly.io that is on the
+persistent volume, so it survives deploys. Gunicorn workers share the file
+(WAL mode) and each thread keeps its own connection. An empty path disables
+the archive.
+"""
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from flask import current_app
+
+from app.utils.cache_codec import CodecSerializer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = 'data/season_archive.db'
+# Seconds a writer waits for another worker's write to finish
+BUSY_TIMEOUT = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive (
+    league_id TEXT NOT NULL,
+    season INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (league_id, season, kind, week, key)
+)
+"""
+
+
+class SeasonArchive:
+    """Immutable store of finalized weeks, per league and season."""
+
+    def __init__(self):
+        self._serializer = CodecSerializer(codec='msgpack', compression='zstd', compress_min_bytes=0)
+        self._local = threading.local()
+        self._initialized = set()
+        self._init_lock = threading.Lock()
+
+    @staticmethod
+    def _path() -> str:
+        return current_app.config.get('SEASON_ARCHIVE_PATH', DEFAULT_PATH)
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """This thread's connection to the archive, or None if it is disabled."""
+        path = self._path()
+        if not path:
+            return None
+
+        if not hasattr(self._local, 'connections'):
+            self._local.connections = {}
+        connections = self._local.connections
+        connection = connections.get(path)
+        if connection is None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            with self._init_lock:
+                if path not in self._initialized:
+                    connection.execute('PRAGMA journal_mode=WAL')
+                    connection.execute(_SCHEMA)
+                    self._initialized.add(path)
+            connections[path] = connection
+        return connection
+
+    def get(self, league_id, season: int, week: int, kind: str, key: str = '') -> Optional[Any]:
+        """Read one archived value.
+
+        Returns:
+            The value, or None if it is not archived (or the archive is unavailable)
+        """
+        return self.get_many(league_id, season, week, kind, [key]).get(key)
+
+    def get_many(self, league_id, season: int, week: int, kind: str, keys: Iterable[str]) -> Dict[str, Any]:
+        """Read several archived values of one week and kind.
+
+        Returns:
+            Dict mapping each archived key to its value (missing keys are omitted)
+        """
+        keys = [str(key) for key in keys]
+        try:
+            connection = self._connection()
+            if connection is None or not keys:
+                return {}
+            rows = connection.execute(
+                f"SELECT key, value FROM archive WHERE league_id = ? AND season = ? AND kind = ? AND week = ?"
+                f" AND key IN ({','.join('?' * len(keys))})",
+                (str(league_id), season, kind, week, *keys)
+            ).fetchall()
+        except Exception as e:
+            logger.error(f"Season archive read failed ({kind} week {week}): {e}")
+            return {}
+        return {key: self._serializer.loads(value) for key, value in rows}
+
+    def latest(self, league_id, season: int, kind: str, key: str = '') -> Optional[Any]:
+        """Read the value archived for the latest week of a kind and key."""
+        try:
+            connection = self._connection()
+            if connection is None:
+                return None
+            row = connection.execute(
+                "SELECT value FROM archive WHERE league_id = ? AND season = ? AND kind = ? AND key = ?"
+                " ORDER BY week DESC LIMIT 1",
+                (str(league_id), season, kind, key)
+            ).fetchone()
+        except Exception as e:
+            logger.error(f"Season archive read failed ({kind}): {e}")
+            return None
+        return self._serializer.loads(row[0]) if row else None
+
+    def put(self, league_id, season: int, week: int, kind: str, value: Any, key: str = '') -> bool:
+        """Archive one value (a no-op if it is already archived)."""
+        return self.put_many(league_id, season, week, kind, {key: value})
+
+    def put_many(self, league_id, season: int, week: int, kind: str, values: Dict[str, Any]) -> bool:
+        """Archive several values of one week and kind in one transaction.
+
+        Args:
+            league_id: League ID
+            season: Season year
+            week: Finalized week
+            kind: 'scoreboard', 'roster' or 'bracket'
+            values: Dict mapping key to value; keys already archived are kept
+
+        Returns:
+            True if the values are archived
+        """
+        try:
+            connection = self._connection()
+            if connection is None:
+                return False
+            rows = [
+                (str(league_id), season, week, kind, str(key), self._serializer.dumps(value))
+                for key, value in values.items()
+            ]
+            with connection:
+                connection.execute('BEGIN')
+                connection.executemany(
+                    "INSERT OR IGNORE INTO archive (league_id, season, week, kind, key, value)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+        except Exception as e:
+            logger.error(f"Season archive write failed ({kind} week {week}): {e}")
+            return False
+        return True
+
+
+season_archive = SeasonArchive()
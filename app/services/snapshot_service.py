@@ -0,0 +1,594 @@
+"""Background bracket snapshot builder and publisher.
+
+The complete bracket (standings, bracket structure, results and rosters) is
+built off the request path by a scheduler thread and published to the shared
+cache (Redis). The HTMX endpoints only ever read the published snapshot, so
+request latency no longer depends on Yahoo latency and the Yahoo call rate no
+longer depends on the number of viewers.
+
+A snapshot is published as separate component keys under one version, so an
+endpoint reads only what it renders (e.g. one roster for a modal) instead of
+decoding the whole league:
+
+    bracket_snapshot:<league_id>:<version>:bracket
+    bracket_snapshot:<league_id>:<version>:status
+    bracket_snapshot:<league_id>:<version>:standings
+    bracket_snapshot:<league_id>:<version>:roster:<team_id>:<week>
+
+The components are written first and the manifest key
+(bracket_snapshot:<league_id>:current) is switched to the new version last,
+in a single SET, so readers always see one complete version.
+
+One refresher thread per process serves every league (see
+SnapshotRefresher): each active league is rebuilt once per its game-clock
+interval (see game_clock.py), at a phase spread evenly across the interval.
+"""
+import logging
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app
+
+from app import cache
+from app.services.bracket_service import BracketService, advancement_table
+from app.services.game_clock import game_clock
+from app.services.live_updates import announce_snapshot
+from app.services.season_archive import season_archive
+from app.utils import metrics, profiler, timing
+from app.utils.http_cache import content_hash
+from app.utils.swr_cache import revalidate_inline
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_PREFIX = 'bracket_snapshot'
+CHECKPOINT_PREFIX = 'bracket_checkpoint'
+
+
+def manifest_key(league_id) -> str:
+    """Cache key of a league's current snapshot manifest."""
+    return f'{SNAPSHOT_PREFIX}:{league_id}:current'
+
+
+def lock_key(league_id) -> str:
+    """Cache key of a league's rebuild lock."""
+    return f'{SNAPSHOT_PREFIX}:{league_id}:lock'
+
+
+def roster_component(team_id, week) -> str:
+    """Name of the snapshot component holding one team's roster for a week."""
+    return f'roster:{team_id}:{week}'
+
+
+class SnapshotService:
+    """Builds, publishes and reads the bracket snapshot."""
+
+    def __init__(self, yahoo_service, snapshot_ttl: int = 3600):
+        """Initialize snapshot service.
+
+        Args:
+            yahoo_service: YahooService instance used to build snapshots
+            snapshot_ttl: Seconds a published snapshot stays readable past its
+                next scheduled rebuild, so viewers keep seeing the last good
+                bracket if Yahoo is unavailable for a while.
+        """
+        self.yahoo = yahoo_service
+        self.snapshot_ttl = snapshot_ttl
+
+    @timing.timed('snapshot.build')
+    def build(self) -> Optional[Dict]:
+        """Build the complete bracket with all data.
+
+        Optimized to only fetch playoff weeks that have started, and to only
+        recompute weeks that can still change: once a playoff week and every
+        week before it is complete, the bracket is checkpointed (with that
+        week's rosters) and later builds resume from the checkpoint, fetching
+        and scoring only the weeks after it.
+
+        Caching strategy (underneath the snapshot):
+        - Scoreboards and rosters: game-clock interval for the active week (15s
+          while games are on, hours otherwise), 24h+ for completed weeks
+          (smart caching; one roster call per team-week feeds both the roster
+          views and starter-point totals)
+        - Standings: 60 seconds
+
+        Yahoo data past its soft TTL is refetched before use (stale values are
+        only used if that fails), so a snapshot is never a refresh behind.
+
+        Returns:
+            Dict with bracket, current_week, bracket_status, standings, rosters,
+            built_at and data_as_of, or None if the bracket could not be built
+        """
+        with revalidate_inline():
+            return self._build()
+
+    def _build(self) -> Optional[Dict]:
+        """Build the snapshot (see build), in a thread that revalidates stale data inline."""
+        yahoo = self.yahoo
+        bracket_svc = BracketService()
+
+        # Executor threads need the app context to reach the cache (and report
+        # their spans and stack samples to this build, and refetch stale data)
+        app = current_app._get_current_object()
+        timings = timing.current_timings()
+        profile = profiler.current_profile()
+
+        def in_app_context(fn, *args):
+            with app.app_context(), timing.attach(timings), profiler.attach(profile), revalidate_inline():
+                return fn(*args)
+
+        if yahoo.async_client:
+            # Async engine: one event-loop gather warms standings + league info
+            yahoo.prefetch()
+            standings = yahoo.get_league_standings()
+            current_week = yahoo.get_current_week()
+        else:
+            # Parallelize initial data fetching
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                # Fetch standings and current week in parallel
+                standings_future = metrics.submit_counted(
+                    executor, 'snapshot_build', in_app_context, yahoo.get_league_standings
+                )
+                current_week_future = metrics.submit_counted(
+                    executor, 'snapshot_build', in_app_context, yahoo.get_current_week
+                )
+
+                standings = standings_future.result()
+                current_week = current_week_future.result()
+
+        if not standings:
+            return None
+
+        # Get Waffle Bowl teams (bottom N)
+        waffle_teams = bracket_svc.get_waffle_bowl_teams(standings)
+
+        # Create bracket structure (the final is played in the league's last week)
+        league_info = yahoo.get_league_info() or {}
+        bracket = bracket_svc.create_bracket_structure(waffle_teams, current_week, league_info.get('end_week'))
+        if 'error' in bracket:
+            logger.error(f"Cannot build bracket: {bracket['error']}")
+            return None
+
+        # Fetch ALL completed and active playoff weeks (not future weeks)
+        weeks_to_fetch = [round_data['week'] for round_data in bracket['rounds'] if current_week >= round_data['week']]
+
+        rosters = {}
+        team_points_by_week = {}
+
+        # Initialize nested dicts for all teams
+        for team in waffle_teams:
+            team_id = team['team_id']
+            rosters[team_id] = {}
+            team_points_by_week[team_id] = {}
+
+        # Resume from the checkpoint of finalized weeks; only the weeks after
+        # it are fetched and scored again
+        checkpoint_key = f'{CHECKPOINT_PREFIX}:{yahoo.league_id}:{yahoo.season}'
+        finalized_weeks = []
+        checkpoint = self._load_checkpoint(checkpoint_key, bracket, weeks_to_fetch)
+        if checkpoint:
+            bracket = BracketService.relink_teams(checkpoint['bracket'])
+            finalized_weeks = list(checkpoint['weeks'])
+            for team_id, weeks in checkpoint['rosters'].items():
+                rosters[team_id].update(weeks)
+        live_weeks = weeks_to_fetch[len(finalized_weeks):]
+
+        # Pre-fetch rosters for ALL weeks we're fetching scores for - one
+        # batched Yahoo request per week instead of one per team per week
+        if live_weeks:
+            team_ids = [team['team_id'] for team in waffle_teams]
+
+            if yahoo.async_client:
+                # Async engine: one gather fetches every week's scoreboard and
+                # batched rosters; the reads below are then cache hits
+                yahoo.prefetch(team_ids, live_weeks)
+                batches = {week: yahoo.get_team_rosters(team_ids, week) for week in live_weeks}
+            else:
+                batches = self._fetch_roster_batches(team_ids, live_weeks, in_app_context)
+
+            for week, week_rosters in batches.items():
+                for team_id in team_ids:
+                    roster = week_rosters.get(str(team_id))
+                    if not roster:
+                        # Fall back to a single-team fetch if the batch missed it
+                        try:
+                            roster = yahoo.get_team_roster(team_id, week)
+                        except Exception as e:
+                            logger.error(f"Error fetching roster for team {team_id}, week {week}: {e}")
+                            continue
+                    if roster:
+                        rosters[team_id][week] = roster
+
+                        # Calculate points from roster (starters only)
+                        team_points_by_week[team_id][week] = yahoo.starter_points(roster)
+
+        # Fetch scoreboards for ALL relevant weeks and update bracket incrementally
+        built_at = time.time()
+        data_as_of = built_at
+        statuses, scores = [], {}
+        for week in live_weeks:
+            scoreboard = yahoo.get_scoreboard(week)
+            if scoreboard is None:
+                # Never cached and not fetched (Yahoo down, or the call was
+                # deferred by the quota) - keep the previous snapshot
+                logger.info(f"No scoreboard for week {week}; keeping previous snapshot")
+                return None
+            if scoreboard:
+                # Scoreboards may be served stale during Yahoo brownouts
+                data_as_of = min(data_as_of, scoreboard.get('fetched_at', built_at))
+                if week == current_week:
+                    statuses = [matchup.get('status') for matchup in scoreboard.get('matchups', [])]
+                    scores = {
+                        team_id: score.get('points') for team_id, score in scoreboard.get('team_scores', {}).items()
+                    }
+
+                # Merge roster-calculated points for missing teams so the
+                # bracket never needs a separate points fetch for them
+                if 'team_scores' not in scoreboard:
+                    scoreboard['team_scores'] = {}
+
+                for team_id, weeks_data in team_points_by_week.items():
+                    if week in weeks_data and str(team_id) not in scoreboard['team_scores']:
+                        scoreboard['team_scores'][str(team_id)] = {
+                            'team_id': str(team_id),
+                            'points': weeks_data[week],
+                            'week': week
+                        }
+
+                # Update bracket with this week's results
+                # This will progressively update QF, then SF, then Final
+                bracket = bracket_svc.update_bracket_with_results(
+                    bracket, scoreboard, yahoo_service=yahoo, current_week=current_week
+                )
+
+                # Checkpoint the bracket as soon as a week (and every week
+                # before it) is final - its results can no longer change,
+                # stat corrections included (see YahooService.is_week_final)
+                if (len(finalized_weeks) == weeks_to_fetch.index(week)
+                        and yahoo.is_week_final(week, current_week, scoreboard)):
+                    finalized_weeks.append(week)
+                    self._save_checkpoint(checkpoint_key, bracket, finalized_weeks, rosters)
+
+        # Get bracket status
+        bracket_status = bracket_svc.get_bracket_status(bracket, current_week)
+
+        # The active week's matchup statuses drive the refresh cadence; once
+        # the bracket is decided nothing it shows can change
+        if bracket_status['status'] == 'complete':
+            statuses = ['postevent']
+        game_clock.remember(yahoo.league_id, statuses, scores)
+
+        return {
+            'bracket': bracket,
+            'current_week': current_week,
+            'bracket_status': bracket_status,
+            'standings': standings,
+            'rosters': rosters,  # All rosters pre-fetched
+            'built_at': built_at,
+            'data_as_of': data_as_of  # Oldest scoreboard fetch time
+        }
+
+    @staticmethod
+    def _round_layout(bracket: Dict) -> List[List]:
+        """Id, week and matchup slot sources of every round.
+
+        The slot sources are part of the layout so checkpoints saved under a
+        different slot order are discarded instead of refilled wrongly.
+        """
+        table = advancement_table(bracket['num_teams'])
+        return [
+            [round_data['id'], round_data['week'],
+             [[list(source) for source in pair] for pair in round_spec['matchups']]]
+            for round_data, round_spec in zip(bracket['rounds'], table)
+        ]
+
+    def _archive_key(self, bracket: Dict) -> str:
+        """Season archive key of a bracket's checkpoints (its seeded teams and round layout)."""
+        return content_hash([[team['team_id'] for team in bracket['teams']], self._round_layout(bracket)])
+
+    @timing.timed('bracket.checkpoint')
+    def _load_checkpoint(self, key: str, bracket: Dict, weeks_to_fetch: List[int]) -> Optional[Dict]:
+        """Load the finalized-weeks checkpoint if it still matches this bracket.
+
+        Args:
+            key: Checkpoint cache key (per league and season)
+            bracket: Freshly created bracket structure (no results yet)
+            weeks_to_fetch: Playoff weeks that have started
+
+        Returns:
+            Checkpoint dict with bracket, weeks, team_ids, round_layout and
+            rosters, or None if there is no usable checkpoint
+        """
+        checkpoint = cache.get(key)
+        if not checkpoint:
+            # Cache flushed or evicted - resume from the season archive instead
+            # of fetching every finalized week from Yahoo again
+            checkpoint = season_archive.latest(
+                self.yahoo.league_id, self.yahoo.season, 'bracket', self._archive_key(bracket)
+            )
+            if not checkpoint:
+                return None
+
+        weeks = checkpoint.get('weeks', [])
+        if (checkpoint.get('team_ids') != [team['team_id'] for team in bracket['teams']]
+                or checkpoint.get('round_layout') != self._round_layout(bracket)
+                or weeks != weeks_to_fetch[:len(weeks)]):
+            # Seeds or schedule changed (or the clock went back) - start over
+            logger.info(f"Discarding bracket checkpoint {key} (weeks {weeks})")
+            return None
+
+        return checkpoint
+
+    @timing.timed('bracket.checkpoint')
+    def _save_checkpoint(self, key: str, bracket: Dict, weeks: List[int], rosters: Dict):
+        """Save the bracket as of its finalized weeks, with those weeks' rosters."""
+        checkpoint = {
+            'bracket': bracket,
+            'weeks': list(weeks),
+            'team_ids': [team['team_id'] for team in bracket['teams']],
+            'round_layout': self._round_layout(bracket),
+            'rosters': {
+                team_id: {week: roster for week, roster in team_weeks.items() if week in weeks}
+                for team_id, team_weeks in rosters.items()
+            }
+        }
+        # Serialized now, so later (live) weeks' updates don't leak into it
+        cache.set(key, checkpoint, timeout=current_app.config.get('BRACKET_CHECKPOINT_TTL', 60 * 86400))
+        season_archive.put(
+            self.yahoo.league_id, self.yahoo.season, weeks[-1], 'bracket', checkpoint, self._archive_key(bracket)
+        )
+
+    def _fetch_roster_batches(self, team_ids, weeks, in_app_context) -> Dict[int, Dict]:
+        """Fetch each week's batched rosters in parallel threads (sync engine)."""
+        batches = {}
+        with ThreadPoolExecutor(max_workers=len(weeks)) as executor:
+            batch_futures = {
+                metrics.submit_counted(
+                    executor, 'snapshot_build', in_app_context, self.yahoo.get_team_rosters, team_ids, week
+                ): week
+                for week in weeks
+            }
+            for future in as_completed(batch_futures):
+                week = batch_futures[future]
+                try:
+                    batches[week] = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching rosters for week {week}: {e}")
+                    batches[week] = {}
+        return batches
+
+    @timing.timed('snapshot.publish')
+    def publish(self, snapshot: Dict):
+        """Publish a snapshot's components under a new version for all workers to read."""
+        version = str(int(snapshot['built_at'] * 1000))
+
+        components = {
+            'bracket': snapshot['bracket'],
+            'status': snapshot['bracket_status'],
+            'standings': snapshot['standings'],
+        }
+        for team_id, weeks in snapshot['rosters'].items():
+            for week, roster in weeks.items():
+                components[roster_component(team_id, week)] = roster
+
+        league_id = self.yahoo.league_id
+        # Outlive the next scheduled rebuild, which is up to a game-clock
+        # interval away (hours while idle or final)
+        timeout = self.snapshot_ttl + game_clock.interval(league_id)
+        keys = {f'{SNAPSHOT_PREFIX}:{league_id}:{version}:{name}': value for name, value in components.items()}
+        cache.set_many(keys, timeout=timeout)
+
+        # The previous version stays readable for requests already using it;
+        # the one before that is dropped now
+        previous = cache.get(manifest_key(league_id))
+        manifest = {
+            'league_id': league_id,
+            'version': version,
+            'current_week': snapshot['current_week'],
+            'built_at': snapshot['built_at'],
+            'data_as_of': snapshot['data_as_of'],
+            # Content hashes of each component, for fragment ETags
+            'etags': {name: content_hash(value) for name, value in components.items()},
+            'round_weeks': {round_data['id']: round_data['week'] for round_data in snapshot['bracket']['rounds']},
+            'keys': list(keys),
+            'previous_keys': previous['keys'] if previous else []
+        }
+        cache.set(manifest_key(league_id), manifest, timeout=timeout)
+
+        if previous and previous.get('previous_keys'):
+            cache.delete_many(*previous['previous_keys'])
+
+        # Push to open SSE streams in every worker
+        announce_snapshot(manifest)
+
+    @staticmethod
+    def read(league_id, *components: str) -> Tuple[Optional[Dict], List]:
+        """Read a league's current snapshot manifest and the named components.
+
+        This is the only read the HTMX endpoints make - the manifest plus one
+        batched GET for just the components they render.
+
+        Args:
+            league_id: League whose snapshot to read
+            components: Component names ('bracket', 'status', 'standings' or
+                roster_component(team_id, week))
+
+        Returns:
+            Tuple of (manifest, values). manifest holds league_id, version, current_week,
+            built_at, data_as_of, per-component content hashes (etags) and the
+            week of each round (round_weeks), and is None if nothing has been
+            published yet. Missing components are None.
+        """
+        for _ in range(2):
+            manifest = cache.get(manifest_key(league_id))
+            if manifest is None:
+                return None, [None] * len(components)
+
+            values = SnapshotService.read_components(manifest, *components)
+            if all(value is not None for value in values):
+                break
+
+            # A publish may have replaced this version mid-read; retry once
+            latest = cache.get(manifest_key(league_id))
+            if not latest or latest['version'] == manifest['version']:
+                break
+
+        return manifest, values
+
+    @staticmethod
+    def read_components(manifest: Dict, *components: str) -> List:
+        """Read more components of the snapshot version a manifest names (one batched GET).
+
+        Returns:
+            Component values in order; missing components are None
+        """
+        if not components:
+            return []
+        prefix = f"{SNAPSHOT_PREFIX}:{manifest['league_id']}:{manifest['version']}"
+        return cache.get_many(*(f'{prefix}:{name}' for name in components))
+
+    def refresh(self, interval: int) -> bool:
+        """Build and publish a new snapshot unless another worker just did.
+
+        A cache lock held for ``interval`` seconds ensures only one gunicorn
+        worker rebuilds per interval, keeping Yahoo traffic independent of the
+        number of workers as well as the number of viewers.
+
+        Args:
+            interval: Refresh interval in seconds (also the lock lifetime)
+
+        Returns:
+            True if this call published a new snapshot
+        """
+        league_lock = lock_key(self.yahoo.league_id)
+        if not cache.add(league_lock, True, timeout=interval):
+            return False
+
+        # Spans of the build land in the 'snapshot_refresh' timing histograms;
+        # picked builds are also profiled (PROFILE_SAMPLE_RATE)
+        with timing.collect('snapshot_refresh'), profiler.profile('snapshot_refresh'):
+            started = time.perf_counter()
+            try:
+                snapshot = self.build()
+            except Exception as e:
+                logger.error(f"Error building bracket snapshot: {e}")
+                snapshot = None
+            metrics.observe_snapshot_build(time.perf_counter() - started, bool(snapshot))
+
+            if not snapshot:
+                # Keep serving the previous snapshot; let the next tick retry
+                cache.delete(league_lock)
+                return False
+
+            self.publish(snapshot)
+        return True
+
+
+class SnapshotRefresher(threading.Thread):
+    """Daemon thread that rebuilds every active league's snapshot on its game-clock cadence.
+
+    Each league is refreshed once per its current interval (game_clock: short
+    while NFL games are on, hours otherwise) at its own phase (its position
+    among the configured leagues spread evenly across the interval, on the
+    wall clock so every worker agrees), which keeps Yahoo traffic smooth as
+    leagues are added. Leagues nobody is viewing are skipped.
+    """
+
+    def __init__(self, app, interval: int):
+        """Initialize the refresher.
+
+        Args:
+            app: Flask application
+            interval: Shortest rebuild interval in seconds (also the rebuild
+                lock lifetime)
+        """
+        super().__init__(name='snapshot-refresher', daemon=True)
+        self.app = app
+        self.interval = interval
+        self._wake = threading.Event()
+        self._requested = set()
+        self._requested_lock = threading.Lock()
+
+    def wake(self, league_id=None):
+        """Ask the refresher to refresh a league now instead of at its next turn."""
+        with self._requested_lock:
+            self._requested.add(league_id)
+        self._wake.set()
+
+    @staticmethod
+    def _next_run(league_id, league_ids: List, now: float, interval: int) -> float:
+        """Next time a league is due: the next multiple of its interval after now, offset by its phase."""
+        index = league_ids.index(league_id) if league_id in league_ids else 0
+        phase = interval * index / max(len(league_ids), 1)
+        return phase + interval * (math.floor((now - phase) / interval) + 1)
+
+    def run(self):
+        from app import get_league_registry
+
+        next_run = {}
+        while True:
+            # Clear before taking the requested leagues: a wake() landing after
+            # this point keeps the event set, so the wait below returns at once
+            self._wake.clear()
+            timeout = self.interval
+            try:
+                with self.app.app_context():
+                    registry = get_league_registry()
+                    with self._requested_lock:
+                        requested = {league_id or registry.default_league for league_id in self._requested}
+                        self._requested.clear()
+
+                    active = registry.active_leagues()
+                    for league_id in active:
+                        if league_id not in requested and next_run.get(league_id, 0) > time.time():
+                            continue
+                        try:
+                            service = SnapshotService(
+                                registry.get(league_id),
+                                snapshot_ttl=self.app.config['SNAPSHOT_TTL']
+                            )
+                            service.refresh(self.interval)
+                        except Exception as e:
+                            logger.error(f"Snapshot refresh of league {league_id} failed: {e}")
+                        interval = max(self.interval, game_clock.interval(league_id))
+                        next_run[league_id] = self._next_run(league_id, registry.league_ids, time.time(), interval)
+
+                    if active:
+                        timeout = max(0, min(next_run[league_id] for league_id in active) - time.time())
+            except Exception as e:
+                logger.error(f"Snapshot refresher error: {e}")
+
+            self._wake.wait(timeout)
+
+
+_refresher = None
+
+
+def start_snapshot_refresher(app) -> Optional[SnapshotRefresher]:
+    """Start the background snapshot refresher for this process (once).
+
+    Args:
+        app: Flask application
+
+    Returns:
+        The running SnapshotRefresher, or None if disabled by config
+    """
+    global _refresher
+    if not app.config.get('SNAPSHOT_REFRESHER_ENABLED', True):
+        return None
+    if _refresher is None:
+        _refresher = SnapshotRefresher(app, app.config['SNAPSHOT_REFRESH_INTERVAL'])
+        _refresher.start()
+    return _refresher
+
+
+def request_snapshot_refresh(league_id=None):
+    """Wake this process's refresher for a league (e.g. when no snapshot is published yet).
+
+    Args:
+        league_id: League to refresh (the default league if not provided)
+    """
+    if _refresher is not None:
+        _refresher.wake(league_id)
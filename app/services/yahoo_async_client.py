@@ -0,0 +1,195 @@
+"""Optional asyncio Yahoo client (httpx) for the bracket build path.
+
+Covers only the endpoints the tracker uses (league metadata, standings,
+scoreboard by week, team roster stats by week, batched team rosters). Uses
+the OAuth tokens managed by yfpy and returns the same yfpy model objects, so
+YahooService parses the results exactly as it does for the sync path.
+
+A single long-lived event loop runs in a daemon thread and owns one
+httpx.AsyncClient, so the connection pool and HTTP keep-alive survive across
+bracket builds. Concurrency is bounded by a semaphore and every request has
+explicit connect/read timeouts. Queries take the league key per call, so one
+client (see shared_client) serves every league.
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, List, Type
+
+import httpx
+from yfpy.exceptions import YahooFantasySportsDataNotFound, YahooFantasySportsException
+from yfpy.models import League, Scoreboard, Standings, YahooFantasyObject
+from yfpy.utils import reformat_json_list, unpack_data
+
+from app.services.yahoo_http import THROTTLED_STATUSES
+from app.services.yahoo_quota import yahoo_quota
+from app.utils.metrics import yahoo_call
+
+logger = logging.getLogger(__name__)
+
+BASE_URL = 'https://fantasysports.yahooapis.com/fantasy/v2'
+
+
+class AsyncYahooClient:
+    """Asyncio Yahoo Fantasy API client with a shared connection pool."""
+
+    def __init__(self, oauth, max_concurrency: int = 8, timeout: float = 10.0, connect_timeout: float = 3.0,
+                 transport: httpx.AsyncBaseTransport = None):
+        """Initialize the async client.
+
+        Args:
+            oauth: yahoo_oauth OAuth2 instance owned by the yfpy query
+            max_concurrency: Maximum in-flight Yahoo requests (also the pool size)
+            timeout: Per-request read timeout in seconds
+            connect_timeout: Per-request connect timeout in seconds
+            transport: httpx transport to send requests through instead of
+                the network (fixture replay, see yahoo_fixtures.py)
+        """
+        self.oauth = oauth
+        self.transport = transport
+        self.max_concurrency = max_concurrency
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+
+        self._token = None
+        self._token_lock = threading.Lock()
+        self._client = None
+        self._semaphore = None
+        self._throttled = False
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='yahoo-async-loop', daemon=True)
+        self._thread.start()
+
+    def gather(self, calls: List[Callable[[], Awaitable[Any]]]) -> List[Any]:
+        """Run coroutine factories concurrently in one event-loop gather.
+
+        Args:
+            calls: Zero-argument callables returning coroutines (e.g. lambdas
+                around this client's query methods)
+
+        Returns:
+            Results in call order; failed calls return their exception
+        """
+        self._refresh_token()
+
+        async def run_all():
+            self._ensure_client()
+            return await asyncio.gather(*(call() for call in calls), return_exceptions=True)
+
+        results = asyncio.run_coroutine_threadsafe(run_all(), self._loop).result()
+
+        # Reported from the caller's thread, which has the app context
+        if self._throttled:
+            self._throttled = False
+            yahoo_quota.throttled()
+        return results
+
+    def _refresh_token(self):
+        """Refresh the OAuth access token through yfpy's OAuth2 if needed."""
+        with self._token_lock:
+            if not self.oauth.token_is_valid():
+                self.oauth.refresh_access_token()
+            self._token = self.oauth.access_token
+
+    def _ensure_client(self):
+        """Create the pooled client on the loop thread (once)."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                transport=self.transport,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency
+                )
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def _query(self, method: str, path: str, data_key_list: List[str], data_type_class: Type = None) -> Any:
+        """Fetch a Yahoo resource and unpack it the same way yfpy's query() does.
+
+        Args:
+            method: Metric label of the resource (see app/utils/metrics.py)
+        """
+        async with self._semaphore:
+            with yahoo_call(method):
+                response = await self._client.get(
+                    f'{BASE_URL}/{path}',
+                    params={'format': 'json'},
+                    headers={'Authorization': f'Bearer {self._token}'}
+                )
+
+                # Yahoo signals rate limiting with a non-standard 999 status (or 429)
+                if response.status_code in THROTTLED_STATUSES:
+                    self._throttled = True
+                    raise YahooFantasySportsException(
+                        "Yahoo data unavailable due to rate limiting. Please try again later.", url=str(response.url)
+                    )
+                response.raise_for_status()
+
+        data = response.json().get('fantasy_content')
+        for key in data_key_list:
+            if not data:
+                break
+            data = reformat_json_list(data)[key] if isinstance(data, list) else data.get(key)
+
+        if not data:
+            raise YahooFantasySportsDataNotFound(
+                f"No data found when attempting extraction from fields: {data_key_list}",
+                payload=data_key_list, url=str(response.url)
+            )
+
+        unpacked = unpack_data(data, YahooFantasyObject)
+        result = data_type_class(unpacked) if data_type_class else unpacked
+
+        # Flatten lists of single-key dicts ({'player': Player}) like yfpy does
+        if isinstance(result, list):
+            last_key = data_key_list[-1]
+            if last_key.endswith('s'):
+                result = [el[last_key[:-1]] for el in result]
+        return result
+
+    async def get_league_metadata(self, league_key: str) -> League:
+        return await self._query('league_info', f'league/{league_key}/metadata', ['league'], League)
+
+    async def get_league_standings(self, league_key: str) -> Standings:
+        return await self._query('standings', f'league/{league_key}/standings', ['league', 'standings'], Standings)
+
+    async def get_league_scoreboard_by_week(self, league_key: str, week: int) -> Scoreboard:
+        return await self._query(
+            'scoreboard', f'league/{league_key}/scoreboard;week={week}', ['league', 'scoreboard'], Scoreboard
+        )
+
+    async def get_team_roster_player_stats_by_week(self, team_key: str, week: int) -> List:
+        return await self._query(
+            'roster',
+            f'team/{team_key}/roster;week={week}/players/stats',
+            ['team', 'roster', '0', 'players']
+        )
+
+    async def get_teams_roster_player_stats_by_week(self, team_keys: List[str], week: int) -> Any:
+        return await self._query(
+            'rosters',
+            f'teams;team_keys={",".join(team_keys)}/roster;week={week}/players/stats',
+            ['teams']
+        )
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def shared_client(oauth, **kwargs) -> AsyncYahooClient:
+    """Get the process-wide client, creating it on first use.
+
+    Args:
+        oauth: yahoo_oauth OAuth2 instance (shared by every league's yfpy query)
+        kwargs: AsyncYahooClient options, used when the client is created
+
+    Returns:
+        The AsyncYahooClient shared by all leagues in this process
+    """
+    global _shared_client
+    with _shared_client_lock:
+        if _shared_client is None:
+            _shared_client = AsyncYahooClient(oauth, **kwargs)
+        return _shared_client
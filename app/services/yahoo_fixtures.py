@@ -0,0 +1,293 @@
+"""Recorded Yahoo responses: recorder, replay backend and fault injection.
+
+Selected with YAHOO_BACKEND:
+
+- live (default): talk to Yahoo
+- record: talk to Yahoo and save every successful response as a fixture
+  (sync engine; see app/utils/record_fixtures.py)
+- replay: never talk to Yahoo; answer every request from the fixtures, with
+  optional injected latency (YAHOO_REPLAY_LATENCY, seconds, jittered
+  +/-50%) and errors (YAHOO_REPLAY_ERROR_RATE, fraction of requests
+  answered 503)
+
+Replay works at the HTTP layer, for both engines (a requests adapter for
+yfpy, an httpx transport for the async client), so yfpy unpacking and our
+parsing run exactly as they do against Yahoo. That makes the whole
+request path - bracket builds and the /api/* routes - runnable without
+Yahoo tokens, e.g. by benchmarks/load_test.py.
+
+Fixtures are the raw Yahoo JSON bodies, one file per resource path, under
+YAHOO_FIXTURES_DIR/<season>/<league_id>/. Replay uses the season in
+YAHOO_FIXTURES_SEASON, so game and league keys match the recording.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import unquote, urlsplit
+
+import httpx
+from requests import Response, Session
+from requests.adapters import BaseAdapter
+from yfpy.query import YahooFantasySportsQuery
+
+logger = logging.getLogger(__name__)
+
+API_PREFIX = '/fantasy/v2/'
+DEFAULT_FIXTURES_DIR = 'fixtures/yahoo'
+# Longer resource paths (batched team keys) are shortened and hashed
+MAX_SLUG_LENGTH = 120
+
+
+def fixture_path(url: str) -> str:
+    """Resource path a fixture is stored under (query string dropped, team key lists sorted).
+
+    Args:
+        url: Yahoo API request URL
+
+    Returns:
+        Path after /fantasy/v2/, e.g. 'league/461.l.1/scoreboard;week=15'
+    """
+    path = unquote(urlsplit(url).path)
+    if API_PREFIX in path:
+        path = path.split(API_PREFIX, 1)[1]
+    # Batched rosters are requested in seed order by one engine and sorted by the other
+    return re.sub(
+        r'team_keys=([^/;]+)',
+        lambda match: 'team_keys=' + ','.join(sorted(match.group(1).split(','))),
+        path.strip('/')
+    )
+
+
+class FixtureStore:
+    """Yahoo response bodies of one league and season, one JSON file per resource path."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def _file(self, path: str) -> str:
+        slug = re.sub(r'[^A-Za-z0-9.=,-]+', '_', path)
+        if len(slug) > MAX_SLUG_LENGTH:
+            digest = hashlib.blake2b(path.encode('utf-8'), digest_size=8).hexdigest()
+            slug = f'{slug[:MAX_SLUG_LENGTH - 17]}-{digest}'
+        return os.path.join(self.directory, f'{slug}.json')
+
+    def save(self, path: str, body: bytes):
+        """Store a response body (pretty-printed, so recordings diff well)."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._file(path), 'w') as f:
+            json.dump(json.loads(body), f, indent=1, sort_keys=True)
+        with self._lock:
+            self._bodies.pop(path, None)
+
+    def load(self, path: str) -> Optional[bytes]:
+        """A stored response body, or None if the path was never recorded."""
+        with self._lock:
+            if path in self._bodies:
+                return self._bodies[path]
+        try:
+            with open(self._file(path), 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            body = None
+        with self._lock:
+            self._bodies[path] = body
+        return body
+
+    def __len__(self) -> int:
+        try:
+            return sum(1 for name in os.listdir(self.directory) if name.endswith('.json'))
+        except FileNotFoundError:
+            return 0
+
+
+class FaultInjector:
+    """Latency and errors injected into replayed responses; counts the requests served."""
+
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = None):
+        """Initialize fault injection.
+
+        Args:
+            latency: Mean seconds each response takes (jittered +/-50%)
+            error_rate: Fraction of requests answered with a 503
+            seed: Random seed (for reproducible runs)
+        """
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+    def next(self):
+        """Draw the next response's fate.
+
+        Returns:
+            Tuple of (delay in seconds, fail)
+        """
+        with self._lock:
+            self.requests += 1
+            delay = self.latency * self._random.uniform(0.5, 1.5) if self.latency else 0.0
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        return delay, fail
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {'requests': self.requests, 'errors': self.errors}
+
+
+def _replay_body(store: FixtureStore, url: str, fail: bool):
+    """Status, content type and body replayed for a request URL."""
+    if fail:
+        # Like a Yahoo brownout: an HTML/text error page, not JSON
+        return 503, 'text/plain', b'Service Unavailable'
+
+    path = fixture_path(url)
+    body = store.load(path)
+    if body is None:
+        logger.warning(f"No Yahoo fixture for {path}")
+        return 404, 'application/json', json.dumps({'error': {'description': f'No fixture for {path}'}}).encode('utf-8')
+    return 200, 'application/json', body
+
+
+class RecordingAdapter(BaseAdapter):
+    """requests adapter that saves every successful Yahoo response to a fixture store."""
+
+    def __init__(self, inner: BaseAdapter, store: FixtureStore):
+        super().__init__()
+        self.inner = inner
+        self.store = store
+
+    def send(self, request, **kwargs):
+        response = self.inner.send(request, **kwargs)
+        if response.status_code == 200:
+            try:
+                self.store.save(fixture_path(request.url), response.content)
+            except Exception as e:
+                logger.error(f"Could not record {request.url}: {e}")
+        return response
+
+    def close(self):
+        self.inner.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    """requests adapter answering from a fixture store instead of Yahoo."""
+
+    def __init__(self, store: FixtureStore, faults: FaultInjector):
+        super().__init__()
+        self.store = store
+        self.faults = faults
+
+    def send(self, request, **kwargs):
+        delay, fail = self.faults.next()
+        if delay:
+            time.sleep(delay)
+        status, content_type, body = _replay_body(self.store, request.url, fail)
+
+        response = Response()
+        response.status_code = status
+        response._content = body
+        response.headers['Content-Type'] = content_type
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """httpx transport answering from a fixture store (async engine)."""
+
+    def __init__(self, store: FixtureStore, faults: FaultInjector):
+        self.store = store
+        self.faults = faults
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        delay, fail = self.faults.next()
+        if delay:
+            await asyncio.sleep(delay)
+        status, content_type, body = _replay_body(self.store, str(request.url), fail)
+        return httpx.Response(status, content=body, headers={'Content-Type': content_type}, request=request)
+
+
+class ReplayOAuth:
+    """Stand-in for yahoo_oauth's OAuth2: a session (and transport) that replay fixtures."""
+
+    access_token = 'replay'
+
+    def __init__(self, store: FixtureStore, faults: FaultInjector):
+        self.session = Session()
+        adapter = ReplayAdapter(store, faults)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.transport = ReplayTransport(store, faults)
+
+    def token_is_valid(self) -> bool:
+        return True
+
+    def refresh_access_token(self):
+        pass
+
+
+class ReplayYahooQuery(YahooFantasySportsQuery):
+    """yfpy query served from recorded fixtures (no credentials needed)."""
+
+    def __init__(self, *args, store: FixtureStore, faults: FaultInjector, **kwargs):
+        # Set before super().__init__, which authenticates immediately
+        self._store = store
+        self._faults = faults
+        super().__init__(*args, **kwargs)
+
+    def _authenticate(self) -> None:
+        self.oauth = ReplayOAuth(self._store, self._faults)
+
+
+def record_session(session, store: FixtureStore):
+    """Save every successful response of a requests session to a fixture store (in place)."""
+    inner = session.get_adapter('https://')
+    if isinstance(inner, RecordingAdapter):
+        return
+    adapter = RecordingAdapter(inner, store)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+
+_stores = {}
+_faults = None
+_registry_lock = threading.Lock()
+
+
+def fixture_store(league_id, season: int) -> FixtureStore:
+    """The fixture store of a league and season under YAHOO_FIXTURES_DIR (one per process)."""
+    directory = os.path.join(os.getenv('YAHOO_FIXTURES_DIR', DEFAULT_FIXTURES_DIR), str(season), str(league_id))
+    with _registry_lock:
+        if directory not in _stores:
+            _stores[directory] = FixtureStore(directory)
+        return _stores[directory]
+
+
+def replay_faults() -> FaultInjector:
+    """The process-wide fault injector (YAHOO_REPLAY_LATENCY, YAHOO_REPLAY_ERROR_RATE, YAHOO_REPLAY_SEED)."""
+    global _faults
+    with _registry_lock:
+        if _faults is None:
+            seed = os.getenv('YAHOO_REPLAY_SEED')
+            _faults = FaultInjector(
+                latency=float(os.getenv('YAHOO_REPLAY_LATENCY', 0)),
+                error_rate=float(os.getenv('YAHOO_REPLAY_ERROR_RATE', 0)),
+                seed=int(seed) if seed else None
+            )
+        return _faults
@@ -0,0 +1,112 @@
+"""Pooled, bounded HTTP session for the sync (yfpy) Yahoo engine.
+
+yfpy sends every request through the requests session of its yahoo_oauth
+OAuth2 object, which by default has a small connection pool, no retries and
+a 300s timeout. PooledYahooQuery tunes that session once per
+authentication:
+
+- connection pool sized to our request parallelism, so concurrent roster and
+  scoreboard fetches reuse kept-alive TLS connections instead of opening new
+  ones
+- explicit connect/read timeouts, so a hung Yahoo socket cannot hold a
+  gunicorn thread until the worker timeout
+- retry with exponential backoff on connection errors and 5xx, as the only
+  retry layer: yfpy's own retries (which re-send any non-2xx, 429 included,
+  with no backoff to speak of) are turned off
+- rate limiting (429, or Yahoo's 999) is never retried here: it empties the
+  shared call budget (see yahoo_quota.py) so every worker backs off, and
+  the next attempt goes through yahoo_quota.acquire like any other call
+
+Every league's query shares one authenticated OAuth2 session (per token
+directory), so serving many leagues does not multiply connection pools or
+token refreshes.
+"""
+import logging
+import threading
+from typing import Tuple
+
+from requests import Session
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from yfpy.query import YahooFantasySportsQuery
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (500, 502, 503, 504)
+# Yahoo rate limiting: left to the shared quota, never retried by the session
+THROTTLED_STATUSES = (429, 999)
+
+# auth_dir -> OAuth2 shared by every query authenticated from it
+_shared_oauth = {}
+_shared_oauth_lock = threading.Lock()
+
+
+def configure_session(session: Session, pool_size: int, timeout: Tuple[float, float], retries: int = 3):
+    """Mount a pooled, retrying adapter and default timeouts on a session.
+
+    Args:
+        session: requests session to tune (modified in place)
+        pool_size: Maximum kept-alive connections per host
+        timeout: (connect, read) timeout in seconds applied when a call
+            does not pass its own
+        retries: Retries for connection errors and 5xx responses
+    """
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=0.5,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET']),
+        respect_retry_after_header=True,
+        raise_on_status=False  # Let yfpy see the final response
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry, pool_block=False)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    request = session.request
+
+    def request_with_timeout(method, url, **kwargs):
+        kwargs.setdefault('timeout', timeout)
+        return request(method, url, **kwargs)
+
+    session.request = request_with_timeout
+
+    def note_throttling(response, *args, **kwargs):
+        if response.status_code in THROTTLED_STATUSES:
+            from app.services.yahoo_quota import yahoo_quota
+            yahoo_quota.throttled()
+
+    session.hooks['response'].append(note_throttling)
+
+
+class PooledYahooQuery(YahooFantasySportsQuery):
+    """yfpy query whose OAuth session is pooled, bounded and retrying."""
+
+    def __init__(self, *args, pool_size: int = 8, timeout: Tuple[float, float] = (3.0, 10.0), **kwargs):
+        # Set before super().__init__, which authenticates immediately
+        self._pool_size = pool_size
+        self._timeout = timeout
+        # The session retries 5xx; yfpy retrying on top would multiply attempts
+        # (and re-send 429s behind the quota's back)
+        kwargs.setdefault('retries', 0)
+        super().__init__(*args, **kwargs)
+
+    def _authenticate(self) -> None:
+        key = str(self._auth_dir)
+        with _shared_oauth_lock:
+            shared = _shared_oauth.get(key)
+            if shared is not None and shared is not getattr(self, 'oauth', None):
+                # Another league's query already holds a session (first
+                # authentication, or it re-authenticated since): reuse it
+                self.oauth = shared
+                return
+
+            # yfpy re-authenticates (creating a new session) on 401s, so tune every
+            # session it creates rather than just the first one
+            super()._authenticate()
+            configure_session(self.oauth.session, self._pool_size, self._timeout)
+            _shared_oauth[key] = self.oauth
+        logger.debug(f"Yahoo session pooled ({self._pool_size} connections, timeout {self._timeout})")
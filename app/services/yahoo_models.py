@@ -0,0 +1,275 @@
+"""Typed models and the single parse path for Yahoo (yfpy) responses.
+
+Every YahooService response goes through one parse function per resource.
+Each function reads raw yfpy attributes with a precompiled attribute path
+instead of nested hasattr chains, and validates them in one call against a
+TypedDict schema. Coercion (bytes/None to str, numeric strings to int and
+float) happens in pydantic-core, which builds the plain dicts the cache,
+BracketService and templates work with directly: there is no intermediate
+model object to dump.
+
+See benchmarks/bench_parsing.py for parse time and memory against the
+previous dict-building code.
+"""
+import logging
+from typing import Annotated, Any, Dict, List, Optional
+
+from pydantic import BeforeValidator, ConfigDict, TypeAdapter, ValidationError
+from typing_extensions import TypedDict  # pydantic needs it before Python 3.12
+
+logger = logging.getLogger(__name__)
+
+
+def _to_str(val: Any) -> str:
+    """Handle byte strings and None from yfpy."""
+    if isinstance(val, bytes):
+        return val.decode('utf-8')
+    return str(val) if val is not None else ''
+
+
+Str = Annotated[str, BeforeValidator(_to_str)]
+
+_MODEL_CONFIG = ConfigDict(extra='ignore')
+
+
+class LeagueInfo(TypedDict):
+    """League metadata."""
+    __pydantic_config__ = _MODEL_CONFIG
+    league_id: Str
+    name: Str
+    num_teams: int
+    current_week: int
+    start_week: int
+    end_week: int
+
+
+class Standing(TypedDict):
+    """A team's row in the league standings."""
+    __pydantic_config__ = _MODEL_CONFIG
+    team_id: Str
+    team_key: Str
+    name: Str
+    manager: Str
+    wins: int
+    losses: int
+    ties: int
+    points_for: float
+    points_against: float
+    rank: int
+
+
+class Team(TypedDict):
+    """A team's score within a scoreboard matchup."""
+    __pydantic_config__ = _MODEL_CONFIG
+    team_id: Str
+    team_key: Str
+    name: Str
+    points: float
+
+
+class Matchup(TypedDict):
+    """A head-to-head matchup for one week."""
+    __pydantic_config__ = _MODEL_CONFIG
+    week: int
+    teams: List[Team]
+    winner_team_key: Optional[Str]
+    is_tied: bool
+    status: Str
+    team1_points: float
+    team2_points: float
+
+
+class Scoreboard(TypedDict):
+    """All matchups for one week plus a flat team_id -> score lookup."""
+    __pydantic_config__ = _MODEL_CONFIG
+    week: int
+    matchups: List[Matchup]
+    team_scores: Dict[str, Team]
+    fetched_at: float
+
+
+class RosterPlayer(TypedDict):
+    """A rostered player with their points for the week."""
+    __pydantic_config__ = _MODEL_CONFIG
+    player_id: Str
+    name: Str
+    position: Str
+    team: Str
+    selected_position: Str
+    points: float
+
+
+class Roster(TypedDict):
+    """A team's roster for one week, players in lineup order."""
+    __pydantic_config__ = _MODEL_CONFIG
+    team_id: Str
+    week: Optional[int]
+    name: Str
+    manager: Str
+    players: List[RosterPlayer]
+
+
+_LEAGUE_INFO = TypeAdapter(LeagueInfo)
+_STANDING = TypeAdapter(Standing)
+_SCOREBOARD = TypeAdapter(Scoreboard)
+_ROSTER = TypeAdapter(Roster)
+
+# Lineup order: QB, WR, WR, RB, RB, TE, W/R/T, K, DEF, BN
+POSITION_ORDER = {
+    'QB': 0,
+    'WR': 1,
+    'RB': 3,
+    'TE': 5,
+    'W/R/T': 6,
+    'FLEX': 6,  # Some leagues use FLEX instead of W/R/T
+    'K': 7,
+    'DEF': 8,
+    'BN': 9,
+    'IR': 10  # Injured reserve at the end
+}
+
+
+def _path(*names: str):
+    """Precompile a dotted attribute lookup that returns None when any link is missing."""
+    def get(obj):
+        for name in names:
+            obj = getattr(obj, name, None)
+            if obj is None:
+                return None
+        return obj
+    return get
+
+
+def _pick(raw: Dict, defaults: Dict[str, Any]) -> Dict:
+    """Replace missing (None) values with their defaults."""
+    return {k: defaults[k] if v is None and k in defaults else v for k, v in raw.items()}
+
+
+_manager_nickname = _path('manager', 'nickname')
+_wins = _path('team_standings', 'outcome_totals', 'wins')
+_losses = _path('team_standings', 'outcome_totals', 'losses')
+_ties = _path('team_standings', 'outcome_totals', 'ties')
+_rank = _path('team_standings', 'rank')
+_team_points_total = _path('team_points', 'total')
+_player_points_total = _path('player_points', 'total')
+_STANDING_DEFAULTS = {
+    'manager': 'Unknown', 'wins': 0, 'losses': 0, 'ties': 0, 'points_for': 0.0, 'points_against': 0.0, 'rank': 0
+}
+_PLAYER_DEFAULTS = {
+    'player_id': '', 'name': 'Unknown', 'position': 'N/A', 'team': 'N/A', 'selected_position': 'BN', 'points': 0.0
+}
+_LEAGUE_DEFAULTS = {'num_teams': 0, 'current_week': 1, 'start_week': 1, 'end_week': 17}
+
+
+def parse_league_info(league_id: str, league) -> LeagueInfo:
+    """Parse yfpy league metadata into a LeagueInfo dict."""
+    return _LEAGUE_INFO.validate_python(_pick({
+        'league_id': league_id,
+        'name': league.name,
+        'num_teams': getattr(league, 'num_teams', None),
+        'current_week': getattr(league, 'current_week', None),
+        'start_week': getattr(league, 'start_week', None),
+        'end_week': getattr(league, 'end_week', None),
+    }, _LEAGUE_DEFAULTS))
+
+
+def parse_standings(standings) -> Optional[List[Standing]]:
+    """Parse yfpy standings (or a list of yfpy teams) into Standing dicts, sorted by rank.
+
+    Teams that fail to parse are logged and skipped.
+    """
+    # YFPY returns teams in the 'teams' attribute
+    if hasattr(standings, 'teams'):
+        teams_data = standings.teams
+    elif isinstance(standings, list):
+        teams_data = standings
+    else:
+        logger.error(f"Unexpected standings format: {type(standings)}")
+        return None
+
+    teams = []
+    for team in teams_data:
+        try:
+            teams.append(_STANDING.validate_python(_pick({
+                'team_id': team.team_id,
+                'team_key': team.team_key,
+                'name': team.name,
+                'manager': _manager_nickname(team),
+                'wins': _wins(team),
+                'losses': _losses(team),
+                'ties': _ties(team),
+                'points_for': getattr(team, 'points_for', None),
+                'points_against': getattr(team, 'points_against', None),
+                'rank': _rank(team),
+            }, _STANDING_DEFAULTS)))
+        except (AttributeError, ValidationError) as team_error:
+            logger.error(f"Error parsing team: {team_error}")
+            continue
+
+    teams.sort(key=lambda t: t['rank'])
+    return teams
+
+
+def parse_scoreboard(week: int, scoreboard, fetched_at: float) -> Scoreboard:
+    """Parse a yfpy scoreboard into a Scoreboard dict."""
+    matchups = []
+    team_scores = {}
+    for matchup in scoreboard.matchups:
+        teams = []
+        for team in matchup.teams:
+            t_data = {
+                'team_id': team.team_id,
+                'team_key': team.team_key,
+                'name': team.name,
+                'points': _team_points_total(team) or 0.0
+            }
+            teams.append(t_data)
+            team_scores[_to_str(team.team_id)] = t_data
+
+        matchups.append({
+            'week': week,
+            'teams': teams,
+            'winner_team_key': getattr(matchup, 'winner_team_key', None),
+            'is_tied': getattr(matchup, 'is_tied', False),
+            'status': getattr(matchup, 'status', 'unknown'),
+            'team1_points': teams[0]['points'] if len(teams) > 0 else 0.0,
+            'team2_points': teams[1]['points'] if len(teams) > 1 else 0.0
+        })
+
+    return _SCOREBOARD.validate_python({
+        'week': week,
+        'matchups': matchups,
+        'team_scores': team_scores,
+        'fetched_at': fetched_at
+    })
+
+
+def parse_roster(team_id: str, week: int, roster_data) -> Roster:
+    """Parse a list of yfpy players into a Roster dict.
+
+    Players are sorted starters first in lineup order, then bench, then by name.
+    """
+    players = []
+    for player in roster_data if isinstance(roster_data, list) else ():
+        name = getattr(player, 'name', None)
+        selected_position = getattr(player, 'selected_position', None)
+        players.append(_pick({
+            'player_id': getattr(player, 'player_id', None),
+            'name': getattr(name, 'full', name),
+            'position': getattr(player, 'display_position', None),
+            'team': getattr(player, 'editorial_team_abbr', None),
+            'selected_position': getattr(selected_position, 'position', selected_position),
+            'points': _player_points_total(player),
+        }, _PLAYER_DEFAULTS))
+
+    # One validation call for the whole roster
+    roster = _ROSTER.validate_python({
+        'team_id': team_id,
+        'name': f'Team {_to_str(team_id)}',
+        'manager': 'Unknown',
+        'players': players,
+        'week': week
+    })
+    roster['players'].sort(key=lambda p: (POSITION_ORDER.get(p['selected_position'], 99), p['name']))
+    return roster
+
@@ -0,0 +1,205 @@
+"""Yahoo API call budget shared by every worker (token bucket in Redis).
+
+Yahoo throttles per app (the non-standard 999 status), not per process, so
+every Yahoo request YahooService makes first takes a token from one bucket
+stored in Redis. The bucket refills at YAHOO_QUOTA_RATE tokens per second up
+to YAHOO_QUOTA_BURST, and is updated by a Lua script so workers never race.
+
+Calls have priorities, and each priority may only spend the tokens above its
+reserve, so a burst of low-priority misses cannot starve live scores:
+
+- HIGH: active-week scoreboards and rosters (what viewers are watching)
+- NORMAL: standings, league metadata
+- LOW: completed-week scoreboards and rosters (final, cached for days)
+
+A call that cannot get a token waits up to its priority's MAX_WAIT and is
+then deferred: the fetch returns None, which the stale-while-revalidate
+layer treats as a failed refresh, so the previous value keeps being served
+and the fetch is retried on a later request.
+
+When Yahoo answers 999 (or 429) anyway, the bucket is emptied so every worker backs
+off until it refills.
+
+Without a Redis cache backend (e.g. SimpleCache in development) the bucket
+is kept in-process.
+"""
+import logging
+import threading
+import time
+from enum import IntEnum
+from typing import Dict
+
+from flask import current_app
+
+from app import cache
+
+logger = logging.getLogger(__name__)
+
+QUOTA_KEY = 'yahoo_quota'
+# Idle buckets (and their counters) expire after a day
+QUOTA_KEY_TTL = 86400
+
+
+class Priority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+# Fraction of the burst each priority must leave in the bucket
+RESERVES = {Priority.HIGH: 0.0, Priority.NORMAL: 0.2, Priority.LOW: 0.5}
+# Seconds a call may wait for the bucket to refill before it is deferred
+MAX_WAIT = {Priority.HIGH: 5.0, Priority.NORMAL: 2.0, Priority.LOW: 0.0}
+
+# KEYS[1] bucket hash; ARGV: burst, rate, cost, floor, ttl
+# Returns {granted (0/1), tokens left} - tokens as a string to keep fractions
+_TAKE_SCRIPT = """
+local burst = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local floor = tonumber(ARGV[4])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated'))
+if tokens == nil or updated == nil then
+    tokens = burst
+    updated = now
+end
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+
+local granted = 0
+if cost > 0 and tokens - cost >= floor then
+    tokens = tokens - cost
+    granted = 1
+    redis.call('HINCRBY', KEYS[1], 'calls', 1)
+elseif cost > 0 then
+    redis.call('HINCRBY', KEYS[1], 'deferred', 1)
+elseif cost < 0 then
+    tokens = 0
+    redis.call('HINCRBY', KEYS[1], 'throttled', 1)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return {granted, tostring(tokens)}
+"""
+
+
+class YahooQuota:
+    """Token bucket shared by all workers, with priority reserves."""
+
+    def __init__(self):
+        self._script = None
+        self._script_client = None
+        # In-process bucket for non-Redis cache backends
+        self._local = {'tokens': None, 'updated': 0.0, 'calls': 0, 'deferred': 0, 'throttled': 0}
+        self._local_lock = threading.Lock()
+
+    @staticmethod
+    def _settings():
+        config = current_app.config
+        return float(config.get('YAHOO_QUOTA_BURST', 60)), float(config.get('YAHOO_QUOTA_RATE', 0.5))
+
+    def _take(self, cost: float, floor: float):
+        """Run one bucket update (cost 0 reads, -1 empties). Returns (granted, tokens)."""
+        burst, rate = self._settings()
+        client = getattr(cache.cache, '_write_client', None)
+
+        if client is not None:
+            if self._script_client is not client:
+                self._script = client.register_script(_TAKE_SCRIPT)
+                self._script_client = client
+            granted, tokens = self._script(keys=[QUOTA_KEY], args=[burst, rate, cost, floor, QUOTA_KEY_TTL])
+            return bool(granted), float(tokens)
+
+        with self._local_lock:
+            bucket = self._local
+            now = time.time()
+            tokens = burst if bucket['tokens'] is None else bucket['tokens']
+            tokens = min(burst, tokens + max(0.0, now - bucket['updated']) * rate)
+            granted = False
+            if cost > 0 and tokens - cost >= floor:
+                tokens -= cost
+                granted = True
+                bucket['calls'] += 1
+            elif cost > 0:
+                bucket['deferred'] += 1
+            elif cost < 0:
+                tokens = 0.0
+                bucket['throttled'] += 1
+            bucket['tokens'], bucket['updated'] = tokens, now
+            return granted, tokens
+
+    def acquire(self, priority: Priority, cost: float = 1) -> bool:
+        """Take tokens for a Yahoo call, waiting up to the priority's MAX_WAIT.
+
+        Args:
+            priority: Call priority
+            cost: Tokens the call costs (one per HTTP request)
+
+        Returns:
+            True if the call may proceed, False if it should be deferred. Also
+            True if the bucket can't be reached (the budget never blocks Yahoo
+            access on a Redis error).
+        """
+        burst, rate = self._settings()
+        floor = burst * RESERVES[priority]
+        deadline = time.monotonic() + MAX_WAIT[priority]
+
+        while True:
+            try:
+                granted, tokens = self._take(cost, floor)
+            except Exception as e:
+                logger.error(f"Yahoo quota unavailable: {e}")
+                return True
+            if granted:
+                return True
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.info(f"Yahoo call deferred ({priority.name}, {tokens:.1f} tokens left)")
+                return False
+            # Sleep until enough tokens should have refilled (bounded by the deadline)
+            time.sleep(min(remaining, max(0.05, (floor + cost - tokens) / rate)))
+
+    def throttled(self):
+        """Empty the bucket after Yahoo throttled us (999 or 429), so every worker backs off."""
+        try:
+            self._take(-1, 0)
+        except Exception as e:
+            logger.error(f"Yahoo quota unavailable: {e}")
+        logger.warning("Yahoo rate limited the app; quota emptied")
+
+    def usage(self) -> Dict:
+        """Current budget usage.
+
+        Returns:
+            Dict with tokens (available now), burst, rate (tokens per second),
+            used (fraction of the burst spent) and the calls / deferred /
+            throttled counters
+        """
+        burst, rate = self._settings()
+        _, tokens = self._take(0, 0)
+
+        client = getattr(cache.cache, '_write_client', None)
+        if client is not None:
+            counters = client.hmget(QUOTA_KEY, 'calls', 'deferred', 'throttled')
+            calls, deferred, throttled = (int(value or 0) for value in counters)
+        else:
+            with self._local_lock:
+                calls, deferred, throttled = (self._local[k] for k in ('calls', 'deferred', 'throttled'))
+
+        return {
+            'tokens': round(tokens, 2),
+            'burst': burst,
+            'rate': rate,
+            'used': round(1 - tokens / burst, 4) if burst else 0.0,
+            'calls': calls,
+            'deferred': deferred,
+            'throttled': throttled
+        }
+
+
+yahoo_quota = YahooQuota()
@@ -1,11 +1,21 @@
 """Yahoo Fantasy API service with caching."""
 import os
+import time
 import logging
 from datetime import datetime
 from typing import List, Dict, Optional
-from yfpy.query import YahooFantasySportsQuery
 from flask import current_app
 from app import cache
+from app.services.yahoo_http import PooledYahooQuery
+from app.services.yahoo_models import (
+    parse_league_info, parse_roster, parse_scoreboard, parse_standings
+)
+from app.services.game_clock import game_clock
+from app.services.season_archive import season_archive
+from app.services.yahoo_quota import Priority, yahoo_quota
+from app.utils.metrics import yahoo_call
+from app.utils.swr_cache import swr_get, swr_is_fresh, swr_memoize, swr_store
+from app.utils.timing import timed
 
 logger = logging.getLogger(__name__)
 
@@ -20,11 +30,15 @@ class YahooService:
             league_id: Yahoo Fantasy league ID (from env if not provided)
         """
         self.league_id = league_id or os.getenv('LEAGUE_ID')
-        self.cache_live_scores = int(os.getenv('CACHE_LIVE_SCORES', 30))
-
         # Get current season (auto-detect from current year)
         self.season = datetime.now().year
 
+        # live (Yahoo), record (Yahoo, saving fixtures) or replay (fixtures only)
+        backend = os.getenv('YAHOO_BACKEND', 'live')
+        if backend == 'replay':
+            # Game and league keys must match the recording
+            self.season = int(os.getenv('YAHOO_FIXTURES_SEASON', self.season))
+
         # Map season year to Yahoo game_id to avoid unnecessary API calls
         # Reference: https://yfpy.uberfastman.com/
         SEASON_TO_GAME_ID = {
@@ -49,22 +63,57 @@ class YahooService:
         from pathlib import Path
         auth_dir = Path.home() / '.yf_token_store'
 
+        # One long-lived pooled session per process, shared by all calls
+        max_concurrency = int(os.getenv('YAHOO_MAX_CONCURRENCY', 8))
+        connect_timeout = float(os.getenv('YAHOO_CONNECT_TIMEOUT', 3))
+        read_timeout = float(os.getenv('YAHOO_READ_TIMEOUT', 10))
+
         try:
-            # YFPY will read consumer credentials from private.json and tokens from oauth2.json
-            self.yf_query = YahooFantasySportsQuery(
-                auth_dir=str(auth_dir),
-                league_id=self.league_id,
-                game_code='nfl',
-                game_id=game_id,
-                offline=False,
-                browser_callback=False  # Don't try to open browser in production
-            )
+            if backend == 'replay':
+                from app.services.yahoo_fixtures import ReplayYahooQuery, fixture_store, replay_faults
+                self.yf_query = ReplayYahooQuery(
+                    auth_dir=str(auth_dir),
+                    league_id=self.league_id,
+                    game_code='nfl',
+                    game_id=game_id,
+                    store=fixture_store(self.league_id, self.season),
+                    faults=replay_faults()
+                )
+            else:
+                # YFPY will read consumer credentials from private.json and tokens from oauth2.json
+                self.yf_query = PooledYahooQuery(
+                    auth_dir=str(auth_dir),
+                    league_id=self.league_id,
+                    game_code='nfl',
+                    game_id=game_id,
+                    offline=False,
+                    browser_callback=False,  # Don't try to open browser in production
+                    pool_size=max_concurrency,
+                    timeout=(connect_timeout, read_timeout)
+                )
+            if backend == 'record':
+                from app.services.yahoo_fixtures import fixture_store, record_session
+                record_session(self.yf_query.oauth.session, fixture_store(self.league_id, self.season))
         except Exception as e:
             print(f"⚠️  Warning: Could not initialize Yahoo API: {e}")
             print("Make sure you've run: python -m app.utils.oauth_setup")
             self.yf_query = None
 
-    @cache.memoize(timeout=60)  # 1 minute - standings change slowly
+        # Optional asyncio engine for the bracket build path (YAHOO_CLIENT_ENGINE=async)
+        self.async_client = None
+        if self.yf_query and os.getenv('YAHOO_CLIENT_ENGINE', 'sync') == 'async':
+            # One event loop and connection pool for every league in the process
+            from app.services.yahoo_async_client import shared_client
+            self.async_client = shared_client(
+                self.yf_query.oauth,
+                max_concurrency=max_concurrency,
+                timeout=read_timeout,
+                connect_timeout=connect_timeout,
+                transport=getattr(self.yf_query.oauth, 'transport', None)  # replay backend
+            )
+
+    @timed('yahoo.league_info')
+    @swr_memoize(soft_ttl=60)  # 1 minute - standings change slowly
     def get_league_info(self) -> Optional[Dict]:
         """Get league metadata.
 
@@ -74,27 +123,19 @@ class YahooService:
         if not self.yf_query:
             return None
 
+        if not yahoo_quota.acquire(Priority.NORMAL):
+            return None
+
         try:
-            # Helper function for byte strings
-            def to_str(val):
-                if isinstance(val, bytes):
-                    return val.decode('utf-8')
-                return str(val) if val is not None else ''
-
-            league = self.yf_query.get_league_metadata()
-            return {
-                'league_id': to_str(self.league_id),
-                'name': to_str(league.name),
-                'num_teams': int(league.num_teams) if hasattr(league, 'num_teams') else 0,
-                'current_week': int(league.current_week) if hasattr(league, 'current_week') else 1,
-                'start_week': int(league.start_week) if hasattr(league, 'start_week') else 1,
-                'end_week': int(league.end_week) if hasattr(league, 'end_week') else 17
-            }
+            with yahoo_call('league_info'):
+                league = self.yf_query.get_league_metadata()
+            return self._parse_league_info(league)
         except Exception as e:
             print(f"Error fetching league info: {e}")
             return None
 
-    @cache.memoize(timeout=60)  # 1 minute
+    @timed('yahoo.standings')
+    @swr_memoize(soft_ttl=60)  # 1 minute
     def get_league_standings(self) -> Optional[List[Dict]]:
         """Get current league standings.
 
@@ -104,46 +145,13 @@ class YahooService:
         if not self.yf_query:
             return None
 
-        try:
-            standings = self.yf_query.get_league_standings()
-
-            # YFPY returns teams in the 'teams' attribute
-            if hasattr(standings, 'teams'):
-                teams_data = standings.teams
-            elif isinstance(standings, list):
-                teams_data = standings
-            else:
-                print(f"Unexpected standings format: {type(standings)}")
-                return None
+        if not yahoo_quota.acquire(Priority.NORMAL):
+            return None
 
-            teams = []
-            for team in teams_data:
-                try:
-                    # Handle byte strings from YFPY
-                    def to_str(val):
-                        if isinstance(val, bytes):
-                            return val.decode('utf-8')
-                        return str(val) if val is not None else ''
-
-                    teams.append({
-                        'team_id': to_str(team.team_id),
-                        'team_key': to_str(team.team_key),
-                        'name': to_str(team.name),
-                        'manager': to_str(team.manager.nickname) if hasattr(team, 'manager') and team.manager else 'Unknown',
-                        'wins': int(team.team_standings.outcome_totals.wins) if hasattr(team, 'team_standings') else 0,
-                        'losses': int(team.team_standings.outcome_totals.losses) if hasattr(team, 'team_standings') else 0,
-                        'ties': int(team.team_standings.outcome_totals.ties) if hasattr(team, 'team_standings') and hasattr(team.team_standings.outcome_totals, 'ties') else 0,
-                        'points_for': float(team.points_for) if hasattr(team, 'points_for') else 0.0,
-                        'points_against': float(team.points_against) if hasattr(team, 'points_against') else 0.0,
-                        'rank': int(team.team_standings.rank) if hasattr(team, 'team_standings') else 0
-                    })
-                except Exception as team_error:
-                    print(f"Error parsing team: {team_error}")
-                    continue
-
-            # Sort by rank
-            teams.sort(key=lambda x: x['rank'])
-            return teams
+        try:
+            with yahoo_call('standings'):
+                standings = self.yf_query.get_league_standings()
+            return self._parse_standings(standings)
 
         except Exception as e:
             print(f"Error fetching standings: {e}")
@@ -151,9 +159,64 @@ class YahooService:
             traceback.print_exc()
             return None
 
+    @staticmethod
+    def _week_priority(week: int, current_week: int) -> Priority:
+        """Yahoo quota priority of a week's data: live weeks first, completed weeks (final) last."""
+        return Priority.HIGH if week >= current_week else Priority.LOW
+
+    def is_week_final(self, week: int, current_week: int, scoreboard: Dict = None) -> bool:
+        """Check whether a week's data can no longer change (and may be archived).
+
+        A past week is final once every matchup on its scoreboard is
+        postevent and ARCHIVE_GRACE_PERIOD has passed since that was first
+        seen, so Yahoo's stat corrections (made in the days after the games)
+        land before the week is written once.
+
+        Args:
+            week: Week to check
+            current_week: Current NFL week
+            scoreboard: The week's scoreboard; without it (e.g. for rosters)
+                the week is final only if its scoreboard was seen final earlier
+                or is already archived
+
+        Returns:
+            True if the week's data may be archived
+        """
+        if week >= current_week:
+            return False
+
+        grace_period = current_app.config.get('ARCHIVE_GRACE_PERIOD', 4 * 86400)
+        final_key = f'week_final:{self.league_id}:{week}'
+        if scoreboard is not None:
+            matchups = scoreboard.get('matchups', [])
+            if not matchups or any(matchup.get('status') != 'postevent' for matchup in matchups):
+                return False
+            # Keeps the first time the week was seen final
+            cache.add(final_key, time.time(), timeout=2 * grace_period + 86400)
+
+        final_since = cache.get(final_key)
+        if final_since is None:
+            # Marker lost (cache flushed) after the scoreboard was archived
+            return scoreboard is None and season_archive.get(self.league_id, self.season, week, 'scoreboard') is not None
+        return time.time() - final_since >= grace_period
+
+    def _week_cache_timeout(self, week: int, current_week: int) -> int:
+        """Smart cache timeout for week-scoped data based on week status."""
+        if week < current_week - 1:
+            # Week is fully complete (more than 1 week ago) - use 1 week cache
+            return 604800  # 7 days in seconds
+        elif week < current_week:
+            # Week just completed (last week) - use 24h cache for final score stability
+            return 86400  # 24 hours
+        else:
+            # Active week (current week or future) - use live scores cache
+            return game_clock.interval(self.league_id)  # 15s while games are on, hours otherwise
+
+    @timed('yahoo.scoreboard')
     def get_scoreboard(self, week: int = None) -> Optional[Dict]:
         """Get scoreboard for a specific week.
-        Smart caching: Completed weeks cached 24h, active weeks per CACHE_LIVE_SCORES.
+        Smart caching: Completed weeks cached 24h, active weeks per the game clock.
+        Final weeks are served from the season archive once archived.
         """
         if not self.yf_query:
             return None
@@ -161,78 +224,47 @@ class YahooService:
         # 1. Setup Smart Caching
         current_week = self.get_current_week()
         week = week or current_week
+        if week < current_week:
+            archived = season_archive.get(self.league_id, self.season, week, 'scoreboard')
+            if archived is not None:
+                return archived
 
-        # Smart cache timeout based on week status
-        if week < current_week - 1:
-            # Week is fully complete (more than 1 week ago) - use 1 week cache
-            cache_timeout = 604800  # 7 days in seconds
-        elif week < current_week:
-            # Week just completed (last week) - use 24h cache for final score stability
-            cache_timeout = 86400  # 24 hours
-        else:
-            # Active week (current week or future) - use live scores cache
-            cache_timeout = self.cache_live_scores  # 30 seconds
+        cache_timeout = self._week_cache_timeout(week, current_week)
 
         cache_key = f'scoreboard_{self.league_id}_{week}'
 
-        cached = cache.get(cache_key)
-        if cached is not None:
-            return cached
+        # Stale-while-revalidate: past the timeout the previous scoreboard keeps
+        # being served while one caller refreshes it in the background
+        priority = self._week_priority(week, current_week)
+        scoreboard = swr_get(cache_key, lambda: self._fetch_scoreboard(week, priority), cache_timeout)
+        if scoreboard and self.is_week_final(week, current_week, scoreboard):
+            season_archive.put(self.league_id, self.season, week, 'scoreboard', scoreboard)
+        return scoreboard
+
+    def _fetch_scoreboard(self, week: int, priority: Priority = Priority.HIGH) -> Optional[Dict]:
+        """Fetch and parse a week's scoreboard from Yahoo (uncached)."""
+        if not yahoo_quota.acquire(priority):
+            return None
 
         try:
             # 2. Fetch raw data from Yahoo
-            scoreboard = self.yf_query.get_league_scoreboard_by_week(week)
-            matchups = []
-            team_scores = {}
-
-            # Helper for string conversion
-            def to_str(val):
-                return val.decode('utf-8') if isinstance(val, bytes) else str(val or '')
-
-            # 3. Process Matchups
-            for matchup in scoreboard.matchups:
-                teams_data = []
-                for team in matchup.teams:
-                    t_data = {
-                        'team_id': to_str(team.team_id),
-                        'team_key': to_str(team.team_key),
-                        'name': to_str(team.name),
-                        'points': float(getattr(team.team_points, 'total', 0.0))
-                    }
-                    teams_data.append(t_data)
-                    team_scores[t_data['team_id']] = t_data
-
-                # Normalize for template consumption
-                t1 = teams_data[0] if len(teams_data) > 0 else {}
-                t2 = teams_data[1] if len(teams_data) > 1 else {}
-
-                matchups.append({
-                    'week': week,
-                    'teams': teams_data,
-                    'winner_team_key': getattr(matchup, 'winner_team_key', None),
-                    'is_tied': getattr(matchup, 'is_tied', False),
-                    'status': getattr(matchup, 'status', 'unknown'),
-                    'team1_points': t1.get('points', 0.0),
-                    'team2_points': t2.get('points', 0.0)
-                })
-
-            result = {
-                'week': week,
-                'matchups': matchups,
-                'team_scores': team_scores
-            }
-
-            cache.set(cache_key, result, timeout=cache_timeout)
-            return result
+            with yahoo_call('scoreboard'):
+                scoreboard = self.yf_query.get_league_scoreboard_by_week(week)
+            return self._parse_scoreboard(week, scoreboard)
 
         except Exception as e:
             current_app.logger.error(f"Error fetching scoreboard for week {week}: {e}")
             return None
 
 
-    @cache.memoize(timeout=900)  # 15 minutes
+    @timed('yahoo.roster')
     def get_team_roster(self, team_id: str, week: int = None) -> Optional[Dict]:
-        """Get team roster for a specific week.
+        """Get team roster with player stats for a specific week.
+
+        This is the single roster-stats fetch layer: one Yahoo call per
+        (league, team, week), shared by the roster views and by
+        get_team_points. Cached like scoreboards (live TTL for the active
+        week, long TTLs for completed weeks).
 
         Args:
             team_id: Team ID
@@ -244,81 +276,42 @@ class YahooService:
         if not self.yf_query:
             return None
 
-        try:
-            # Helper function for byte strings
-            def to_str(val):
-                if isinstance(val, bytes):
-                    return val.decode('utf-8')
-                return str(val) if val is not None else ''
+        current_week = self.get_current_week()
+        week = week or current_week
+        if week < current_week:
+            archived = season_archive.get(self.league_id, self.season, week, 'roster', str(team_id))
+            if archived is not None:
+                return archived
+
+        cache_key = self._roster_cache_key(team_id, week)
+
+        priority = self._week_priority(week, current_week)
+        roster = swr_get(
+            cache_key,
+            lambda: self._fetch_team_roster(team_id, week, priority),
+            self._week_cache_timeout(week, current_week)
+        )
+        if roster and self.is_week_final(week, current_week):
+            season_archive.put(self.league_id, self.season, week, 'roster', roster, str(team_id))
+        return roster
+
+    def _roster_cache_key(self, team_id: str, week: int) -> str:
+        return f'roster_stats_{self.league_id}_{team_id}_{week}'
+
+    def _roster_batch_cache_key(self, team_ids: List[str], week: int) -> str:
+        team_ids = sorted(str(team_id) for team_id in team_ids)
+        return f'roster_stats_batch_{self.league_id}_{week}_{",".join(team_ids)}'
+
+    def _fetch_team_roster(self, team_id: str, week: int, priority: Priority = Priority.HIGH) -> Optional[Dict]:
+        """Fetch and parse a team's roster stats from Yahoo (uncached)."""
+        if not yahoo_quota.acquire(priority):
+            return None
 
+        try:
             # Use get_team_roster_player_stats_by_week to get stats
-            roster_data = self.yf_query.get_team_roster_player_stats_by_week(team_id, week)
-
-            team_name = f'Team {team_id}'
-            manager_name = 'Unknown'
-
-            # YFPY returns a list of players directly
-            players = []
-            if isinstance(roster_data, list):
-                for player in roster_data:
-                    player_points = 0.0
-                    if hasattr(player, 'player_points') and hasattr(player.player_points, 'total'):
-                        player_points = float(player.player_points.total)
-
-                    player_name = 'Unknown'
-                    if hasattr(player, 'name'):
-                        if hasattr(player.name, 'full'):
-                            player_name = to_str(player.name.full)
-                        else:
-                            player_name = to_str(player.name)
-
-                    selected_position = 'BN'
-                    if hasattr(player, 'selected_position'):
-                        if hasattr(player.selected_position, 'position'):
-                            selected_position = to_str(player.selected_position.position)
-                        else:
-                            selected_position = to_str(player.selected_position)
-
-                    players.append({
-                        'player_id': to_str(player.player_id) if hasattr(player, 'player_id') else '',
-                        'name': player_name,
-                        'position': to_str(player.display_position) if hasattr(player, 'display_position') else 'N/A',
-                        'team': to_str(player.editorial_team_abbr) if hasattr(player, 'editorial_team_abbr') else 'N/A',
-                        'selected_position': selected_position,
-                        'points': player_points
-                    })
-
-            # Sort players: starters in lineup order, then bench
-            # Lineup order: QB, WR, WR, RB, RB, TE, W/R/T, K, DEF, BN
-            position_order = {
-                'QB': 0,
-                'WR': 1,
-                'RB': 3,
-                'TE': 5,
-                'W/R/T': 6,
-                'FLEX': 6,  # Some leagues use FLEX instead of W/R/T
-                'K': 7,
-                'DEF': 8,
-                'BN': 9,
-                'IR': 10  # Injured reserve at the end
-            }
-
-            def sort_key(p):
-                pos = p['selected_position']
-                # Get position order, default to 99 for unknown positions
-                order = position_order.get(pos, 99)
-                # Secondary sort by name for same positions (e.g., multiple WRs)
-                return (order, p['name'])
-
-            players.sort(key=sort_key)
-
-            return {
-                'team_id': to_str(team_id),
-                'name': team_name,
-                'manager': manager_name,
-                'players': players,
-                'week': week
-            }
+            with yahoo_call('roster'):
+                roster_data = self.yf_query.get_team_roster_player_stats_by_week(team_id, week)
+            return self._parse_roster(team_id, week, roster_data)
 
         except Exception as e:
             print(f"Error fetching roster for team {team_id}: {e}")
@@ -326,11 +319,221 @@ class YahooService:
             traceback.print_exc()
             return None
 
-    @cache.memoize(timeout=15)  # 15 seconds for live scores
+    @timed('yahoo.rosters')
+    def get_team_rosters(self, team_ids: List[str], week: int) -> Dict[str, Dict]:
+        """Get roster stats for several teams in one week with one Yahoo request.
+
+        Uses Yahoo's multi-key collection resource
+        (teams;team_keys=a,b,c/roster;week=N/players/stats) instead of one
+        request per team. Each parsed roster is also stored under its
+        per-team key, so get_team_roster/get_team_points reuse it. Final weeks
+        are served from the season archive once every team is archived.
+
+        Args:
+            team_ids: Team IDs to fetch
+            week: Week number
+
+        Returns:
+            Dict mapping team_id to roster dict (teams that failed are omitted)
+        """
+        if not self.yf_query or not team_ids:
+            return {}
+
+        current_week = self.get_current_week()
+        cache_timeout = self._week_cache_timeout(week, current_week)
+        team_ids = sorted(str(team_id) for team_id in team_ids)
+        if week < current_week:
+            archived = season_archive.get_many(self.league_id, self.season, week, 'roster', team_ids)
+            if len(archived) == len(team_ids):
+                return archived
+
+        cache_key = self._roster_batch_cache_key(team_ids, week)
+
+        priority = self._week_priority(week, current_week)
+
+        def fetch():
+            rosters = self._fetch_team_rosters(team_ids, week, priority)
+            for team_id, roster in (rosters or {}).items():
+                swr_store(self._roster_cache_key(team_id, week), roster, cache_timeout)
+            return rosters
+
+        rosters = swr_get(cache_key, fetch, cache_timeout) or {}
+        if rosters and self.is_week_final(week, current_week):
+            season_archive.put_many(self.league_id, self.season, week, 'roster', rosters)
+        return rosters
+
+    def _fetch_team_rosters(self, team_ids: List[str], week: int,
+                            priority: Priority = Priority.HIGH) -> Optional[Dict[str, Dict]]:
+        """Fetch and parse several teams' roster stats in one request (uncached)."""
+        try:
+            league_key = self._get_league_key()
+            if not yahoo_quota.acquire(priority):
+                return None
+            team_keys = ','.join(f'{league_key}.t.{team_id}' for team_id in team_ids)
+            with yahoo_call('rosters'):
+                teams = self.yf_query.query(
+                    f"https://fantasysports.yahooapis.com/fantasy/v2/teams;team_keys={team_keys}"
+                    f"/roster;week={week}/players/stats",
+                    ["teams"]
+                )
+            return self._parse_team_rosters(week, teams)
+
+        except Exception as e:
+            current_app.logger.error(f"Error fetching batched rosters for week {week}: {e}")
+            return None
+
+    @timed('yahoo.prefetch')
+    def prefetch(self, team_ids: List[str] = None, weeks: List[int] = ()):
+        """Warm the cache for a bracket build with one async gather.
+
+        Only used with the async engine. Without team_ids, fetches league
+        metadata and standings; with them, fetches each week's scoreboard and
+        batched rosters. Entries that are still fresh are skipped, as are
+        calls the Yahoo quota defers, and every result is stored under the
+        same keys the sync getters read, so the bracket build afterwards is
+        all cache hits. Weeks already in the season archive are never fetched.
+
+        Args:
+            team_ids: Waffle Bowl team IDs (None for the league phase)
+            weeks: Playoff weeks to fetch scoreboards and rosters for
+        """
+        if not self.async_client:
+            return
+
+        client = self.async_client
+        league_key = self._get_league_key()
+        # (cache_key, soft_ttl, priority, coroutine factory, store(result))
+        jobs = []
+
+        def store_as(cache_key, cache_timeout, parse):
+            def store(result):
+                value = parse(result)
+                if value:
+                    swr_store(cache_key, value, cache_timeout)
+            return store
+
+        if team_ids is None:
+            for method, call, parse in (
+                (YahooService.get_league_info, lambda: client.get_league_metadata(league_key),
+                 self._parse_league_info),
+                (YahooService.get_league_standings, lambda: client.get_league_standings(league_key),
+                 self._parse_standings),
+            ):
+                cache_key = method.make_cache_key(self)
+                jobs.append((
+                    cache_key, method.soft_ttl, Priority.NORMAL, call, store_as(cache_key, method.soft_ttl, parse)
+                ))
+        else:
+            current_week = self.get_current_week()
+            team_keys = [f'{league_key}.t.{team_id}' for team_id in team_ids]
+            for week in weeks:
+                cache_timeout = self._week_cache_timeout(week, current_week)
+                priority = self._week_priority(week, current_week)
+                # Final weeks already in the season archive are never fetched again
+                archived_scoreboard, archived_rosters = False, False
+                if week < current_week:
+                    archived_scoreboard = season_archive.get(
+                        self.league_id, self.season, week, 'scoreboard'
+                    ) is not None
+                    archived_rosters = len(season_archive.get_many(
+                        self.league_id, self.season, week, 'roster', team_ids
+                    )) == len(team_ids)
+
+                cache_key = f'scoreboard_{self.league_id}_{week}'
+                if not archived_scoreboard:
+                    jobs.append((
+                        cache_key,
+                        cache_timeout,
+                        priority,
+                        lambda week=week: client.get_league_scoreboard_by_week(league_key, week),
+                        store_as(cache_key, cache_timeout, lambda data, week=week: self._parse_scoreboard(week, data))
+                    ))
+
+                if not archived_rosters:
+                    jobs.append((
+                        self._roster_batch_cache_key(team_ids, week),
+                        cache_timeout,
+                        priority,
+                        lambda week=week: client.get_teams_roster_player_stats_by_week(team_keys, week),
+                        lambda data, week=week, cache_timeout=cache_timeout: self._store_team_rosters(
+                            team_ids, week, self._parse_team_rosters(week, data), cache_timeout
+                        )
+                    ))
+
+        jobs = [job for job in jobs if not swr_is_fresh(job[0], job[1]) and yahoo_quota.acquire(job[2])]
+        if not jobs:
+            return
+
+        results = client.gather([call for _, _, _, call, _ in jobs])
+        for (cache_key, _, _, _, store), result in zip(jobs, results):
+            if isinstance(result, Exception):
+                current_app.logger.error(f"Async prefetch of {cache_key} failed: {result}")
+                continue
+            store(result)
+
+    def _store_team_rosters(self, team_ids: List[str], week: int, rosters: Dict[str, Dict], cache_timeout: int):
+        """Store a batched roster fetch under its batch key and each per-team key."""
+        if not rosters:
+            return
+        swr_store(self._roster_batch_cache_key(team_ids, week), rosters, cache_timeout)
+        for team_id, roster in rosters.items():
+            swr_store(self._roster_cache_key(team_id, week), roster, cache_timeout)
+
+    def _get_league_key(self) -> str:
+        """Get the league key, resolving it with Yahoo at most once.
+
+        Also pins it on the yfpy query, which otherwise re-resolves the game
+        key with an extra request on every call.
+        """
+        if not self.yf_query.league_key:
+            if not yahoo_quota.acquire(Priority.HIGH):
+                raise RuntimeError("Yahoo quota exhausted; league key not resolved")
+            with yahoo_call('league_key'):
+                self.yf_query.league_key = self.yf_query.get_league_key()
+        return self.yf_query.league_key
+
+    def _parse_league_info(self, league) -> Dict:
+        """Parse yfpy league metadata into the league info dict shape."""
+        return parse_league_info(self.league_id, league)
+
+    def _parse_standings(self, standings) -> Optional[List[Dict]]:
+        """Parse yfpy standings into a list of team dicts sorted by rank."""
+        return parse_standings(standings)
+
+    def _parse_scoreboard(self, week: int, scoreboard) -> Dict:
+        """Parse a yfpy scoreboard into the scoreboard dict shape."""
+        return parse_scoreboard(week, scoreboard, fetched_at=time.time())
+
+    def _parse_team_rosters(self, week: int, teams) -> Dict[str, Dict]:
+        """Parse a yfpy teams collection (with rosters) into roster dicts by team_id."""
+        if not isinstance(teams, list):
+            teams = [teams]
+
+        rosters = {}
+        for team in teams:
+            if isinstance(team, dict) and 'team' in team:
+                team = team['team']
+            team_id = str(team.team_id)
+            players = team.players or []
+            if not isinstance(players, list):
+                players = [players]  # yfpy collapses single-item lists
+            players = [
+                p['player'] if isinstance(p, dict) and 'player' in p else p
+                for p in players
+            ]
+            rosters[team_id] = self._parse_roster(team_id, week, players)
+        return rosters
+
+    def _parse_roster(self, team_id: str, week: int, roster_data) -> Dict:
+        """Parse a list of yfpy players into the roster dict shape."""
+        return parse_roster(team_id, week, roster_data)
+
     def get_team_points(self, team_id: str, week: int) -> Optional[Dict]:
         """Get team's total points for a specific week.
 
         This is useful for teams not in the scoreboard (eliminated from playoffs).
+        Derived from the shared roster-stats fetch, so it never costs an extra
+        Yahoo call when the roster for that week is already cached.
 
         Args:
             team_id: Team ID
@@ -339,63 +542,26 @@ class YahooService:
         Returns:
             Dict with team points info or None if error
         """
-        if not self.yf_query:
+        roster = self.get_team_roster(team_id, week)
+        if not roster:
             return None
 
-        try:
-            # Helper function for byte strings
-            def to_str(val):
-                if isinstance(val, bytes):
-                    return val.decode('utf-8')
-                return str(val) if val is not None else ''
-
-            # Get roster with player stats for the week
-            roster_stats = self.yf_query.get_team_roster_player_stats_by_week(team_id, week)
-
-            if not roster_stats:
-                return None
+        return {
+            'team_id': roster['team_id'],
+            'name': roster['name'],
+            'points': self.starter_points(roster),
+            'week': week
+        }
 
-            # Extract team name and sum player points
-            team_points = 0.0
-            team_name = f'Team {team_id}'
-
-            # Check if roster_stats is a list (YFPY returns list of players)
-            if isinstance(roster_stats, list):
-                for player in roster_stats:
-                    player_points = 0.0
-
-                    # Check if player is a starter (not on bench)
-                    selected_position = 'BN'
-                    if hasattr(player, 'selected_position'):
-                        if hasattr(player.selected_position, 'position'):
-                            selected_position = to_str(player.selected_position.position)
-                        else:
-                            selected_position = to_str(player.selected_position)
-
-                    # Try to get player points
-                    if hasattr(player, 'player_points'):
-                        if hasattr(player.player_points, 'total'):
-                            player_points = float(player.player_points.total)
-
-                    # Only count starters (not bench players)
-                    if selected_position != 'BN':
-                        team_points += player_points
-
-            # Handle if it's an object with roster
-            elif hasattr(roster_stats, 'name'):
-                team_name = to_str(roster_stats.name)
-
-            return {
-                'team_id': to_str(team_id),
-                'name': team_name,
-                'points': team_points,
-                'week': week
-            }
-        except Exception as e:
-            print(f"Error fetching points for team {team_id}, week {week}: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
+    @staticmethod
+    def starter_points(roster: Optional[Dict]) -> float:
+        """Sum points for a roster's starters (bench players don't count)."""
+        if not roster or 'players' not in roster:
+            return 0.0
+        return sum(
+            p['points'] for p in roster['players']
+            if p.get('selected_position') != 'BN'
+        )
 
     def get_current_week(self) -> int:
         """Get current NFL week.
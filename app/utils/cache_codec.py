@@ -0,0 +1,142 @@
+"""Compact binary codec for values stored in the Redis cache.
+
+flask-caching's Redis backend pickles every value. The cached Yahoo payloads
+and the bracket snapshot are plain nested dicts/lists of str, int, float and
+bool, which msgpack can encode too; any codec output can additionally be
+zstd-compressed above a size threshold.
+
+Every stored value starts with a one-byte tag, so entries written with a
+different setting (including cachelib's own pickle format, tag ``!``) can
+still be read during a rollout:
+
+- ``!`` pickle (cachelib default, also the fallback for non-msgpack types)
+- ``m`` msgpack
+- ``z`` zstd frame wrapping one of the above (tag included)
+
+Measured on a week-17 bracket snapshot, pickle beats msgpack on both size
+and decode time because it memoizes the team dicts shared across rounds and
+the repeated dict keys, and zstd shrinks either by 80-95% for a few
+microseconds of decode. The defaults are therefore pickle + zstd.
+
+Selected with CACHE_CODEC (pickle|msgpack) and CACHE_COMPRESSION
+(none|zstd). See benchmarks/bench_cache_codec.py for sizes and decode times.
+"""
+import logging
+import pickle
+import threading
+from typing import Any, Optional
+
+from cachelib.serializers import RedisSerializer
+from flask_caching.backends.rediscache import RedisCache
+
+logger = logging.getLogger(__name__)
+
+TAG_PICKLE = b'!'
+TAG_MSGPACK = b'm'
+TAG_ZSTD = b'z'
+
+
+class CodecSerializer(RedisSerializer):
+    """cachelib serializer with a selectable codec and compression, reading any tag."""
+
+    def __init__(self, codec: str = 'pickle', compression: str = 'none',
+                 compress_min_bytes: int = 1024, zstd_level: int = 3):
+        """Initialize the serializer.
+
+        Args:
+            codec: 'pickle' or 'msgpack' (used for writes)
+            compression: 'zstd' or 'none'
+            compress_min_bytes: Values smaller than this are never compressed
+            zstd_level: zstd compression level
+        """
+        self.codec = codec
+        self.compression = compression
+        self.compress_min_bytes = compress_min_bytes
+        self.zstd_level = zstd_level
+        # zstd (de)compressor objects must not be shared between threads
+        self._local = threading.local()
+
+        if codec == 'msgpack':
+            import msgpack
+            self._msgpack = msgpack
+        if compression == 'zstd':
+            import zstandard
+            self._zstd = zstandard
+
+    def dumps(self, value: Any, protocol: int = pickle.HIGHEST_PROTOCOL) -> bytes:
+        encoded = self._encode(value, protocol)
+        if self.compression == 'zstd' and len(encoded) >= self.compress_min_bytes:
+            return TAG_ZSTD + self._compressor().compress(encoded)
+        return encoded
+
+    def _encode(self, value: Any, protocol: int) -> bytes:
+        if self.codec == 'msgpack':
+            try:
+                return TAG_MSGPACK + self._msgpack.packb(value, use_bin_type=True)
+            except (TypeError, ValueError, OverflowError):
+                # Not a msgpack-native value (e.g. a set); pickle keeps it readable
+                pass
+        return TAG_PICKLE + pickle.dumps(value, protocol)
+
+    def loads(self, value: Optional[bytes]) -> Any:
+        if value is None:
+            return None
+
+        tag = value[:1]
+        try:
+            if tag == TAG_ZSTD:
+                value = self._decompressor().decompress(value[1:])
+                tag = value[:1]
+            if tag == TAG_MSGPACK:
+                return self._unpack(value[1:])
+        except Exception as e:
+            # Corrupt or unreadable entry - behave like a cache miss
+            logger.error(f"Could not decode cached value: {e}")
+            return None
+
+        return super().loads(value)
+
+    def _unpack(self, packed: bytes) -> Any:
+        if not hasattr(self, '_msgpack'):
+            import msgpack
+            self._msgpack = msgpack
+        # Rosters are keyed by integer week, so allow non-string map keys
+        return self._msgpack.unpackb(packed, raw=False, strict_map_key=False)
+
+    def _compressor(self):
+        if not hasattr(self._local, 'compressor'):
+            self._local.compressor = self._zstd.ZstdCompressor(level=self.zstd_level)
+        return self._local.compressor
+
+    def _decompressor(self):
+        if not hasattr(self._local, 'decompressor'):
+            if not hasattr(self, '_zstd'):
+                import zstandard
+                self._zstd = zstandard
+            self._local.decompressor = self._zstd.ZstdDecompressor()
+        return self._local.decompressor
+
+
+class CodecRedisCache(RedisCache):
+    """flask-caching Redis backend using CodecSerializer.
+
+    Enabled with ``CACHE_TYPE = 'app.utils.cache_codec.CodecRedisCache'``.
+    """
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        cache = super().factory(app, config, args, kwargs)
+        codec = config.get('CACHE_CODEC', 'pickle')
+        compression = config.get('CACHE_COMPRESSION', 'none')
+
+        try:
+            cache.serializer = CodecSerializer(
+                codec=codec,
+                compression=compression,
+                compress_min_bytes=config.get('CACHE_COMPRESS_MIN_BYTES', 1024),
+                zstd_level=config.get('CACHE_ZSTD_LEVEL', 3)
+            )
+        except ImportError as e:
+            logger.warning(f"Cache codec {codec}/{compression} unavailable ({e}), using pickle")
+            cache.serializer = CodecSerializer(codec='pickle')
+        return cache
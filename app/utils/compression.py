@@ -0,0 +1,130 @@
+"""gzip/brotli response compression.
+
+HTML fragments are mostly repeated Tailwind class strings and compress very
+well. Compression happens in two places:
+
+- Fragments served through the fragment cache are compressed once per
+  ETag and the compressed bytes are cached with the HTML (see
+  app/utils/fragment_cache.py), so the work is done once per snapshot
+  version rather than once per request.
+- Everything else (full pages, fallbacks, static assets) is compressed in an
+  after_request hook. Static files are compressed once per file version and
+  kept in memory.
+
+Brotli is used when the client accepts it and the ``brotli`` package is
+installed; otherwise gzip.
+"""
+import gzip
+import logging
+import threading
+from typing import Dict, Optional
+
+from flask import request
+
+from app.utils.timing import timed
+
+try:
+    import brotli
+except ImportError:  # Optional - gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Responses smaller than this aren't worth compressing
+MIN_SIZE = 500
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml'
+}
+
+_static_variants = {}
+_static_lock = threading.Lock()
+
+
+def available_encodings():
+    return ('br', 'gzip') if brotli else ('gzip',)
+
+
+@timed('compress')
+def compress_variants(body: bytes, cached: bool = True) -> Dict[str, bytes]:
+    """Compress a body with every available encoding.
+
+    Args:
+        body: Uncompressed response body
+        cached: True when the result is cached and reused (spend more CPU on
+            a smaller result), False for one-off responses
+
+    Returns:
+        Dict of encoding name to compressed bytes (empty if body is small)
+    """
+    if len(body) < MIN_SIZE:
+        return {}
+    variants = {'gzip': gzip.compress(body, compresslevel=9 if cached else 6)}
+    if brotli:
+        variants['br'] = brotli.compress(body, quality=11 if cached else 4, mode=brotli.MODE_TEXT)
+    return variants
+
+
+def negotiate(variants: Dict[str, bytes]) -> Optional[str]:
+    """Pick the encoding the client prefers among the available variants."""
+    if not variants:
+        return None
+    return request.accept_encodings.best_match([e for e in available_encodings() if e in variants])
+
+
+def apply_variant(response, variants: Dict[str, bytes]):
+    """Send the negotiated compressed variant as the response body.
+
+    A strong ETag names exact bytes, and every encoding of the body shares
+    it, so it is downgraded to a weak one when a variant is sent.
+    """
+    response.vary.add('Accept-Encoding')
+    encoding = negotiate(variants)
+    if encoding:
+        response.set_data(variants[encoding])
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+    return response
+
+
+def _compressible(response) -> bool:
+    return (
+        response.status_code == 200
+        and response.mimetype in COMPRESSIBLE_MIMETYPES
+        and 'Content-Encoding' not in response.headers
+        # Streams (e.g. SSE) are left alone; static files are handled below
+        and (response.direct_passthrough or not response.is_streamed)
+    )
+
+
+def compress_response(response):
+    """after_request hook compressing responses not already served pre-compressed."""
+    if not _compressible(response):
+        return response
+    response.vary.add('Accept-Encoding')
+    if not request.accept_encodings.best_match(available_encodings()):
+        return response
+
+    if response.direct_passthrough:
+        # Static file: compress once per file version
+        response.direct_passthrough = False
+        key = (request.path, response.get_etag()[0])
+        with _static_lock:
+            variants = _static_variants.get(key)
+        if variants is None:
+            variants = compress_variants(response.get_data())
+            with _static_lock:
+                _static_variants[key] = variants
+    else:
+        variants = compress_variants(response.get_data(), cached=False)
+
+    if not variants:
+        return response
+    return apply_variant(response, variants)
+
+
+def init_compression(app):
+    """Register response compression on the app."""
+    app.after_request(compress_response)
@@ -0,0 +1,86 @@
+"""Rendered HTML fragment cache keyed by fragment ETag.
+
+Every viewer sees identical fragments for a given snapshot, and a fragment's
+ETag (see app/utils/http_cache.py) changes exactly when its HTML would. The
+rendered HTML is therefore cached under its ETag: first in a small
+per-process LRU (no Redis round-trip, no decode), then in the shared cache
+so the other worker reuses it. Steady-state requests skip both the
+component reads and Jinja.
+
+Each entry also holds the gzip/brotli-compressed bytes of the HTML, so
+compression runs once per ETag too (see app/utils/compression.py).
+
+Entries outlive snapshot versions whose content did not change, and expire
+with the snapshot TTL.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+from flask import current_app
+
+from app import cache
+from app.utils.compression import compress_variants
+from app.utils.metrics import count_cache_read
+
+logger = logging.getLogger(__name__)
+
+FRAGMENT_PREFIX = 'fragment'
+DEFAULT_LOCAL_SIZE = 64
+
+_local = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def _local_get(etag: str) -> Optional[Dict]:
+    with _local_lock:
+        entry = _local.get(etag)
+        if entry is not None:
+            _local.move_to_end(etag)
+        return entry
+
+
+def _local_put(etag: str, entry: Dict):
+    max_size = current_app.config.get('FRAGMENT_CACHE_LOCAL_SIZE', DEFAULT_LOCAL_SIZE)
+    with _local_lock:
+        _local[etag] = entry
+        _local.move_to_end(etag)
+        while len(_local) > max_size:
+            _local.popitem(last=False)
+
+
+def get_or_render_entry(etag: str, render: Callable[[], Optional[str]]) -> Optional[Dict]:
+    """Get a rendered fragment and its compressed variants by ETag, rendering on a miss.
+
+    Args:
+        etag: Fragment ETag (identifies the exact HTML)
+        render: Zero-argument callable producing the HTML, or None if the data
+            it needs is missing (not cached)
+
+    Returns:
+        Dict with 'html' and 'variants' (encoding -> compressed bytes), or
+        None if the fragment could not be rendered
+    """
+    entry = _local_get(etag)
+    count_cache_read('fragment_local', entry is not None)
+    if entry is not None:
+        return entry
+
+    key = f'{FRAGMENT_PREFIX}:{etag}'
+    entry = cache.get(key)
+    if entry is None:
+        html = render()
+        if html is None:
+            return None
+        entry = {'html': html, 'variants': compress_variants(html.encode('utf-8'))}
+        cache.set(key, entry, timeout=current_app.config.get('SNAPSHOT_TTL', 3600))
+
+    _local_put(etag, entry)
+    return entry
+
+
+def get_or_render(etag: str, render: Callable[[], Optional[str]]) -> Optional[str]:
+    """Get a rendered fragment's HTML by ETag (see get_or_render_entry)."""
+    entry = get_or_render_entry(etag, render)
+    return entry['html'] if entry else None
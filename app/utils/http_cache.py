@@ -0,0 +1,87 @@
+"""Content-version ETags and conditional GET handling for HTMX fragments.
+
+A fragment's ETag is derived from the content hashes of the snapshot
+components it renders (recorded in the snapshot manifest at publish time),
+plus a hash of the templates, so it changes exactly when the rendered HTML
+would. Matching If-None-Match requests get a bodiless 304 before any cache
+read or template rendering; other requests are served from the rendered
+fragment cache (app/utils/fragment_cache.py).
+"""
+import hashlib
+import json
+import os
+from typing import Any, Callable, Dict, Optional
+
+from flask import current_app, make_response, request
+
+from app.utils.compression import apply_variant
+from app.utils.fragment_cache import get_or_render_entry
+
+_template_version = None
+
+
+def content_hash(value: Any) -> str:
+    """Stable short hash of a JSON-like value (dict key order independent)."""
+    encoded = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def template_version() -> str:
+    """Hash of the fragment templates, so a deploy that changes markup changes every ETag.
+
+    Computed from file contents (not mtimes), so every worker agrees.
+    """
+    global _template_version
+    if _template_version is None:
+        digest = hashlib.blake2b(digest_size=8)
+        components_dir = os.path.join(current_app.root_path, 'templates', 'components')
+        for name in sorted(os.listdir(components_dir)):
+            with open(os.path.join(components_dir, name), 'rb') as f:
+                digest.update(name.encode('utf-8'))
+                digest.update(f.read())
+        _template_version = digest.hexdigest()
+    return _template_version
+
+
+def fragment_etag(*parts: Any) -> str:
+    """Build a fragment ETag from the component hashes and arguments it depends on."""
+    return content_hash([template_version(), *parts])
+
+
+def conditional_fragment(etag: Optional[str], render: Callable[[], Any], fallback: Callable[[], Any],
+                         headers: Dict[str, str] = None):
+    """Return 304 if the client already has this fragment version, else render it.
+
+    Args:
+        etag: Fragment ETag, or None to always render (e.g. nothing published yet)
+        render: Zero-argument callable producing the response body, or None
+            if the data it needs is missing
+        fallback: Zero-argument callable producing the body when render
+            returns None (sent without an ETag, so it is never revalidated)
+        headers: Extra headers sent on both 200 and 304 responses
+
+    Returns:
+        Flask response with a weak ETag and Cache-Control: no-cache
+        (always revalidate), compressed from the fragment cache when the
+        client accepts it
+    """
+    # Weak comparison: identity, gzip and br bodies share one (weak) ETag
+    if etag and request.if_none_match.contains_weak(etag):
+        response = make_response('', 304)
+    else:
+        # Identical for every viewer, so render (and compress) once per ETag
+        entry = get_or_render_entry(etag, render) if etag else None
+        if entry:
+            response = apply_variant(make_response(entry['html']), entry['variants'])
+        else:
+            body = render() if etag is None else None
+            if body is None:
+                body, etag = fallback(), None
+            response = make_response(body)
+
+    if etag:
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+    for name, value in (headers or {}).items():
+        response.headers[name] = value
+    return response
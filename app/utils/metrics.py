@@ -0,0 +1,313 @@
+"""Prometheus metrics, served at /metrics.
+
+- waffle_yahoo_requests_total{method,outcome} and
+  waffle_yahoo_request_seconds{method}: every Yahoo request (both engines),
+  outcome ok or error
+- waffle_cache_requests_total{family,result}: cache reads by key family
+  (scoreboard, roster_stats, bracket_snapshot, fragment, ...), result hit or
+  miss; stale counts the hits served past their soft TTL (see
+  app/utils/swr_cache.py), and family fragment_local the in-process
+  fragment LRU
+- waffle_snapshot_build_seconds and waffle_snapshot_builds_total{result}:
+  bracket snapshot builds, built or failed
+- waffle_snapshot_age_seconds{league} and
+  waffle_snapshot_data_age_seconds{league}: age of each league's published
+  snapshot and of the oldest scoreboard in it (read at scrape time)
+- waffle_http_requests_total{endpoint,status},
+  waffle_http_request_seconds{endpoint} and
+  waffle_rate_limited_total{endpoint}: requests, and the ones the limiter
+  rejected (429)
+- waffle_executor_tasks_in_flight{pool}: tasks submitted to the snapshot
+  build and SWR revalidation thread pools and not finished yet
+- waffle_sse_streams and waffle_sse_rejected_total: open live-update
+  streams, and the ones refused at SSE_MAX_CLIENTS (those viewers poll)
+- waffle_yahoo_quota_*: the shared Yahoo budget (see
+  app/services/yahoo_quota.py), read at scrape time
+
+With several gunicorn workers, set PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py
+does) so every worker writes its metrics there and /metrics reports all of
+them, whichever worker answers the scrape. Without prometheus_client
+installed every metric is a no-op and /metrics is unavailable.
+"""
+import logging
+import os
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Optional, Tuple
+
+from flask import request
+
+from app.utils.timing import span
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+except ImportError:  # Optional - metrics disabled
+    prometheus_client = None
+
+logger = logging.getLogger(__name__)
+
+# Cache keys named <family>_<league>_... (the rest are <family>:...)
+UNDERSCORE_FAMILIES = ('roster_stats_batch', 'roster_stats', 'scoreboard')
+BUILD_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+
+class _NoopMetric:
+    """Stands in for every metric when prometheus_client is not installed."""
+
+    def labels(self, *args, **kwargs):
+        return self
+
+    def inc(self, amount=1):
+        pass
+
+    def dec(self, amount=1):
+        pass
+
+    def observe(self, amount):
+        pass
+
+
+if prometheus_client is not None:
+    yahoo_requests = Counter(
+        'waffle_yahoo_requests', 'Yahoo API requests', ['method', 'outcome']
+    )
+    yahoo_request_seconds = Histogram(
+        'waffle_yahoo_request_seconds', 'Yahoo API request duration', ['method']
+    )
+    cache_requests = Counter(
+        'waffle_cache_requests', 'Cache reads by key family', ['family', 'result']
+    )
+    snapshot_builds = Counter(
+        'waffle_snapshot_builds', 'Bracket snapshot builds', ['result']
+    )
+    snapshot_build_seconds = Histogram(
+        'waffle_snapshot_build_seconds', 'Bracket snapshot build duration', buckets=BUILD_BUCKETS
+    )
+    http_requests = Counter(
+        'waffle_http_requests', 'HTTP requests', ['endpoint', 'status']
+    )
+    http_request_seconds = Histogram(
+        'waffle_http_request_seconds', 'HTTP request duration', ['endpoint']
+    )
+    rate_limited = Counter(
+        'waffle_rate_limited', 'Requests rejected by the rate limiter', ['endpoint']
+    )
+    executor_in_flight = Gauge(
+        'waffle_executor_tasks_in_flight', 'Thread pool tasks submitted and not finished', ['pool'],
+        multiprocess_mode='livesum'
+    )
+    sse_streams = Gauge(
+        'waffle_sse_streams', 'Open Server-Sent Events streams', multiprocess_mode='livesum'
+    )
+    sse_rejected = Counter(
+        'waffle_sse_rejected', 'SSE streams refused at SSE_MAX_CLIENTS (the page polls instead)'
+    )
+else:
+    yahoo_requests = yahoo_request_seconds = cache_requests = _NoopMetric()
+    snapshot_builds = snapshot_build_seconds = _NoopMetric()
+    http_requests = http_request_seconds = rate_limited = executor_in_flight = _NoopMetric()
+    sse_streams = sse_rejected = _NoopMetric()
+
+
+def key_family(key) -> str:
+    """Metric label of a cache key: the constant part every key of its kind starts with.
+
+    Args:
+        key: Cache key, e.g. 'scoreboard_123_15' or 'bracket_snapshot:123:current'
+
+    Returns:
+        Family name, e.g. 'scoreboard' or 'bracket_snapshot' ('lock' for
+        single-flight locks)
+    """
+    key = str(key)
+    if key.endswith(':lock'):
+        return 'lock'
+    for family in UNDERSCORE_FAMILIES:
+        if key.startswith(f'{family}_'):
+            return family
+    return key.split(':', 1)[0] if ':' in key else 'other'
+
+
+def count_cache_read(family: str, hit: bool):
+    cache_requests.labels(family, 'hit' if hit else 'miss').inc()
+
+
+def count_stale(key):
+    """Count a cached value served past its soft TTL."""
+    cache_requests.labels(key_family(key), 'stale').inc()
+
+
+@contextmanager
+def yahoo_call(method: str):
+    """Time a Yahoo request (also as the yahoo.fetch span) and count it as ok or error.
+
+    Args:
+        method: Metric label of the resource (league_info, standings,
+            scoreboard, roster, rosters)
+    """
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        with span('yahoo.fetch'):
+            yield
+        outcome = 'ok'
+    finally:
+        yahoo_request_seconds.labels(method).observe(time.perf_counter() - started)
+        yahoo_requests.labels(method, outcome).inc()
+
+
+def submit_counted(executor, pool: str, fn, *args):
+    """Submit a task to a thread pool, counted as in flight until it finishes.
+
+    Args:
+        executor: ThreadPoolExecutor to submit to
+        pool: Metric label of the pool
+        fn: Callable to run with args
+
+    Returns:
+        The task's Future
+    """
+    gauge = executor_in_flight.labels(pool)
+    gauge.inc()
+    try:
+        future = executor.submit(fn, *args)
+    except Exception:
+        gauge.dec()
+        raise
+    future.add_done_callback(lambda _: gauge.dec())
+    return future
+
+
+def observe_snapshot_build(seconds: float, built: bool):
+    snapshot_build_seconds.observe(seconds)
+    snapshot_builds.labels('built' if built else 'failed').inc()
+
+
+def count_cache_hits(backend):
+    """Count hits and misses of a cache backend's reads by key family (in place)."""
+    if getattr(backend, '_metrics_counted', False):
+        return
+
+    get, get_many = backend.get, backend.get_many
+
+    @wraps(get)
+    def counted_get(key):
+        value = get(key)
+        count_cache_read(key_family(key), value is not None)
+        return value
+
+    @wraps(get_many)
+    def counted_get_many(*keys):
+        values = get_many(*keys)
+        for key, value in zip(keys, values):
+            count_cache_read(key_family(key), value is not None)
+        return values
+
+    backend.get, backend.get_many = counted_get, counted_get_many
+    backend._metrics_counted = True
+
+
+if prometheus_client is not None:
+    class StateCollector:
+        """Gauges read from shared state at scrape time (the same in every worker)."""
+
+        def __init__(self, app):
+            self.app = app
+
+        def collect(self):
+            from app import get_league_registry
+            from app.services.snapshot_service import SnapshotService
+            from app.services.yahoo_quota import yahoo_quota
+
+            age = GaugeMetricFamily(
+                'waffle_snapshot_age_seconds', 'Seconds since the published snapshot was built', labels=['league']
+            )
+            data_age = GaugeMetricFamily(
+                'waffle_snapshot_data_age_seconds', 'Age of the oldest scoreboard in the published snapshot',
+                labels=['league']
+            )
+            now = time.time()
+            with self.app.app_context():
+                for league_id in get_league_registry().league_ids:
+                    manifest, _ = SnapshotService.read(league_id)
+                    if manifest:
+                        age.add_metric([str(league_id)], now - manifest['built_at'])
+                        data_age.add_metric([str(league_id)], now - manifest['data_as_of'])
+                yield age
+                yield data_age
+
+                usage = yahoo_quota.usage()
+                yield GaugeMetricFamily('waffle_yahoo_quota_tokens', 'Yahoo calls available now', usage['tokens'])
+                yield GaugeMetricFamily('waffle_yahoo_quota_used', 'Fraction of the Yahoo burst spent', usage['used'])
+                for name, documentation in (
+                    ('calls', 'Yahoo calls granted by the quota'),
+                    ('deferred', 'Yahoo calls deferred by the quota'),
+                    ('throttled', 'Times Yahoo rate limited the app'),
+                ):
+                    yield CounterMetricFamily(f'waffle_yahoo_quota_{name}', documentation, usage[name])
+
+
+def render_metrics(app) -> Optional[Tuple[bytes, str]]:
+    """Render every metric in the Prometheus text format.
+
+    Args:
+        app: Flask application (for the scrape-time gauges)
+
+    Returns:
+        Tuple of (body, content type), or None if prometheus_client is not installed
+    """
+    if prometheus_client is None:
+        return None
+
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        # Merge the files every worker writes
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+
+    state = CollectorRegistry()
+    state.register(StateCollector(app))
+    try:
+        body = prometheus_client.generate_latest(registry) + prometheus_client.generate_latest(state)
+    except Exception as e:
+        # Shared state unavailable (e.g. Redis down): still report this process
+        logger.error(f"Error reading metrics state: {e}")
+        body = prometheus_client.generate_latest(registry)
+    return body, prometheus_client.CONTENT_TYPE_LATEST
+
+
+def init_metrics(app, cache):
+    """Count cache hits and HTTP requests (including rate-limited ones) for /metrics.
+
+    Args:
+        app: Flask application
+        cache: flask-caching extension whose backend to instrument
+    """
+    if not app.config.get('METRICS_ENABLED', True) or prometheus_client is None:
+        return
+
+    count_cache_hits(app.extensions['cache'][cache])
+
+    @app.before_request
+    def start_request_metrics():
+        request.environ['waffle.metrics_started'] = time.perf_counter()
+
+    @app.after_request
+    def record_request_metrics(response):
+        try:
+            endpoint = request.endpoint or 'unmatched'
+            http_requests.labels(endpoint, str(response.status_code)).inc()
+            if response.status_code == 429:
+                rate_limited.labels(endpoint).inc()
+            # The limiter rejects requests before this app's before_request runs
+            started = request.environ.get('waffle.metrics_started')
+            if started is not None:
+                http_request_seconds.labels(endpoint).observe(time.perf_counter() - started)
+        except Exception as e:
+            logger.error(f"Error recording request metrics: {e}")
+        return response
@@ -0,0 +1,331 @@
+"""Opt-in sampling profiler for bracket builds and requests.
+
+A picked unit of work - a snapshot refresh, or an HTTP request - has its
+thread's stack sampled every PROFILE_INTERVAL_MS by one sampler thread per
+process, and the samples are written to PROFILE_DIR for flamegraph tools:
+
+- speedscope (default): <name>.speedscope.json, open at https://www.speedscope.app
+- collapsed: <name>.collapsed, one ``frame;frame;frame count`` line per
+  stack (flamegraph.pl, speedscope, inferno)
+
+Units are picked at random (PROFILE_SAMPLE_RATE, e.g. 0.01 for 1%), or a
+request is profiled on demand with an ``X-Profile`` header matching
+PROFILE_TOKEN; its file name comes back in the ``X-Profile`` response header.
+
+Samples are wall clock: time a build spends waiting on Yahoo shows up as
+much as time spent parsing. Executor threads are sampled with their build
+if they attach its profile (see ``attach``); the async engine's event loop
+thread is shared by every build and is not sampled.
+
+The sampler only runs while a profile is active, so unpicked work costs one
+random draw. Picked units shorter than PROFILE_MIN_DURATION_MS are dropped
+(unless requested by header), and only the newest PROFILE_MAX_FILES profiles
+are kept.
+"""
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+from flask import current_app, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+EXTENSIONS = {'speedscope': '.speedscope.json', 'collapsed': '.collapsed'}
+# Thread and executor machinery at the bottom of every stack
+MACHINERY_FILES = (f'{os.sep}threading.py', f'{os.sep}concurrent{os.sep}futures{os.sep}thread.py')
+STDLIB_DIR = os.path.dirname(os.__file__)
+
+_local = threading.local()
+_frame_names = {}
+
+
+def _frame_name(code) -> str:
+    """Flamegraph name of a code object: function (file:line), with short paths."""
+    name = _frame_names.get(code)
+    if name is None:
+        filename = code.co_filename
+        if 'site-packages' in filename:
+            filename = filename.split('site-packages', 1)[1].lstrip(os.sep)
+        elif filename.startswith(STDLIB_DIR):
+            filename = os.path.relpath(filename, STDLIB_DIR)
+        elif filename.startswith(os.getcwd()):
+            filename = os.path.relpath(filename)
+        name = _frame_names[code] = f'{code.co_name} ({filename}:{code.co_firstlineno})'.replace(';', ',')
+    return name
+
+
+def _stack(thread_name: str, frame) -> Tuple[str, ...]:
+    """A thread's stack, outermost frame first, under a root frame naming the thread."""
+    codes = []
+    while frame is not None:
+        codes.append(frame.f_code)
+        frame = frame.f_back
+    codes.reverse()
+    # Drop the thread/executor bootstrap frames every stack starts with
+    while len(codes) > 1 and codes[0].co_filename.endswith(MACHINERY_FILES):
+        codes.pop(0)
+    return (f'thread {thread_name}',) + tuple(_frame_name(code) for code in codes)
+
+
+class Profile:
+    """Stack samples of one unit of work, across the threads attached to it."""
+
+    def __init__(self, name: str, interval: float, forced: bool = False):
+        """Initialize a profile.
+
+        Args:
+            name: Unit of work (e.g. 'snapshot_refresh' or a request endpoint)
+            interval: Seconds between samples
+            forced: Requested explicitly (kept whatever its duration)
+        """
+        self.name = name
+        self.interval = interval
+        self.forced = forced
+        self.samples = Counter()
+        self.started = time.time()
+        self.duration = 0.0
+        self.file_name = f'{time.strftime("%Y%m%d-%H%M%S")}-{int(self.started * 1000) % 1000:03d}-{name}-{os.getpid()}'
+        self._lock = threading.Lock()
+
+    def add(self, stack: Tuple[str, ...]):
+        with self._lock:
+            self.samples[stack] += 1
+
+    def collapsed(self) -> str:
+        """Samples as collapsed stacks (one 'frame;frame count' line per stack)."""
+        with self._lock:
+            samples = list(self.samples.items())
+        return ''.join(f'{";".join(stack)} {count}\n' for stack, count in samples)
+
+    def speedscope(self) -> Dict:
+        """Samples as a speedscope 'sampled' profile (weights in milliseconds)."""
+        with self._lock:
+            samples = list(self.samples.items())
+        frames, index = [], {}
+        for stack, _ in samples:
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({'name': frame})
+        weights = [count * self.interval * 1000 for _, count in samples]
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': self.file_name,
+            'exporter': 'waffle-bowl-tracker',
+            'shared': {'frames': frames},
+            'profiles': [{
+                'type': 'sampled',
+                'name': self.name,
+                'unit': 'milliseconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': [[index[frame] for frame in stack] for stack, _ in samples],
+                'weights': weights
+            }]
+        }
+
+
+class Sampler(threading.Thread):
+    """Daemon thread sampling the stacks of every thread attached to an active profile."""
+
+    def __init__(self):
+        super().__init__(name='profile-sampler', daemon=True)
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._active = threading.Event()
+        self.interval = 0.01
+
+    def add(self, profile: Profile):
+        """Sample the calling thread into a profile until removed."""
+        thread = threading.current_thread()
+        with self._lock:
+            self._threads[thread.ident] = (profile, thread.name)
+            self.interval = min(profile.interval for profile, _ in self._threads.values())
+        self._active.set()
+
+    def remove(self):
+        """Stop sampling the calling thread."""
+        with self._lock:
+            self._threads.pop(threading.get_ident(), None)
+            if not self._threads:
+                self._active.clear()
+
+    def run(self):
+        while True:
+            self._active.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                threads = list(self._threads.items())
+            frames = sys._current_frames()
+            for thread_id, (profile, thread_name) in threads:
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    profile.add(_stack(thread_name, frame))
+            del frames
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def _get_sampler() -> Sampler:
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = Sampler()
+            _sampler.start()
+        return _sampler
+
+
+def current_profile() -> Optional[Profile]:
+    """The profile this thread's samples go to, if any."""
+    return getattr(_local, 'profile', None)
+
+
+@contextmanager
+def attach(profile: Optional[Profile]):
+    """Sample this thread into another thread's profile (e.g. in an executor)."""
+    previous = current_profile()
+    if profile is None or previous is not None:
+        yield
+        return
+    _local.profile = profile
+    _get_sampler().add(profile)
+    try:
+        yield
+    finally:
+        _get_sampler().remove()
+        _local.profile = None
+
+
+def start(name: str, forced: bool = False) -> Optional[Profile]:
+    """Start profiling this thread if the unit of work is picked.
+
+    Args:
+        name: Unit of work (file name part)
+        forced: Profile regardless of PROFILE_SAMPLE_RATE
+
+    Returns:
+        The Profile, or None if not picked (or this thread is already profiled)
+    """
+    config = current_app.config
+    if current_profile() is not None:
+        return None
+    if not forced and random.random() >= config.get('PROFILE_SAMPLE_RATE', 0):
+        return None
+
+    profile = Profile(name, config.get('PROFILE_INTERVAL_MS', 10) / 1000, forced=forced)
+    _local.profile = profile
+    _get_sampler().add(profile)
+    return profile
+
+
+def stop(profile: Optional[Profile], save: bool = True) -> Optional[str]:
+    """Stop profiling this thread and save the profile.
+
+    Args:
+        profile: Profile returned by start (None is ignored)
+        save: Write the samples to PROFILE_DIR
+
+    Returns:
+        Path of the written file, or None if nothing was written
+    """
+    if profile is None or current_profile() is not profile:
+        return None
+    _get_sampler().remove()
+    _local.profile = None
+    profile.duration = time.time() - profile.started
+
+    config = current_app.config
+    if not save or not profile.samples:
+        return None
+    if not profile.forced and profile.duration * 1000 < config.get('PROFILE_MIN_DURATION_MS', 100):
+        return None
+
+    try:
+        return _save(profile, config.get('PROFILE_DIR', 'data/profiles'), config.get('PROFILE_FORMAT', 'speedscope'),
+                     config.get('PROFILE_MAX_FILES', 100))
+    except Exception as e:
+        logger.error(f"Error saving profile {profile.file_name}: {e}")
+        return None
+
+
+def _save(profile: Profile, directory: str, fmt: str, max_files: int) -> str:
+    """Write a profile, then delete the oldest profiles beyond max_files."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, profile.file_name + EXTENSIONS.get(fmt, EXTENSIONS['speedscope']))
+    with open(path, 'w') as f:
+        if fmt == 'collapsed':
+            f.write(profile.collapsed())
+        else:
+            json.dump(profile.speedscope(), f)
+
+    profiles = sorted(
+        (entry for entry in os.scandir(directory) if entry.name.endswith(tuple(EXTENSIONS.values()))),
+        key=lambda entry: entry.stat().st_mtime
+    )
+    for entry in profiles[:max(0, len(profiles) - max_files)]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass  # Pruned by another worker
+    return path
+
+
+@contextmanager
+def profile(name: str):
+    """Profile a block if it is picked (PROFILE_SAMPLE_RATE), e.g. a bracket build.
+
+    Yields:
+        The Profile, or None if not picked
+    """
+    active = start(name)
+    try:
+        yield active
+    finally:
+        stop(active)
+
+
+def init_profiler(app):
+    """Profile picked requests, and requests sent with a matching X-Profile header.
+
+    Args:
+        app: Flask application
+    """
+    if not app.config.get('PROFILE_SAMPLE_RATE', 0) and not app.config.get('PROFILE_TOKEN'):
+        return
+
+    def requested() -> bool:
+        token = app.config.get('PROFILE_TOKEN')
+        header = request.headers.get(PROFILE_HEADER)
+        return bool(token and header and hmac.compare_digest(header.encode('utf-8'), token.encode('utf-8')))
+
+    @app.before_request
+    def start_profile():
+        if request.endpoint != 'static':
+            _local.request_profile = start(request.endpoint or 'unmatched', forced=requested())
+
+    @app.after_request
+    def save_profile(response):
+        active = getattr(_local, 'request_profile', None)
+        _local.request_profile = None
+        # Streams (SSE) outlive the request; their samples would only show the wait loop
+        path = stop(active, save=not response.is_streamed)
+        if path and active.forced:
+            response.headers[PROFILE_HEADER] = os.path.basename(path)
+        return response
+
+    @app.teardown_request
+    def save_failed_profile(exc):
+        # after_request does not run for unhandled errors
+        stop(getattr(_local, 'request_profile', None))
+        _local.request_profile = None
@@ -0,0 +1,199 @@
+"""Record Yahoo responses for a league into replay fixtures.
+
+Runs one bracket build (and optionally extra weeks) against Yahoo with
+YAHOO_BACKEND=record, with an in-memory cache so every resource is
+actually requested, and saves every response under
+YAHOO_FIXTURES_DIR/<season>/<league_id>/ (see app/services/yahoo_fixtures.py).
+Replay them with YAHOO_BACKEND=replay and YAHOO_FIXTURES_SEASON=<season>.
+
+--synthetic writes a generated league in Yahoo's response format instead,
+so the replay backend and benchmarks/load_test.py work without Yahoo
+tokens.
+
+Usage:
+    python -m app.utils.record_fixtures [--league-id ID] [--weeks 14 15]
+    python -m app.utils.record_fixtures --synthetic [--league-id demo] [--teams 12] [--week 16]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+SYNTHETIC_SEASON = 2025
+SYNTHETIC_GAME_ID = 461
+LINEUP = ['QB', 'WR', 'WR', 'RB', 'RB', 'TE', 'W/R/T', 'K', 'DEF', 'BN', 'BN', 'BN', 'BN', 'BN', 'BN']
+NFL_TEAMS = ['BUF', 'DAL', 'DET', 'KC', 'MIA', 'NE', 'PHI', 'SF']
+
+
+def record(league_id: str, weeks):
+    """Record one bracket build, plus scoreboards and rosters for extra weeks."""
+    os.environ['YAHOO_BACKEND'] = 'record'
+    from app import cache, create_app
+    from app.services.bracket_service import BracketService
+    from app.services.snapshot_service import SnapshotService
+    from app.services.yahoo_fixtures import fixture_store
+    from app.services.yahoo_service import YahooService
+
+    app = create_app()
+    cache.init_app(app, config={'CACHE_TYPE': 'SimpleCache'})
+    app.config['SEASON_ARCHIVE_PATH'] = ''
+
+    with app.app_context():
+        yahoo = YahooService(league_id)
+        if not yahoo.yf_query:
+            print("❌ Error: could not connect to Yahoo")
+            sys.exit(1)
+
+        print(f"Recording league {yahoo.league_id}, season {yahoo.season}...")
+        snapshot = SnapshotService(yahoo).build()
+        if not snapshot:
+            print("❌ Error: bracket build failed")
+            sys.exit(1)
+
+        team_ids = [team['team_id'] for team in BracketService().get_waffle_bowl_teams(snapshot['standings'])]
+        for week in weeks:
+            yahoo.get_scoreboard(week)
+            yahoo.get_team_rosters(team_ids, week)
+
+        store = fixture_store(yahoo.league_id, yahoo.season)
+        print(f"✓ {len(store)} fixtures in {store.directory}")
+        print(f"Replay with: YAHOO_BACKEND=replay YAHOO_FIXTURES_SEASON={yahoo.season} LEAGUE_ID={yahoo.league_id}")
+
+
+def _team_meta(league_key: str, team_id: int) -> list:
+    return [
+        {'team_key': f'{league_key}.t.{team_id}'},
+        {'team_id': str(team_id)},
+        {'name': f'Team {team_id}'},
+        {'managers': [{'manager': {'manager_id': str(team_id), 'nickname': f'Manager {team_id}'}}]},
+    ]
+
+
+def _roster(league_key: str, team_id: int, week: int, rng: random.Random) -> dict:
+    players = {}
+    for index, position in enumerate(LINEUP):
+        player_id = team_id * 100 + index
+        display = 'WR' if position in ('BN', 'W/R/T') else position
+        players[str(index)] = {'player': [
+            [
+                {'player_key': f'{SYNTHETIC_GAME_ID}.p.{player_id}'},
+                {'player_id': str(player_id)},
+                {'name': {'full': f'Player {player_id}', 'first': 'Player', 'last': str(player_id)}},
+                {'editorial_team_abbr': NFL_TEAMS[player_id % len(NFL_TEAMS)]},
+                {'display_position': display},
+            ],
+            {'selected_position': [{'coverage_type': 'week', 'week': str(week)}, {'position': position}]},
+            {'player_points': {'coverage_type': 'week', 'week': str(week), 'total': f'{rng.uniform(0, 25):.2f}'}},
+        ]}
+    players['count'] = len(LINEUP)
+    return {'team': [_team_meta(league_key, team_id), {'roster': {'0': {'players': players}, 'week': str(week)}}]}
+
+
+def synthesize(league_id: str, num_teams: int, current_week: int, seed: int):
+    """Write a generated league's responses for every resource a bracket build requests."""
+    from app.services.yahoo_fixtures import FixtureStore
+
+    rng = random.Random(seed)
+    league_key = f'{SYNTHETIC_GAME_ID}.l.{league_id}'
+    end_week = 17
+    directory = os.path.join(
+        os.getenv('YAHOO_FIXTURES_DIR', 'fixtures/yahoo'), str(SYNTHETIC_SEASON), str(league_id)
+    )
+    store = FixtureStore(directory)
+
+    def save(path, content):
+        store.save(path, json.dumps({'fantasy_content': content}).encode('utf-8'))
+
+    league_meta = {
+        'league_key': league_key, 'league_id': str(league_id), 'name': f'Synthetic League {league_id}',
+        'num_teams': num_teams, 'current_week': current_week, 'start_week': '1', 'end_week': str(end_week),
+        'season': str(SYNTHETIC_SEASON), 'game_code': 'nfl'
+    }
+    save(f'game/{SYNTHETIC_GAME_ID}/metadata', {'game': [{
+        'game_key': str(SYNTHETIC_GAME_ID), 'game_id': str(SYNTHETIC_GAME_ID), 'code': 'nfl',
+        'season': str(SYNTHETIC_SEASON)
+    }]})
+    save(f'league/{league_key}/metadata', {'league': [league_meta]})
+
+    # Team 1 leads the league, team N is last
+    teams = {}
+    for rank, team_id in enumerate(range(1, num_teams + 1), start=1):
+        wins = max(0, 13 - rank)
+        teams[str(rank - 1)] = {'team': [
+            _team_meta(league_key, team_id),
+            {'team_points': {'coverage_type': 'season', 'season': str(SYNTHETIC_SEASON),
+                             'total': f'{1600 - rank * 25 + rng.uniform(0, 20):.2f}'}},
+            {'team_standings': {
+                'rank': rank,
+                'outcome_totals': {'wins': wins, 'losses': 14 - wins, 'ties': 0},
+                'points_for': f'{1600 - rank * 25:.2f}',
+                'points_against': f'{1400 + rng.uniform(0, 100):.2f}'
+            }},
+        ]}
+    teams['count'] = num_teams
+    save(f'league/{league_key}/standings', {'league': [league_meta, {'standings': [{'teams': teams}]}]})
+
+    team_ids = list(range(1, num_teams + 1))
+    for week in range(max(1, end_week - 3), end_week + 1):
+        status = 'postevent' if week < current_week else ('midevent' if week == current_week else 'preevent')
+        matchups = {}
+        for index in range(num_teams // 2):
+            pair = team_ids[index * 2:index * 2 + 2]
+            points = {team_id: rng.uniform(70, 140) if status != 'preevent' else 0.0 for team_id in pair}
+            winner = max(pair, key=points.get)
+            matchups[str(index)] = {'matchup': {
+                'week': str(week), 'status': status, 'is_tied': 0,
+                'winner_team_key': f'{league_key}.t.{winner}' if status == 'postevent' else '',
+                '0': {'teams': {
+                    **{str(slot): {'team': [
+                        _team_meta(league_key, team_id),
+                        {'team_points': {'coverage_type': 'week', 'week': str(week),
+                                         'total': f'{points[team_id]:.2f}'}},
+                    ]} for slot, team_id in enumerate(pair)},
+                    'count': 2
+                }}
+            }}
+        matchups['count'] = num_teams // 2
+        save(f'league/{league_key}/scoreboard;week={week}',
+             {'league': [league_meta, {'scoreboard': {'0': {'matchups': matchups}, 'week': str(week)}}]})
+
+        rosters = {team_id: _roster(league_key, team_id, week, rng) for team_id in team_ids}
+        for team_id, roster in rosters.items():
+            save(f'team/{league_key}.t.{team_id}/roster;week={week}/players/stats', roster)
+
+        # Batched rosters of the Waffle Bowl teams (every bracket size up to the whole league)
+        for size in range(2, num_teams + 1):
+            bottom = sorted(team_ids[-size:], key=str)
+            batch = {str(index): rosters[team_id] for index, team_id in enumerate(bottom)}
+            batch['count'] = len(bottom)
+            team_keys = ','.join(f'{league_key}.t.{team_id}' for team_id in bottom)
+            save(f'teams;team_keys={team_keys}/roster;week={week}/players/stats', {'teams': batch})
+
+    print(f"✓ {len(store)} fixtures in {directory}")
+    print(f"Replay with: YAHOO_BACKEND=replay YAHOO_FIXTURES_SEASON={SYNTHETIC_SEASON} LEAGUE_ID={league_id}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--league-id', help='League to record (default: LEAGUE_ID; "demo" with --synthetic)')
+    parser.add_argument('--weeks', type=int, nargs='*', default=[], help='Extra weeks to record')
+    parser.add_argument('--synthetic', action='store_true', help='Generate a league instead of recording Yahoo')
+    parser.add_argument('--teams', type=int, default=12, help='Synthetic league size')
+    parser.add_argument('--week', type=int, default=16, help='Synthetic current week')
+    parser.add_argument('--seed', type=int, default=1, help='Synthetic scores seed')
+    args = parser.parse_args()
+
+    if args.synthetic:
+        synthesize(args.league_id or 'demo', args.teams, args.week, args.seed)
+    else:
+        record(args.league_id or os.getenv('LEAGUE_ID'), args.weeks)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,206 @@
+"""Stale-while-revalidate cache tier with a cross-worker single-flight guard.
+
+Every entry carries the time it was fetched and lives in the cache (Redis)
+for two lifetimes:
+
+- soft TTL: while younger than this the value is fresh and served as-is.
+  Once older, it is still served immediately, and one background refresh is
+  triggered.
+- hard TTL: soft TTL plus CACHE_STALE_TTL. Until then a stale value keeps
+  being served if refreshes fail, so a Yahoo brownout does not blank the
+  page.
+
+The snapshot builder is the exception: it is what refreshes Yahoo data, so
+inside ``revalidate_inline()`` a stale entry is refetched before it is
+returned (and only served stale if the refetch fails). Otherwise every
+snapshot would publish the data of the previous refresh.
+
+Only a true miss (nothing cached at all) blocks a caller. On a miss exactly
+one caller across all gunicorn workers recomputes, holding a short lock
+(Redis SET NX via cache.add); the others wait for it to publish.
+"""
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from flask import current_app
+
+from app import cache
+from app.utils.metrics import count_stale, submit_counted
+
+logger = logging.getLogger(__name__)
+
+# How long a recompute may hold the lock before another caller may take over
+LOCK_TIMEOUT = 30
+# How long callers wait for the winner on a true miss
+WAIT_TIMEOUT = 10
+POLL_INTERVAL = 0.1
+# Default serve-stale window (overridden by CACHE_STALE_TTL)
+DEFAULT_STALE_TTL = 1800
+
+# Background revalidation (bounded, shared by the whole process)
+_revalidator = ThreadPoolExecutor(max_workers=4, thread_name_prefix='swr-revalidate')
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+# Threads that recompute stale entries before returning them
+_inline = threading.local()
+
+
+def _stale_ttl() -> int:
+    return current_app.config.get('CACHE_STALE_TTL', DEFAULT_STALE_TTL)
+
+
+def swr_store(key: str, value: Any, soft_ttl: int):
+    """Store a freshly fetched value with its fetch time, kept until the hard TTL.
+
+    Used directly when one fetch produces values for several keys (e.g. a
+    batched Yahoo request seeding per-team entries).
+    """
+    entry = {'value': value, 'fetched_at': time.time()}
+    cache.set(key, entry, timeout=soft_ttl + _stale_ttl())
+
+
+def swr_is_fresh(key: str, soft_ttl: int) -> bool:
+    """Check whether a key holds a value younger than its soft TTL."""
+    entry = cache.get(key)
+    return entry is not None and time.time() - entry['fetched_at'] < soft_ttl
+
+
+def _recompute(key: str, compute: Callable[[], Any], soft_ttl: int):
+    """Recompute a value if this caller wins the single-flight lock.
+
+    Returns:
+        Tuple of (won_lock, value). value is None if compute failed, in which
+        case any stale entry is left in place to keep being served.
+    """
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, True, timeout=LOCK_TIMEOUT):
+        return False, None
+
+    try:
+        value = compute()
+        if value is not None:
+            swr_store(key, value, soft_ttl)
+        return True, value
+    finally:
+        cache.delete(lock_key)
+
+
+def _revalidate_in_background(key: str, compute: Callable[[], Any], soft_ttl: int):
+    """Refresh a stale entry without blocking the caller (once per process)."""
+    with _revalidating_lock:
+        if key in _revalidating:
+            return
+        _revalidating.add(key)
+
+    app = current_app._get_current_object()
+
+    def run():
+        try:
+            with app.app_context():
+                _recompute(key, compute, soft_ttl)
+        except Exception as e:
+            logger.error(f"Background revalidation of {key} failed: {e}")
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard(key)
+
+    submit_counted(_revalidator, 'swr_revalidate', run)
+
+
+@contextmanager
+def revalidate_inline():
+    """Make swr_get recompute stale entries before returning them, in this thread."""
+    previous = getattr(_inline, 'enabled', False)
+    _inline.enabled = True
+    try:
+        yield
+    finally:
+        _inline.enabled = previous
+
+
+def swr_get(key: str, compute: Callable[[], Any], soft_ttl: int, revalidate: Optional[str] = None) -> Optional[Any]:
+    """Get a cached value with stale-while-revalidate semantics.
+
+    Args:
+        key: Cache key for the value
+        compute: Zero-argument callable producing the value (None means failure)
+        soft_ttl: Seconds the value is considered fresh
+        revalidate: How a stale value is refreshed: 'background' (served
+            as-is meanwhile) or 'sync' (recomputed first, served only if that
+            fails). Defaults to 'sync' inside revalidate_inline().
+
+    Returns:
+        The fresh, stale or newly computed value, or None if unavailable
+    """
+    if revalidate is None:
+        revalidate = 'sync' if getattr(_inline, 'enabled', False) else 'background'
+
+    entry = cache.get(key)
+    if entry is not None:
+        if time.time() - entry['fetched_at'] >= soft_ttl:
+            if revalidate == 'sync':
+                _, value = _recompute(key, compute, soft_ttl)
+                if value is not None:
+                    return value
+                # Refetch failed, or another worker is refreshing it right now
+            else:
+                _revalidate_in_background(key, compute, soft_ttl)
+            count_stale(key)
+        return entry['value']
+
+    won, value = _recompute(key, compute, soft_ttl)
+    if won:
+        return value
+
+    # Another caller is computing a cold key - wait for it to publish
+    lock_key = f'{key}:lock'
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value']
+        if cache.get(lock_key) is None:
+            # Winner finished without producing a value
+            break
+
+    logger.warning(f"Gave up waiting for recompute of {key}")
+    entry = cache.get(key)
+    return entry['value'] if entry is not None else None
+
+
+def swr_memoize(soft_ttl: int, key_prefix: str = None):
+    """Decorator version of swr_get for YahooService methods.
+
+    A drop-in replacement for ``cache.memoize(timeout=...)``. Keys are built
+    from the method name, the instance's league_id and the call arguments.
+
+    Args:
+        soft_ttl: Seconds a cached value is considered fresh
+        key_prefix: Optional key prefix (defaults to the function name)
+    """
+    def decorator(f):
+        prefix = key_prefix or f.__name__
+
+        def make_cache_key(self, *args, **kwargs):
+            parts = [prefix, str(getattr(self, 'league_id', ''))]
+            parts.extend(str(arg) for arg in args)
+            parts.extend(f'{k}={v}' for k, v in sorted(kwargs.items()))
+            return ':'.join(parts)
+
+        @functools.wraps(f)
+        def wrapper(self, *args, **kwargs):
+            key = make_cache_key(self, *args, **kwargs)
+            return swr_get(key, lambda: f(self, *args, **kwargs), soft_ttl)
+
+        # Exposed so callers can warm or inspect the same entry
+        wrapper.make_cache_key = make_cache_key
+        wrapper.soft_ttl = soft_ttl
+        return wrapper
+
+    return decorator
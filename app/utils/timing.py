@@ -0,0 +1,269 @@
+"""Per-request timing: spans, Server-Timing headers and latency histograms.
+
+Code marks the work worth timing with ``span(name)`` (or ``@timed(name)``):
+
+- yahoo.*: YahooService calls (cache included); yahoo.fetch is the Yahoo
+  request itself
+- cache.*: every get/set on the cache backend
+- bracket.*: bracket engine steps (seeding, structure, results, status)
+- render.<template>: Jinja template renders
+- compress: gzip/brotli compression of a response body
+
+Spans are collected per unit of work - an HTTP request, or a snapshot
+refresh in the background - and only when one is being collected, so
+instrumented code costs next to nothing elsewhere. Repeated spans are
+summed (with a count). For a request, the totals are sent back in a
+``Server-Timing`` header (visible in the browser's network panel):
+
+    Server-Timing: cache.get_many;dur=1.2;desc="x2", render.bracket;dur=8.4, total;dur=11.0
+
+and every span total (plus the unit's own total) is recorded in a latency
+histogram per endpoint, served as JSON at /api/timing. Histograms are kept
+per process (each gunicorn worker has its own).
+
+Spans started in executor threads are only collected if the thread
+attaches the caller's collector (see ``attach``).
+"""
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Dict, Optional
+
+from flask import request
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds, milliseconds (plus +Inf)
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+CACHE_METHODS = ('get', 'get_many', 'set', 'set_many', 'add', 'delete', 'delete_many', 'has')
+
+_local = threading.local()
+
+
+class Timings:
+    """Span totals of one unit of work, in first-seen order."""
+
+    def __init__(self):
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, ms: float):
+        with self._lock:
+            total = self.spans.setdefault(name, [0.0, 0])
+            total[0] += ms
+            total[1] += 1
+
+    def items(self):
+        with self._lock:
+            return [(name, ms, count) for name, (ms, count) in self.spans.items()]
+
+
+class LatencyHistograms:
+    """Cumulative latency histograms per (endpoint, span), for this process."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint: str, name: str, ms: float):
+        with self._lock:
+            histogram = self._histograms.get((endpoint, name))
+            if histogram is None:
+                histogram = self._histograms[(endpoint, name)] = {
+                    'buckets': [0] * (len(BUCKETS_MS) + 1), 'count': 0, 'sum': 0.0
+                }
+            histogram['buckets'][bisect.bisect_left(BUCKETS_MS, ms)] += 1
+            histogram['count'] += 1
+            histogram['sum'] += ms
+
+    @staticmethod
+    def _quantile(buckets, count: int, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile (None if in +Inf)."""
+        rank, seen = q * count, 0
+        for upper, bucket_count in zip(BUCKETS_MS, buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return upper
+        return None
+
+    def snapshot(self) -> Dict:
+        """Histograms by endpoint, then span.
+
+        Returns:
+            Dict mapping endpoint to span name to count, sum_ms, mean_ms,
+            p50_ms/p95_ms/p99_ms (bucket upper bounds) and buckets (cumulative
+            counts by upper bound in ms, '+Inf' last)
+        """
+        with self._lock:
+            histograms = {key: dict(value, buckets=list(value['buckets'])) for key, value in self._histograms.items()}
+
+        result = {}
+        for (endpoint, name), histogram in sorted(histograms.items()):
+            count, buckets = histogram['count'], histogram['buckets']
+            cumulative, running = {}, 0
+            for upper, bucket_count in zip(list(BUCKETS_MS) + ['+Inf'], buckets):
+                running += bucket_count
+                cumulative[str(upper)] = running
+            result.setdefault(endpoint, {})[name] = {
+                'count': count,
+                'sum_ms': round(histogram['sum'], 3),
+                'mean_ms': round(histogram['sum'] / count, 3),
+                'p50_ms': self._quantile(buckets, count, 0.50),
+                'p95_ms': self._quantile(buckets, count, 0.95),
+                'p99_ms': self._quantile(buckets, count, 0.99),
+                'buckets': cumulative
+            }
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+histograms = LatencyHistograms()
+
+
+def current_timings() -> Optional[Timings]:
+    """The collector of the unit of work running in this thread, if any."""
+    return getattr(_local, 'timings', None)
+
+
+@contextmanager
+def attach(timings: Optional[Timings]):
+    """Collect this thread's spans into another thread's collector (e.g. in an executor)."""
+    previous = current_timings()
+    _local.timings = timings
+    try:
+        yield
+    finally:
+        _local.timings = previous
+
+
+@contextmanager
+def span(name: str):
+    """Time a block as a span of the current unit of work (a no-op if none is collected)."""
+    timings = current_timings()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, (time.perf_counter() - started) * 1000)
+
+
+def timed(name: str):
+    """Decorator timing every call of a function as a span."""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            if current_timings() is None:
+                return f(*args, **kwargs)
+            with span(name):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _record(endpoint: str, timings: Timings, total_ms: float):
+    for name, ms, _ in timings.items():
+        histograms.observe(endpoint, name, ms)
+    histograms.observe(endpoint, 'total', total_ms)
+
+
+@contextmanager
+def collect(endpoint: str):
+    """Collect the spans of a background unit of work into the histograms under an endpoint name.
+
+    Args:
+        endpoint: Histogram name of the work (e.g. 'snapshot_refresh')
+    """
+    timings = Timings()
+    started = time.perf_counter()
+    with attach(timings):
+        try:
+            yield timings
+        finally:
+            _record(endpoint, timings, (time.perf_counter() - started) * 1000)
+
+
+def server_timing_header(timings: Timings, total_ms: float) -> str:
+    """Format span totals as a Server-Timing header value."""
+    entries = []
+    for name, ms, count in timings.items():
+        entry = f'{name};dur={ms:.1f}'
+        if count > 1:
+            entry += f';desc="x{count}"'
+        entries.append(entry)
+    entries.append(f'total;dur={total_ms:.1f}')
+    return ', '.join(entries)
+
+
+def instrument_cache(backend):
+    """Time every get/set of a cache backend as cache.<method> spans (in place)."""
+    for method in CACHE_METHODS:
+        original = getattr(backend, method, None)
+        if original is None or getattr(original, '__wrapped__', None):
+            continue
+        setattr(backend, method, timed(f'cache.{method}')(original))
+
+
+def init_timing(app, cache):
+    """Collect spans for every request, add Server-Timing headers and record histograms.
+
+    Args:
+        app: Flask application
+        cache: flask-caching extension whose backend to instrument
+    """
+    if not app.config.get('TIMING_ENABLED', True):
+        return
+
+    from flask import before_render_template, template_rendered
+
+    instrument_cache(app.extensions['cache'][cache])
+
+    def template_started(sender, template, context, **extra):
+        if current_timings() is not None:
+            if getattr(_local, 'renders', None) is None:
+                _local.renders = []
+            _local.renders.append(time.perf_counter())
+
+    def template_finished(sender, template, context, **extra):
+        timings = current_timings()
+        renders = getattr(_local, 'renders', None)
+        if timings is not None and renders:
+            name = (template.name or 'template').rsplit('/', 1)[-1].rsplit('.', 1)[0]
+            timings.add(f'render.{name}', (time.perf_counter() - renders.pop()) * 1000)
+
+    # Local functions: keep strong references (blinker holds weak ones by default)
+    before_render_template.connect(template_started, app, weak=False)
+    template_rendered.connect(template_finished, app, weak=False)
+
+    @app.before_request
+    def start_timing():
+        _local.timings = Timings()
+        _local.renders = []
+        _local.started = time.perf_counter()
+
+    @app.after_request
+    def finish_timing(response):
+        timings = current_timings()
+        if timings is None:
+            return response
+        total_ms = (time.perf_counter() - _local.started) * 1000
+        try:
+            _record(request.endpoint or 'unmatched', timings, total_ms)
+            if app.config.get('SERVER_TIMING_HEADER', True):
+                response.headers['Server-Timing'] = server_timing_header(timings, total_ms)
+        except Exception as e:
+            logger.error(f"Error recording request timings: {e}")
+        return response
+
+    @app.teardown_request
+    def stop_timing(exc):
+        _local.timings = None
+        _local.renders = []
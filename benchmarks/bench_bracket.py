@@ -0,0 +1,198 @@
+"""Benchmark bracket logic and Yahoo parsing across league sizes, against stored baselines.
+
+For synthetic leagues of 8 to 32 teams (a Waffle Bowl of the bottom half,
+rosters of 25 players) times:
+
+- standings: YahooService standings parsing (yfpy teams to dicts)
+- seeding: BracketService.get_waffle_bowl_teams
+- structure: BracketService.create_bracket_structure
+- resolution: a new bracket resolved round by round to the final
+  (update_bracket_with_results with every round's scoreboard)
+- roster: YahooService roster parsing (including lineup sorting) of every
+  Waffle Bowl team
+- starter points: YahooService.starter_points over those rosters
+
+Absolute timings move with the machine, its load and CPU frequency, so
+cases are compared in calibration units: each case is timed right after a
+fixed pure-Python workload (dict building and sorting, like the code under
+test), and its time is divided by that workload's. Each case keeps its best
+ratio over --rounds passes through the whole suite.
+
+--save stores the ratios as the baseline
+(benchmarks/baselines/bench_bracket.json by default); later runs compare
+against it and flag cases slower than the baseline by more than
+--threshold. The comparison is a report, not a test: on a shared or
+single-CPU machine single cases still swing by 50% or more between runs.
+--strict exits non-zero on flagged cases, for a quiet dedicated machine
+with a baseline saved on it. A baseline saved on another machine or Python
+version is only approximate: re-save it after an upgrade.
+
+Usage:
+    python benchmarks/bench_bracket.py [--number N] [--rounds R] [--sizes 8 16 32] [--save]
+        [--baseline PATH] [--threshold 0.25] [--strict]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from yfpy.models import Standings  # noqa: E402
+
+from bench_parsing import make_player, make_team  # noqa: E402
+
+from app.services.bracket_service import BracketService  # noqa: E402
+from app.services.yahoo_service import YahooService  # noqa: E402
+
+SIZES = [8, 12, 16, 24, 32]
+ROSTER_SIZE = 25
+LINEUP = ['QB', 'WR', 'WR', 'WR', 'RB', 'RB', 'TE', 'W/R/T', 'K', 'DEF'] + ['BN'] * 13 + ['IR'] * 2
+END_WEEK = 17
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baselines', 'bench_bracket.json')
+UNIT = 'calibration'
+
+
+def calibration():
+    """Fixed workload every case is measured against."""
+    rows = [{'id': str(i), 'name': f'Player {i}', 'points': (i * 7919) % 97 / 3} for i in range(200)]
+    rows.sort(key=lambda row: (row['points'], row['name']))
+    return {row['id']: row['points'] for row in rows}
+
+
+def make_league(num_teams: int, seed: int = 1):
+    """Yahoo payloads of a synthetic league: standings, and per-team rosters in Yahoo's order."""
+    rng = random.Random(seed)
+    teams = [make_team(team_id) for team_id in range(1, num_teams + 1)]
+    for team in teams:
+        team.team_standings.outcome_totals.wins = str(rng.randint(2, 12))
+
+    rosters = {}
+    for team_id in range(1, num_teams + 1):
+        lineup = LINEUP[:]
+        rng.shuffle(lineup)
+        rosters[str(team_id)] = [make_player(team_id * 100 + i, lineup[i]) for i in range(ROSTER_SIZE)]
+    return Standings({'teams': teams}), rosters
+
+
+def make_scoreboards(bracket, seed: int = 1):
+    """A final scoreboard for every round's week (all Waffle Bowl teams scored)."""
+    rng = random.Random(seed)
+    return [{
+        'week': round_data['week'],
+        'matchups': [{'status': 'postevent'}],
+        'team_scores': {
+            str(team['team_id']): {'points': round(rng.uniform(60, 140), 2)} for team in bracket['teams']
+        }
+    } for round_data in bracket['rounds']]
+
+
+def cases(num_teams: int):
+    """Named zero-argument callables for one league size."""
+    standings_data, roster_data = make_league(num_teams)
+    # Only the parsing helpers are used; no Yahoo session is needed
+    yahoo = object.__new__(YahooService)
+    bracket_svc = BracketService(num_teams // 2)
+
+    standings = yahoo._parse_standings(standings_data)
+    waffle_teams = bracket_svc.get_waffle_bowl_teams(standings)
+    scoreboards = make_scoreboards(bracket_svc.create_bracket_structure(waffle_teams, END_WEEK, END_WEEK))
+    waffle_ids = [str(team['team_id']) for team in waffle_teams]
+    rosters = [yahoo._parse_roster(team_id, END_WEEK, roster_data[team_id]) for team_id in waffle_ids]
+
+    def resolve():
+        bracket = bracket_svc.create_bracket_structure(
+            [dict(team) for team in waffle_teams], END_WEEK + 1, END_WEEK
+        )
+        for scoreboard in scoreboards:
+            bracket_svc.update_bracket_with_results(bracket, scoreboard, current_week=END_WEEK + 1)
+        return bracket
+
+    # Every round must be decided, or the timings measure an unfinished bracket
+    if not all(matchup['loser'] for round_data in resolve()['rounds'] for matchup in round_data['matchups']):
+        sys.exit(f'{num_teams}-team league: bracket did not resolve')
+
+    return {
+        'standings': lambda: yahoo._parse_standings(standings_data),
+        'seeding': lambda: bracket_svc.get_waffle_bowl_teams(standings),
+        'structure': lambda: bracket_svc.create_bracket_structure(waffle_teams, END_WEEK, END_WEEK),
+        'resolution': resolve,
+        'roster': lambda: [yahoo._parse_roster(team_id, END_WEEK, roster_data[team_id]) for team_id in waffle_ids],
+        'starter points': lambda: [YahooService.starter_points(roster) for roster in rosters],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=100, help='Iterations per timing run')
+    parser.add_argument('--rounds', type=int, default=5, help='Passes over every case (the best is kept)')
+    parser.add_argument('--sizes', type=int, nargs='*', default=SIZES, help='League sizes (teams)')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Baseline file')
+    parser.add_argument('--save', action='store_true', help='Store this run as the baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='Allowed slowdown vs the baseline (0.25 = 25%%)')
+    parser.add_argument('--strict', action='store_true', help='Exit non-zero when a case exceeds --threshold')
+    args = parser.parse_args()
+
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            saved = json.load(f)
+        if saved.get('unit') == UNIT:
+            baseline = saved['results']
+        else:
+            print(f'Baseline {args.baseline} is in {saved.get("unit")}, not {UNIT} units; re-save it with --save')
+
+    def best_of(fn) -> float:
+        return min(timeit.repeat(fn, number=args.number, repeat=5)) / args.number
+
+    print(f'{ROSTER_SIZE}-player rosters, bottom half in the Waffle Bowl, {time.strftime("%Y-%m-%d %H:%M:%S")}')
+    suites = {num_teams: cases(num_teams) for num_teams in args.sizes}
+    ratios, timings = {}, {}
+    for _ in range(args.rounds):
+        for num_teams, suite in suites.items():
+            for name, fn in suite.items():
+                # Timed back to back, so both see the same machine speed
+                unit = best_of(calibration)
+                seconds = best_of(fn)
+                case = f'{num_teams} teams: {name}'
+                if seconds / unit < ratios.get(case, float('inf')):
+                    ratios[case] = seconds / unit
+                timings[case] = min(seconds * 1e6, timings.get(case, float('inf')))
+
+    print(f'{"case":<26} {"per run":>13} {"units":>9} {"baseline":>9} {"change":>8}')
+    regressions = []
+    for case, ratio in ratios.items():
+        line = f'{case:<26} {timings[case]:>10.1f} us {ratio:>9.3f}'
+        if case in baseline:
+            change = ratio / baseline[case] - 1
+            line += f' {baseline[case]:>9.3f} {change:>+7.0%}'
+            if change > args.threshold:
+                regressions.append(case)
+                line += '  SLOWER'
+        print(line)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'saved_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'python': platform.python_version(),
+                'machine': platform.platform(),
+                'unit': UNIT,
+                'results': ratios
+            }, f, indent=2)
+        print(f'Baseline saved to {args.baseline}')
+    elif regressions:
+        message = f'{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}'
+        if args.strict:
+            sys.exit(message)
+        print(f'{message} (re-run to rule out noise; --strict to fail on it)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark cache codecs on a full bracket snapshot: size, encode and decode time.
+
+Builds a week-17 snapshot (bracket, standings and 6 teams x 3 weeks of
+rosters) from the synthetic league in bench_parsing.py and encodes it with
+each codec CodecSerializer supports.
+
+Usage:
+    python benchmarks/bench_cache_codec.py [--number N]
+"""
+import argparse
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_parsing import make_payloads  # noqa: E402
+
+from app.services.bracket_service import BracketService  # noqa: E402
+from app.services.yahoo_models import parse_roster, parse_standings  # noqa: E402
+from app.utils.cache_codec import CodecSerializer  # noqa: E402
+
+CODECS = [
+    ('pickle', CodecSerializer(codec='pickle')),
+    ('msgpack', CodecSerializer(codec='msgpack')),
+    ('pickle+zstd', CodecSerializer(codec='pickle', compression='zstd')),
+    ('msgpack+zstd', CodecSerializer(codec='msgpack', compression='zstd')),
+]
+
+
+def make_snapshot():
+    standings_data, _, roster_data = make_payloads()
+    standings = parse_standings(standings_data)
+
+    bracket_svc = BracketService()
+    waffle_teams = bracket_svc.get_waffle_bowl_teams(standings)
+    bracket = bracket_svc.create_bracket_structure(waffle_teams, 17)
+
+    rosters = {}
+    for team in waffle_teams:
+        team_id = team['team_id']
+        rosters[team_id] = {
+            week: parse_roster(team_id, week, roster_data[team_id])
+            for week in [round_data['week'] for round_data in bracket['rounds']]
+        }
+
+    now = time.time()
+    return {
+        'bracket': bracket,
+        'current_week': 17,
+        'bracket_status': bracket_svc.get_bracket_status(bracket, 17),
+        'standings': standings,
+        'rosters': rosters,
+        'built_at': now,
+        'data_as_of': now
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=500, help='Iterations per timing run')
+    args = parser.parse_args()
+
+    snapshot = make_snapshot()
+
+    print(f'bracket snapshot, {time.strftime("%Y-%m-%d %H:%M:%S")}')
+    print(f'{"codec":<14} {"bytes":>9} {"encode":>12} {"decode":>12}')
+    for name, serializer in CODECS:
+        encoded = serializer.dumps(snapshot)
+        if serializer.loads(encoded) != snapshot:
+            sys.exit(f'{name} did not round-trip the snapshot')
+
+        encode = min(timeit.repeat(lambda: serializer.dumps(snapshot), number=args.number, repeat=5)) / args.number
+        decode = min(timeit.repeat(lambda: serializer.loads(encoded), number=args.number, repeat=5)) / args.number
+        print(f'{name:<14} {len(encoded):>9} {encode * 1e6:>9.1f} us {decode * 1e6:>9.1f} us')
+
+
+if __name__ == '__main__':
+    main()
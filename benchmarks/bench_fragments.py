@@ -0,0 +1,59 @@
+"""Benchmark serving the bracket fragment: rendering vs the fragment cache.
+
+Publishes a week-17 snapshot (see bench_cache_codec.py) into an in-memory
+cache and times the bracket fragment rendered from the snapshot components,
+served from the shared fragment cache, and served from the in-process LRU.
+
+Usage:
+    python benchmarks/bench_fragments.py [--number N]
+"""
+import argparse
+import os
+import sys
+import time
+import timeit
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bench_cache_codec import make_snapshot  # noqa: E402
+
+from app import cache, create_app  # noqa: E402
+from app.blueprints.api.routes import bracket_etag, render_bracket  # noqa: E402
+from app.services.snapshot_service import SnapshotService  # noqa: E402
+from app.utils import fragment_cache  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=200, help='Iterations per timing run')
+    args = parser.parse_args()
+
+    app = create_app()
+    cache.init_app(app, config={'CACHE_TYPE': 'SimpleCache'})
+
+    with app.test_request_context():
+        SnapshotService(SimpleNamespace(league_id='bench')).publish(make_snapshot())
+        manifest, _ = SnapshotService.read('bench')
+        etag = bracket_etag(manifest)
+
+        def rendered():
+            return render_bracket(manifest)
+
+        def shared_hit():
+            fragment_cache._local.clear()
+            return fragment_cache.get_or_render(etag, rendered)
+
+        def local_hit():
+            return fragment_cache.get_or_render(etag, rendered)
+
+        local_hit()  # warm both tiers
+
+        print(f'bracket fragment ({len(rendered())} bytes), {time.strftime("%Y-%m-%d %H:%M:%S")}')
+        for name, fn in [('render', rendered), ('shared cache hit', shared_hit), ('local LRU hit', local_hit)]:
+            seconds = min(timeit.repeat(fn, number=args.number, repeat=5)) / args.number
+            print(f'{name:<18} {seconds * 1e6:>10.1f} us')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""Benchmark Yahoo response parsing: typed schemas vs the legacy dict-building code.
+
+Builds a synthetic 12-team league (16-player rosters, 6 matchups) out of real
+yfpy model objects and times parsing standings, a scoreboard and every roster
+with both implementations. Peak memory comes from tracemalloc.
+
+Usage:
+    python benchmarks/bench_parsing.py [--number N]
+"""
+import argparse
+import os
+import sys
+import time
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from yfpy.models import (  # noqa: E402
+    Manager, Matchup, Name, OutcomeTotals, Player, PlayerPoints, Scoreboard,
+    SelectedPosition, Standings, Team, TeamPoints, TeamStandings
+)
+
+from app.services.yahoo_models import parse_roster, parse_scoreboard, parse_standings  # noqa: E402
+
+NUM_TEAMS = 12
+ROSTER_SIZE = 16
+LINEUP = ['QB', 'WR', 'WR', 'RB', 'RB', 'TE', 'W/R/T', 'K', 'DEF'] + ['BN'] * 6 + ['IR']
+
+
+# --- Synthetic yfpy payloads -------------------------------------------------
+
+def make_team(team_id: int) -> Team:
+    return Team({
+        'team_id': str(team_id),
+        'team_key': f'461.l.1.t.{team_id}',
+        'name': f'Team {team_id} Ünïcode',
+        'manager': Manager({'nickname': f'Manager {team_id}'}),
+        'team_points': TeamPoints({'total': f'{100 + team_id}.25'}),
+        'team_standings': TeamStandings({
+            'rank': str(team_id),
+            'points_for': f'{1500 + team_id}.5',
+            'points_against': f'{1400 + team_id}.5',
+            'outcome_totals': OutcomeTotals({'wins': '7', 'losses': '6', 'ties': '0'})
+        })
+    })
+
+
+def make_player(player_id: int, position: str) -> Player:
+    return Player({
+        'player_id': str(player_id),
+        'name': Name({'full': f'Player {player_id}'}),
+        'display_position': 'WR',
+        'editorial_team_abbr': 'NE',
+        'selected_position': SelectedPosition({'position': position}),
+        'player_points': PlayerPoints({'total': f'{player_id % 30}.4'})
+    })
+
+
+def make_payloads():
+    teams = [make_team(i) for i in range(1, NUM_TEAMS + 1)]
+    standings = Standings({'teams': teams})
+    scoreboard = Scoreboard({'matchups': [
+        Matchup({'teams': [teams[i], teams[i + 1]], 'status': 'midevent', 'is_tied': 0})
+        for i in range(0, NUM_TEAMS, 2)
+    ]})
+    rosters = {
+        str(t): [make_player(t * 100 + i, LINEUP[i]) for i in range(ROSTER_SIZE)]
+        for t in range(1, NUM_TEAMS + 1)
+    }
+    return standings, scoreboard, rosters
+
+
+# --- Legacy dict-building parsers (as of the previous YahooService) ---------
+
+def legacy_parse_standings(standings):
+    teams_data = standings.teams
+    teams = []
+    for team in teams_data:
+        def to_str(val):
+            if isinstance(val, bytes):
+                return val.decode('utf-8')
+            return str(val) if val is not None else ''
+
+        teams.append({
+            'team_id': to_str(team.team_id),
+            'team_key': to_str(team.team_key),
+            'name': to_str(team.name),
+            'manager': to_str(team.manager.nickname) if hasattr(team, 'manager') and team.manager else 'Unknown',
+            'wins': int(team.team_standings.outcome_totals.wins) if hasattr(team, 'team_standings') else 0,
+            'losses': int(team.team_standings.outcome_totals.losses) if hasattr(team, 'team_standings') else 0,
+            'ties': int(team.team_standings.outcome_totals.ties) if hasattr(team, 'team_standings') and hasattr(team.team_standings.outcome_totals, 'ties') else 0,
+            'points_for': float(team.points_for) if hasattr(team, 'points_for') else 0.0,
+            'points_against': float(team.points_against) if hasattr(team, 'points_against') else 0.0,
+            'rank': int(team.team_standings.rank) if hasattr(team, 'team_standings') else 0
+        })
+    teams.sort(key=lambda x: x['rank'])
+    return teams
+
+
+def legacy_parse_scoreboard(week, scoreboard, fetched_at):
+    matchups = []
+    team_scores = {}
+
+    def to_str(val):
+        return val.decode('utf-8') if isinstance(val, bytes) else str(val or '')
+
+    for matchup in scoreboard.matchups:
+        teams_data = []
+        for team in matchup.teams:
+            t_data = {
+                'team_id': to_str(team.team_id),
+                'team_key': to_str(team.team_key),
+                'name': to_str(team.name),
+                'points': float(getattr(team.team_points, 'total', 0.0))
+            }
+            teams_data.append(t_data)
+            team_scores[t_data['team_id']] = t_data
+
+        t1 = teams_data[0] if len(teams_data) > 0 else {}
+        t2 = teams_data[1] if len(teams_data) > 1 else {}
+        matchups.append({
+            'week': week,
+            'teams': teams_data,
+            'winner_team_key': getattr(matchup, 'winner_team_key', None),
+            'is_tied': getattr(matchup, 'is_tied', False),
+            'status': getattr(matchup, 'status', 'unknown'),
+            'team1_points': t1.get('points', 0.0),
+            'team2_points': t2.get('points', 0.0)
+        })
+
+    return {'week': week, 'matchups': matchups, 'team_scores': team_scores, 'fetched_at': fetched_at}
+
+
+def legacy_parse_roster(team_id, week, roster_data):
+    def to_str(val):
+        if isinstance(val, bytes):
+            return val.decode('utf-8')
+        return str(val) if val is not None else ''
+
+    players = []
+    for player in roster_data:
+        player_points = 0.0
+        if hasattr(player, 'player_points') and hasattr(player.player_points, 'total'):
+            player_points = float(player.player_points.total)
+
+        player_name = 'Unknown'
+        if hasattr(player, 'name'):
+            if hasattr(player.name, 'full'):
+                player_name = to_str(player.name.full)
+            else:
+                player_name = to_str(player.name)
+
+        selected_position = 'BN'
+        if hasattr(player, 'selected_position'):
+            if hasattr(player.selected_position, 'position'):
+                selected_position = to_str(player.selected_position.position)
+            else:
+                selected_position = to_str(player.selected_position)
+
+        players.append({
+            'player_id': to_str(player.player_id) if hasattr(player, 'player_id') else '',
+            'name': player_name,
+            'position': to_str(player.display_position) if hasattr(player, 'display_position') else 'N/A',
+            'team': to_str(player.editorial_team_abbr) if hasattr(player, 'editorial_team_abbr') else 'N/A',
+            'selected_position': selected_position,
+            'points': player_points
+        })
+
+    position_order = {
+        'QB': 0, 'WR': 1, 'RB': 3, 'TE': 5, 'W/R/T': 6, 'FLEX': 6,
+        'K': 7, 'DEF': 8, 'BN': 9, 'IR': 10
+    }
+    players.sort(key=lambda p: (position_order.get(p['selected_position'], 99), p['name']))
+
+    return {
+        'team_id': to_str(team_id),
+        'name': f'Team {team_id}',
+        'manager': 'Unknown',
+        'players': players,
+        'week': week
+    }
+
+
+# --- Runners -----------------------------------------------------------------
+
+def run_legacy(standings, scoreboard, rosters):
+    return (
+        legacy_parse_standings(standings),
+        legacy_parse_scoreboard(17, scoreboard, 0.0),
+        {team_id: legacy_parse_roster(team_id, 17, players) for team_id, players in rosters.items()}
+    )
+
+
+def run_typed(standings, scoreboard, rosters):
+    return (
+        parse_standings(standings),
+        parse_scoreboard(17, scoreboard, 0.0),
+        {team_id: parse_roster(team_id, 17, players) for team_id, players in rosters.items()}
+    )
+
+
+def measure(name, fn, payloads, number):
+    seconds = min(timeit.repeat(lambda: fn(*payloads), number=number, repeat=5)) / number
+
+    tracemalloc.start()
+    result = fn(*payloads)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    print(f'{name:<22} {seconds * 1e6:>10.1f} us {peak / 1024:>10.1f} KiB {retained / 1024:>10.1f} KiB')
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--number', type=int, default=200, help='Iterations per timing run')
+    args = parser.parse_args()
+
+    payloads = make_payloads()
+
+    # Both implementations must agree before timing them
+    if run_legacy(*payloads) != run_typed(*payloads):
+        sys.exit('Parsed output differs between legacy and typed parsers')
+
+    print(f'{NUM_TEAMS} teams x {ROSTER_SIZE} players, {time.strftime("%Y-%m-%d %H:%M:%S")}')
+    print(f'{"parser":<22} {"per run":>13} {"peak":>14} {"retained":>14}')
+    legacy = measure('legacy dicts', run_legacy, payloads, args.number)
+    typed = measure('typed dicts', run_typed, payloads, args.number)
+    print(f'speedup (typed dicts): {legacy / typed:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
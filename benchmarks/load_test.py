@@ -0,0 +1,323 @@
+"""Load test the HTMX endpoints with concurrent viewers, offline.
+
+Each viewer loads the dashboard once, then polls /api/bracket/refresh with
+If-None-Match (as the dashboard does), reads /api/bracket/status, and now
+and then opens a team or matchup modal. At the end it reports p50/p95/p99
+latency per endpoint, requests/s, the 304 ratio, Yahoo calls per minute and
+the backend cache hit ratio.
+
+By default the app runs in-process against recorded Yahoo fixtures
+(YAHOO_BACKEND=replay, see app/services/yahoo_fixtures.py), with the
+snapshot refresher rebuilding every --refresh seconds, an in-memory cache
+(--redis for REDIS_URL) and rate limits off. Generate fixtures first:
+
+    python -m app.utils.record_fixtures --synthetic
+
+--url targets a running deployment instead (Yahoo calls are then read from
+its /api/quota; cache hits are not available, and its rate limits apply).
+
+Usage:
+    python benchmarks/load_test.py [--viewers 50] [--duration 60] [--poll 2]
+        [--league-id demo] [--refresh 15] [--redis] [--url URL] [--json out.json]
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+TEAM_RE = re.compile(r"showTeamModal\('([^']+)'\)")
+MATCHUP_RE = re.compile(r"showMatchupModal\('([^']+)', (\d+)\)")
+
+
+class Stats:
+    """Latencies and statuses per endpoint, shared by all viewers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def add(self, endpoint: str, seconds: float, status: int):
+        with self._lock:
+            self.latencies[endpoint].append(seconds)
+            self.statuses[endpoint][status] += 1
+
+
+class CacheCounter:
+    """Counts hits and misses of the cache backend's get/get_many."""
+
+    def __init__(self, backend):
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        get, get_many = backend.get, backend.get_many
+
+        def counted_get(key):
+            value = get(key)
+            self._count([value])
+            return value
+
+        def counted_get_many(*keys):
+            values = get_many(*keys)
+            self._count(values)
+            return values
+
+        backend.get, backend.get_many = counted_get, counted_get_many
+
+    def _count(self, values):
+        hits = sum(1 for value in values if value is not None)
+        with self._lock:
+            self.hits += hits
+            self.misses += len(values) - hits
+
+    def ratio(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else None
+
+
+def expire_before_add(backend):
+    """Make SimpleCache.add() succeed over an expired key, as Redis SET NX does.
+
+    cachelib only drops expired keys when over its threshold, so the
+    refresher's rebuild lock would otherwise never expire in-process.
+    """
+    add = backend.add
+
+    def add_unless_live(key, value, timeout=None):
+        if not backend.has(key):
+            backend.delete(key)
+        return add(key, value, timeout)
+
+    backend.add = add_unless_live
+
+
+def percentile(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def viewer(base: str, prefix: str, stats: Stats, stop: threading.Event, poll: float, seed: int):
+    """One dashboard viewer: page load, then polling until stopped."""
+    rng = random.Random(seed)
+    session = requests.Session()
+    etag = None
+    teams, matchups = [], []
+
+    def get(endpoint, path, headers=None):
+        started = time.perf_counter()
+        try:
+            response = session.get(base + path, headers=headers, timeout=30)
+            status = response.status_code
+        except requests.RequestException:
+            response, status = None, 0
+        stats.add(endpoint, time.perf_counter() - started, status)
+        return response
+
+    get('/', prefix + '/')
+    while not stop.is_set():
+        response = get('/api/bracket/refresh', f'{prefix}/api/bracket/refresh',
+                       {'If-None-Match': etag} if etag else None)
+        if response is not None and response.status_code == 200:
+            etag = response.headers.get('ETag')
+            teams = TEAM_RE.findall(response.text) or teams
+            matchups = MATCHUP_RE.findall(response.text) or matchups
+        get('/api/bracket/status', f'{prefix}/api/bracket/status')
+
+        # About one viewer in ten opens a modal each poll
+        if teams and rng.random() < 0.05:
+            get('/api/team/<id>/details', f'{prefix}/api/team/{rng.choice(teams)}/details')
+        if matchups and rng.random() < 0.05:
+            round_id, index = rng.choice(matchups)
+            get('/api/matchup/<round>/<i>/details', f'{prefix}/api/matchup/{round_id}/{index}/details')
+
+        stop.wait(poll * rng.uniform(0.8, 1.2))
+
+
+def start_app(args):
+    """Run the app in-process against the replay backend.
+
+    Returns:
+        Tuple of (base URL, Yahoo call counter, cache counter, server)
+    """
+    # Read by app.config at import time
+    os.environ['YAHOO_BACKEND'] = 'replay'
+    os.environ.setdefault('YAHOO_FIXTURES_SEASON', '2025')
+    os.environ['LEAGUE_ID'] = os.environ['LEAGUE_IDS'] = args.league_id
+    # A fixed cadence, so runs are comparable whatever the time of day
+    for name in ('CACHE_LIVE_SCORES', 'CACHE_IDLE_SCORES', 'CACHE_FINAL_SCORES', 'SNAPSHOT_REFRESH_INTERVAL'):
+        os.environ[name] = str(args.refresh)
+
+    from werkzeug.serving import make_server
+
+    from app import cache, create_app, limiter
+    from app.services.snapshot_service import start_snapshot_refresher
+    from app.services.yahoo_fixtures import fixture_store, replay_faults
+    from app.utils.metrics import count_cache_hits
+    from app.utils.timing import instrument_cache
+
+    store = fixture_store(args.league_id, os.environ['YAHOO_FIXTURES_SEASON'])
+    if not len(store):
+        print(f"❌ Error: no fixtures in {store.directory} (run: python -m app.utils.record_fixtures --synthetic)")
+        sys.exit(1)
+
+    app = create_app()
+    if not args.redis:
+        cache.init_app(app, config={'CACHE_TYPE': 'SimpleCache'})
+        expire_before_add(cache.cache)
+        instrument_cache(cache.cache)
+        count_cache_hits(cache.cache)
+    # Every viewer shares one address; measure the app, not the limiter
+    limiter.enabled = False
+    # Rebuilds should ask Yahoo for past weeks, as a cold deployment does
+    app.config['SEASON_ARCHIVE_PATH'] = ''
+    if args.redis:
+        with app.app_context():
+            cache.clear()
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    cache_counter = CacheCounter(cache.cache)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    start_snapshot_refresher(app)
+    return f'http://127.0.0.1:{server.server_port}', replay_faults(), cache_counter, server
+
+
+def yahoo_calls(base: str):
+    """Yahoo calls made so far by a running deployment (from /api/quota), or None."""
+    try:
+        return requests.get(base + '/api/quota', timeout=10).json().get('calls')
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def wait_for_snapshot(base: str, prefix: str, timeout: float = 60) -> bool:
+    """Wait until the bracket fragment has content (the first build is published)."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            response = requests.get(f'{base}{prefix}/api/bracket/refresh', timeout=30)
+            if response.ok and 'ETag' in response.headers:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def report(stats: Stats, elapsed: float, yahoo: int, cache_ratio, viewers: int) -> dict:
+    endpoints = {}
+    all_latencies, all_statuses = [], defaultdict(int)
+    for endpoint, latencies in sorted(stats.latencies.items()):
+        statuses = stats.statuses[endpoint]
+        endpoints[endpoint] = {
+            'requests': len(latencies),
+            'p50_ms': percentile(latencies, 0.50) * 1000,
+            'p95_ms': percentile(latencies, 0.95) * 1000,
+            'p99_ms': percentile(latencies, 0.99) * 1000,
+            'statuses': dict(statuses)
+        }
+        all_latencies.extend(latencies)
+        for status, count in statuses.items():
+            all_statuses[status] += count
+
+    total = len(all_latencies)
+    errors = sum(count for status, count in all_statuses.items() if status == 0 or status >= 400)
+    refreshes = stats.statuses['/api/bracket/refresh']
+    return {
+        'viewers': viewers,
+        'seconds': elapsed,
+        'requests': total,
+        'requests_per_second': total / elapsed,
+        'errors': errors,
+        'p50_ms': percentile(all_latencies, 0.50) * 1000 if total else None,
+        'p95_ms': percentile(all_latencies, 0.95) * 1000 if total else None,
+        'p99_ms': percentile(all_latencies, 0.99) * 1000 if total else None,
+        'not_modified_ratio': refreshes[304] / sum(refreshes.values()) if refreshes else None,
+        'yahoo_calls': yahoo,
+        'yahoo_calls_per_minute': yahoo * 60 / elapsed if yahoo is not None else None,
+        'cache_hit_ratio': cache_ratio,
+        'endpoints': endpoints
+    }
+
+
+def print_report(result: dict):
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else 'n/a'
+
+    print(f"\n{'endpoint':<34} {'reqs':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    rows = list(result['endpoints'].items()) + [('all', result)]
+    for endpoint, row in rows:
+        statuses = ' '.join(f'{status}:{count}' for status, count in sorted(row.get('statuses', {}).items()))
+        print(f"{endpoint:<34} {row['requests']:>7} {fmt(row['p50_ms'], '8.1f')} "
+              f"{fmt(row['p95_ms'], '8.1f')} {fmt(row['p99_ms'], '8.1f')}  {statuses}")
+    print(f"\n{result['viewers']} viewers, {result['seconds']:.0f}s: "
+          f"{result['requests_per_second']:.1f} req/s, {result['errors']} errors")
+    print(f"304 Not Modified:  {fmt(result['not_modified_ratio'], '.1%')} of bracket polls")
+    print(f"Yahoo calls:       {fmt(result['yahoo_calls'], 'd')} ({fmt(result['yahoo_calls_per_minute'], '.1f')}/min)")
+    print(f"Cache hit ratio:   {fmt(result['cache_hit_ratio'], '.1%')}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--viewers', type=int, default=50, help='Concurrent dashboard viewers')
+    parser.add_argument('--duration', type=float, default=60, help='Seconds to run')
+    parser.add_argument('--poll', type=float, default=2, help='Seconds between a viewer\'s polls')
+    parser.add_argument('--league-id', default='demo', help='League to serve (fixtures must exist)')
+    parser.add_argument('--refresh', type=int, default=15, help='Snapshot rebuild interval, seconds (in-process)')
+    parser.add_argument('--redis', action='store_true', help='Use REDIS_URL instead of an in-memory cache')
+    parser.add_argument('--url', help='Base URL of a running deployment to load instead')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    if args.url:
+        base, prefix = args.url.rstrip('/'), ''
+        faults = cache_counter = server = None
+    else:
+        base, faults, cache_counter, server = start_app(args)
+        prefix = f'/l/{args.league_id}'
+
+    print(f"Waiting for the first snapshot at {base}{prefix}...")
+    if not wait_for_snapshot(base, prefix):
+        print("❌ Error: no bracket snapshot was published")
+        sys.exit(1)
+
+    calls_before = faults.counts()['requests'] if faults else yahoo_calls(base)
+    stats, stop = Stats(), threading.Event()
+    threads = [
+        threading.Thread(target=viewer, args=(base, prefix, stats, stop, args.poll, seed), daemon=True)
+        for seed in range(args.viewers)
+    ]
+    print(f"Running {args.viewers} viewers for {args.duration:.0f}s...")
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    calls_after = faults.counts()['requests'] if faults else yahoo_calls(base)
+    yahoo = calls_after - calls_before if calls_before is not None and calls_after is not None else None
+    result = report(stats, elapsed, yahoo, cache_counter.ratio() if cache_counter else None, args.viewers)
+    print_report(result)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+    if server:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
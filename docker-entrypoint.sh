@@ -3,6 +3,15 @@ set -e
 
 echo "== entrypoint: initialize yf token store from environment (if provided) =="
 TOKEN_DIR="/root/.yf_token_store"
+# Tokens kept elsewhere (e.g. a directory on a volume shared with the season archive)
+if [ -n "$YF_TOKEN_STORE" ] && [ "$YF_TOKEN_STORE" != "$TOKEN_DIR" ]; then
+  mkdir -p "$YF_TOKEN_STORE"
+  if [ -L "$TOKEN_DIR" ] || [ ! -e "$TOKEN_DIR" ]; then
+    ln -sfn "$YF_TOKEN_STORE" "$TOKEN_DIR"
+  else
+    echo "WARNING: $TOKEN_DIR exists; not linking it to YF_TOKEN_STORE=$YF_TOKEN_STORE"
+  fi
+fi
 mkdir -p "$TOKEN_DIR"
 TOKEN_FILE="$TOKEN_DIR/token.json"
 PRIVATE_FILE="$TOKEN_DIR/private.json"
@@ -0,0 +1,48 @@
+"""Gunicorn settings (loaded automatically from the working directory).
+
+Workers, threads and the bind address are given on the command line
+(Dockerfile, Procfile); this file adds the hooks prometheus_client's
+multiprocess mode needs, so /metrics reports every worker (see
+app/utils/metrics.py), and checks that live-update streams leave threads
+for ordinary requests.
+"""
+import os
+import shutil
+import tempfile
+
+# Set before the workers import the app (prometheus_client reads it on import)
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'waffle-prometheus'))
+
+# Threads per worker kept free of SSE streams for page, fragment and health requests
+REQUEST_THREADS = 4
+
+
+def on_starting(server):
+    """Start every deployment with empty metric files (counters restart at zero)."""
+    path = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def when_ready(server):
+    """Warn when SSE streams could take every thread of a worker (each stream holds one)."""
+    sse_max_clients = int(os.getenv('SSE_MAX_CLIENTS', 12))
+    threads = server.cfg.threads
+    if sse_max_clients > threads - REQUEST_THREADS:
+        server.log.warning(
+            f"SSE_MAX_CLIENTS={sse_max_clients} leaves fewer than {REQUEST_THREADS} of {threads} threads per "
+            f"worker for other requests; lower it or raise --threads"
+        )
+    server.log.info(
+        f"Capacity: {server.cfg.workers} workers x {threads} threads, "
+        f"up to {server.cfg.workers * sse_max_clients} live-update streams (more viewers poll)"
+    )
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges (its counters keep counting toward the totals)."""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
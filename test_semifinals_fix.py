@@ -0,0 +1,172 @@
+"""Mock tests for the Waffle Bowl bracket engine (run with `make test-bracket`)."""
+from app.services.bracket_service import BracketService, advancement_table
+
+
+def make_teams(num_teams):
+    """Teams seeded 1 (worst) to N, team_id 100 + seed."""
+    return [{'team_id': 100 + seed, 'name': f'Team {seed}', 'waffle_seed': seed}
+            for seed in range(1, num_teams + 1)]
+
+
+def seeds(pair):
+    """Waffle seeds of a matchup's team1 and team2 (None for an empty slot)."""
+    return tuple(team['waffle_seed'] if team else None for team in (pair['team1'], pair['team2']))
+
+
+def scoreboard(week, points):
+    """Finished scoreboard for a week from {seed: points}."""
+    return {
+        'week': week,
+        'matchups': [{'status': 'postevent'}],
+        'team_scores': {str(100 + seed): {'points': value} for seed, value in points.items()}
+    }
+
+
+def play(service, bracket, round_index, points):
+    """Score one round from {seed: points}, treating its week as finished."""
+    week = bracket['rounds'][round_index]['week']
+    return service.update_bracket_with_results(bracket, scoreboard(week, points), current_week=week + 1)
+
+
+def build(num_teams, end_week=17):
+    service = BracketService(num_teams)
+    return service, service.create_bracket_structure(make_teams(num_teams), current_week=end_week, end_week=end_week)
+
+
+def test_first_round_pairings_and_byes():
+    expected = {
+        4: ([(1, 4), (2, 3)], []),
+        5: ([(4, 5)], [1, 2, 3]),
+        6: ([(3, 6), (4, 5)], [1, 2]),
+        8: ([(1, 8), (2, 7), (3, 6), (4, 5)], []),
+        10: ([(7, 10), (8, 9)], [1, 2, 3, 4, 5, 6]),
+        12: ([(5, 12), (6, 11), (7, 10), (8, 9)], [1, 2, 3, 4]),
+    }
+    for num_teams, (pairings, byes) in expected.items():
+        _, bracket = build(num_teams)
+        first = bracket['rounds'][0]
+        assert [seeds(m) for m in first['matchups']] == pairings, num_teams
+        assert [team['waffle_seed'] for team in first['byes']] == byes, num_teams
+        assert list(advancement_table(num_teams)[0]['byes']) == byes, num_teams
+
+
+def test_round_ids_and_weeks_from_end_week():
+    expected = {
+        4: ['sf', 'final'],
+        5: ['qf', 'sf', 'final'],
+        6: ['qf', 'sf', 'final'],
+        8: ['qf', 'sf', 'final'],
+        10: ['r1', 'qf', 'sf', 'final'],
+        12: ['r1', 'qf', 'sf', 'final'],
+    }
+    for num_teams, ids in expected.items():
+        for end_week in (17, 14):
+            _, bracket = build(num_teams, end_week)
+            rounds = bracket['rounds']
+            assert [r['id'] for r in rounds] == ids, num_teams
+            assert [r['week'] for r in rounds] == list(range(end_week - len(ids) + 1, end_week + 1)), num_teams
+
+    service = BracketService(6)
+    bracket = service.create_bracket_structure(make_teams(6), current_week=15)
+    assert [r['week'] for r in bracket['rounds']] == [15, 16, 17]
+
+
+def test_six_team_layout_matches_baseline():
+    _, bracket = build(6)
+    qf, sf, final = bracket['rounds']
+    assert [m['id'] for m in qf['matchups']] == ['qf1', 'qf2']
+    assert [m['id'] for m in sf['matchups']] == ['sf1', 'sf2']
+    assert [m['id'] for m in final['matchups']] == ['final']
+    # Bye teams wait in team2 of the semifinals, seed 2 in sf1 and seed 1 in sf2
+    assert seeds(sf['matchups'][0]) == (None, 2)
+    assert seeds(sf['matchups'][1]) == (None, 1)
+    assert sf['matchups'][0]['team1_from'] == 'Quarterfinals'
+    assert sf['matchups'][0]['team2_from'] == 'Bye'
+
+
+def test_six_team_loser_reseeding():
+    for qf_points, worse_loser, better_loser in (
+        # qf1 3v6: 3 loses; qf2 4v5: 4 loses
+        ({3: 80, 6: 90, 4: 70, 5: 100}, 3, 4),
+        # qf1: 6 loses; qf2: 5 loses
+        ({3: 90, 6: 80, 4: 100, 5: 70}, 5, 6),
+        # qf1: 6 loses; qf2: 4 loses
+        ({3: 90, 6: 80, 4: 70, 5: 100}, 4, 6),
+    ):
+        service, bracket = build(6)
+        play(service, bracket, 0, qf_points)
+        sf = bracket['rounds'][1]
+        # The better (higher-seeded) QF loser must meet seed 1, the worse one seed 2
+        assert seeds(sf['matchups'][0]) == (worse_loser, 2), qf_points
+        assert seeds(sf['matchups'][1]) == (better_loser, 1), qf_points
+
+
+def test_losers_advance_to_final():
+    service, bracket = build(6)
+    play(service, bracket, 0, {3: 80, 6: 90, 4: 70, 5: 100})
+    play(service, bracket, 1, {3: 60, 2: 50, 4: 75, 1: 65})
+    final = bracket['rounds'][2]['matchups'][0]
+    assert seeds(final) == (1, 2)
+    play(service, bracket, 2, {1: 40, 2: 45})
+    assert final['loser']['waffle_seed'] == 1
+    assert final['winner']['waffle_seed'] == 2
+
+
+def test_odd_bracket_reseeding():
+    service, bracket = build(5)
+    play(service, bracket, 0, {4: 90, 5: 80})
+    sf = bracket['rounds'][1]
+    assert seeds(sf['matchups'][0]) == (5, 1)
+    assert seeds(sf['matchups'][1]) == (2, 3)
+    play(service, bracket, 1, {5: 70, 1: 60, 2: 90, 3: 85})
+    assert seeds(bracket['rounds'][2]['matchups'][0]) == (1, 3)
+
+
+def test_larger_brackets_reseed_against_bye_teams():
+    for num_teams, first_points, expected_second in (
+        # Losers 10 and 8: the worse (8) meets seed 2, the better (10) seed 1
+        (10, {7: 90, 10: 80, 8: 70, 9: 100}, [(8, 2), (10, 1), (3, 6), (4, 5)]),
+        # Losers 5, 6, 7, 8 (team1 of each game) meet seeds 4, 3, 2, 1
+        (12, {5: 1, 12: 2, 6: 1, 11: 2, 7: 1, 10: 2, 8: 1, 9: 2}, [(5, 4), (6, 3), (7, 2), (8, 1)]),
+    ):
+        service, bracket = build(num_teams)
+        play(service, bracket, 0, first_points)
+        assert [seeds(m) for m in bracket['rounds'][1]['matchups']] == expected_second, num_teams
+
+    service, bracket = build(8)
+    play(service, bracket, 0, {1: 1, 8: 2, 2: 2, 7: 1, 3: 1, 6: 2, 4: 2, 5: 1})
+    # Losers 1, 3, 5, 7: worst meets best of the losers
+    assert [seeds(m) for m in bracket['rounds'][1]['matchups']] == [(1, 7), (3, 5)]
+
+
+def test_tie_leaves_matchup_undecided():
+    service, bracket = build(6)
+    play(service, bracket, 0, {3: 80, 6: 80, 4: 70, 5: 100})
+    qf1, qf2 = bracket['rounds'][0]['matchups']
+    assert qf1['loser'] is None and qf1['winner'] is None
+    assert qf2['loser']['waffle_seed'] == 4
+    # The semifinals wait until every quarterfinal has a loser
+    assert [seeds(m) for m in bracket['rounds'][1]['matchups']] == [(None, 2), (None, 1)]
+
+
+def test_unfinished_week_records_points_only():
+    service, bracket = build(6)
+    week = bracket['rounds'][0]['week']
+    board = scoreboard(week, {3: 80, 6: 90, 4: 70, 5: 100})
+    board['matchups'] = [{'status': 'midevent'}]
+    service.update_bracket_with_results(bracket, board, current_week=week)
+    qf1 = bracket['rounds'][0]['matchups'][0]
+    assert qf1['loser'] is None
+    assert qf1['team1']['points_by_week'][week] == 80
+
+
+def test_too_few_teams():
+    assert 'error' in BracketService(6).create_bracket_structure(make_teams(5), current_week=15)
+
+
+if __name__ == '__main__':
+    tests = [(name, test) for name, test in sorted(globals().items()) if name.startswith('test_')]
+    for name, test in tests:
+        test()
+        print(f'ok  {name}')
+    print(f'{len(tests)} bracket tests passed')
@@ -1,10 +1,15 @@
 """WSGI entry point for production deployment."""
 import os
 from app import create_app
+from app.services.snapshot_service import start_snapshot_refresher
 
 # Determine environment
 env = os.getenv('FLASK_ENV', 'production')
 app = create_app(env)
 
+# Build the bracket snapshot in the background (one refresher per worker,
+# coordinated through Redis so only one worker hits Yahoo per interval)
+start_snapshot_refresher(app)
+
 if __name__ == '__main__':
     app.run()